@@ -1,22 +1,80 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, Response, g, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+import io
+import json
 import os
-import uuid
+import tempfile
+import time
+import zipfile
+import zlib
 
-from services.pdf_extractor import extract_text_from_pdf
-from services.nlp_analyzer import analyze_resume
-from services.report_generator import generate_report_pdf
+from services.job_queue import (
+    JOB_EVENTS_MAX_SECONDS, JOB_QUEUE_ENABLED, JOB_RETRY_AFTER_SECONDS, QueueFull, job_events, job_queue_stats,
+    job_status, submit_analysis_job, submit_batch_job
+)
+from services.nlp_analyzer import job_profile_cache_stats
+from services.pipeline import (
+    AnalysisError, delete_candidate, find_candidates, run_analysis, run_batch_analysis
+)
+from services.report_store import get_report_pdf, report_store_stats
+from services.result_cache import get_result_cache
+from services.skill_index import SkillQueryError, get_skill_index
+from services.uploads import (
+    UPLOAD_MAX_REQUEST_BYTES, UPLOAD_SPOOL_BYTES, UploadError, read_upload
+)
+from services.vector_index import get_vector_index
+from models.embeddings import embedding_service
+from utils.metrics import (
+    METRICS_ENABLED, METRICS_TIMING_HEADER, record_request, render_metrics, server_timing, start_request, timed
+)
 
 # ---------------- App Config ----------------
 
+class UploadRequest(Request):
+    """Spools multipart file parts above UPLOAD_SPOOL_BYTES to a temporary file."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, mode="rb+")
+
+
 # Serve React static files from frontend_dist
 FRONTEND_FOLDER = os.path.join(os.path.dirname(__file__), 'frontend_dist')
 app = Flask(__name__, static_folder=FRONTEND_FOLDER, static_url_path='')
+app.request_class = UploadRequest
+# Larger bodies are refused with 413 before the form is parsed
+app.config["MAX_CONTENT_LENGTH"] = UPLOAD_MAX_REQUEST_BYTES
 CORS(app)
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-OUTPUT_FOLDER = os.path.join(BASE_DIR, "output")
-os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+BATCH_MAX_RESUMES = int(os.environ.get("BATCH_MAX_RESUMES", "500"))
+BATCH_MAX_FILE_BYTES = int(os.environ.get("BATCH_MAX_FILE_MB", "10")) * 1024 * 1024
+BATCH_MAX_REQUEST_BYTES = int(os.environ.get("BATCH_MAX_REQUEST_MB", "256")) * 1024 * 1024
+# Decompressed bytes of all files in a batch, zip members included
+BATCH_MAX_TOTAL_BYTES = int(os.environ.get("BATCH_MAX_TOTAL_MB", "256")) * 1024 * 1024
+SEARCH_MAX_TOP_K = int(os.environ.get("SEARCH_MAX_TOP_K", "100"))
+
+
+# ---------------- Request Timing ----------------
+@app.before_request
+def start_timing():
+    g.request_started = time.perf_counter()
+    g.stage_timings = start_request()
+
+
+@app.after_request
+def record_timing(response):
+    elapsed = time.perf_counter() - g.request_started
+    record_request(request.endpoint or "unmatched", response.status_code, elapsed)
+    if METRICS_TIMING_HEADER:
+        response.headers["Server-Timing"] = server_timing(g.stage_timings, elapsed)
+    return response
+
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return jsonify({
+        "error": f"Request is larger than {request.max_content_length // (1024 * 1024)} MB"
+    }), 413
 
 
 # ---------------- Serve React Frontend & Health Check ----------------
@@ -32,6 +90,37 @@ def serve_react(path):
         return send_file(os.path.join(FRONTEND_FOLDER, 'index.html'))
 
 # ---------------- Analyze Resume ----------------
+def analysis_response(analysis_result, report_id, cached=False):
+    download_url = f"{request.url_root.rstrip('/')}/download-report/{report_id}"
+
+    return jsonify({
+        "status": "success",
+        "analysis": analysis_result,
+        "report_id": report_id,
+        "download_url": download_url,
+        "cached": cached
+    })
+
+
+def job_accepted_response(job_id):
+    root = request.url_root.rstrip('/')
+    return jsonify({
+        "status": "queued",
+        "job_id": job_id,
+        "status_url": f"{root}/jobs/{job_id}",
+        "events_url": f"{root}/jobs/{job_id}/events"
+    }), 202
+
+
+def queue_full_response(e):
+    response = jsonify({
+        "error": "Too many analyses are waiting; try again shortly",
+        "details": str(e)
+    })
+    response.headers["Retry-After"] = str(JOB_RETRY_AFTER_SECONDS)
+    return response, 429
+
+
 @app.route("/analyze", methods=["POST"])
 def analyze():
     try:
@@ -45,70 +134,335 @@ def analyze():
                 "error": "Resume file or Job Description missing"
             }), 400
 
-        # Only allow PDF files
-        if not resume.filename.lower().endswith('.pdf'):
-            print("❌ Uploaded file is not a PDF")
+        try:
+            # Checks the PDF header, size and page count, not the filename
+            with timed("upload_read"):
+                upload = read_upload(resume.stream, resume.filename)
+            if JOB_QUEUE_ENABLED:
+                return job_accepted_response(
+                    submit_analysis_job(upload.data, job_description, selected_role, resume.filename)
+                )
+            result = run_analysis(
+                upload.data, job_description, selected_role, resume.filename, upload.digest, upload.key
+            )
+        except UploadError as e:
+            print("❌ Upload rejected:", str(e))
             return jsonify({
-                "error": "Only PDF files are supported"
-            }), 400
+                "error": str(e)
+            }), e.status_code
+        except AnalysisError as e:
+            return jsonify({
+                "error": str(e)
+            }), e.status_code
+        except QueueFull as e:
+            return queue_full_response(e)
 
-        # Extract resume text
-        resume_text = extract_text_from_pdf(resume)
-        print("Extracted resume text:", resume_text[:500])  # Log first 500 chars
+        return analysis_response(result["analysis"], result["report_id"], result["cached"])
 
-        if not resume_text or not resume_text.strip():
-            print("❌ No text extracted from PDF")
-            return jsonify({
-                "error": "Unable to extract text from resume PDF"
-            }), 400
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        print("❌ ERROR:", str(e))
+        return jsonify({
+            "error": "Internal Server Error",
+            "details": str(e)
+        }), 500
 
-        # NLP Analysis
-        analysis_result = analyze_resume(resume_text, job_description, selected_role)
-        print("Analysis result:", analysis_result)  # Log analysis result
 
-        if not analysis_result or not isinstance(analysis_result, dict):
-            print("❌ Analysis result is invalid")
-            return jsonify({
-                "error": "Resume analysis failed. Try again."
-            }), 500
+# ---------------- Batch Screening ----------------
+class BatchLimitError(Exception):
+    """A batch with too many files or too many bytes; nothing further is read."""
 
-        # Generate unique report
-        report_id = str(uuid.uuid4())
-        pdf_path = generate_report_pdf(
-            analysis_result=analysis_result,
-            output_dir=OUTPUT_FOLDER,
-            filename=f"{report_id}.pdf"
-        )
+    def __init__(self, message, status_code=413):
+        super().__init__(message)
+        self.status_code = status_code
 
-        download_url = f"{request.url_root.rstrip('/')}/download-report/{report_id}"
 
+def collect_batch_resumes():
+    """Gather (candidate_id, pdf_bytes) from the "resumes" files and an optional zip "archive".
+
+    Limits are checked as files are read, so an oversized batch or a zip
+    bomb is refused before the rest of it is decompressed.
+    """
+    resumes, rejected, seen = [], [], set()
+    total_bytes = 0
+
+    def add(name, read):
+        nonlocal total_bytes
+        if len(seen) >= BATCH_MAX_RESUMES:
+            raise BatchLimitError(f"Too many resumes; the limit is {BATCH_MAX_RESUMES} per batch")
+        candidate_id = name
+        suffix = 2
+        while candidate_id in seen:
+            candidate_id = f"{name} ({suffix})"
+            suffix += 1
+        seen.add(candidate_id)
+        try:
+            data = read()
+        except UploadError as e:
+            rejected.append({"candidate_id": candidate_id, "status": "error", "error": str(e)})
+            return
+        total_bytes += len(data)
+        if total_bytes > BATCH_MAX_TOTAL_BYTES:
+            raise BatchLimitError(f"Batch is larger than {BATCH_MAX_TOTAL_BYTES // (1024 * 1024)} MB in total")
+        resumes.append((candidate_id, data))
+
+    def read_part(upload):
+        return read_upload(upload.stream, upload.filename, BATCH_MAX_FILE_BYTES).data
+
+    def read_member(zf, info):
+        # Bounded by the bytes actually decompressed, not the declared file_size.
+        # A member that cannot be read is rejected on its own, like any bad file.
+        try:
+            with zf.open(info) as member:
+                return read_upload(member, info.filename, BATCH_MAX_FILE_BYTES).data
+        except NotImplementedError as e:
+            raise UploadError(f"Unsupported zip member: {e}")
+        except RuntimeError:
+            # What zipfile raises for a member that needs a password
+            raise UploadError("Encrypted zip members are not supported")
+        except (zipfile.BadZipFile, zlib.error) as e:
+            raise UploadError(f"Corrupt zip member: {e}")
+
+    for upload in request.files.getlist("resumes"):
+        if upload and upload.filename:
+            add(upload.filename, lambda: read_part(upload))
+
+    archive = request.files.get("archive")
+    if archive:
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                add(os.path.basename(info.filename), lambda: read_member(zf, info))
+
+    return resumes, rejected
+
+
+@app.route("/analyze/batch", methods=["POST"])
+def analyze_batch():
+    # A batch may carry many files; each is still held to BATCH_MAX_FILE_BYTES
+    request.max_content_length = BATCH_MAX_REQUEST_BYTES
+    job_description = request.form.get("job_description")
+    selected_role = request.form.get("role")
+
+    try:
+        resumes, rejected = collect_batch_resumes()
+    except (zipfile.BadZipFile, zlib.error):
         return jsonify({
-            "status": "success",
-            "analysis": analysis_result,
-            "report_id": report_id,
-            "download_url": download_url
-        })
+            "error": "Archive is not a valid zip file"
+        }), 400
+    except BatchLimitError as e:
+        return jsonify({
+            "error": str(e)
+        }), e.status_code
 
-    except Exception as e:
-        print("❌ ERROR:", str(e))
+    if not job_description or not resumes:
         return jsonify({
-            "error": "Internal Server Error",
-            "details": str(e)
-        }), 500
+            "error": "Resume files or Job Description missing"
+        }), 400
+
+    if JOB_QUEUE_ENABLED:
+        try:
+            return job_accepted_response(submit_batch_job(resumes, rejected, job_description, selected_role))
+        except QueueFull as e:
+            return queue_full_response(e)
+
+    results = run_batch_analysis(resumes, rejected, job_description, selected_role)
+
+    def generate():
+        # One NDJSON line per candidate as it finishes, then the final ranking
+        for result in results:
+            yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+# ---------------- Jobs ----------------
+def with_download_url(status):
+    result = status.get("result")
+    if status["kind"] == "single" and result:
+        result["download_url"] = f"{request.url_root.rstrip('/')}/download-report/{result['report_id']}"
+    return status
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    status = job_status(job_id)
+    if status is None:
+        return jsonify({
+            "error": "Job not found"
+        }), 404
+    return jsonify(with_download_url(status))
+
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_event_stream(job_id):
+    if job_status(job_id) is None:
+        return jsonify({
+            "error": "Job not found"
+        }), 404
+    # Each open stream holds a worker here, so it is cut after JOB_EVENTS_MAX_SECONDS
+    return Response(
+        stream_with_context(job_events(job_id, with_download_url, JOB_EVENTS_MAX_SECONDS)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# ---------------- Candidate Search ----------------
+def search_params():
+    """JSON or form payload of a search request, plus its capped top_k."""
+    payload = request.get_json(silent=True) or request.form
+    return payload, min(int(payload.get("top_k", 10)), SEARCH_MAX_TOP_K)
+
+
+@app.route("/api/candidates/search", methods=["POST"])
+def search_candidates():
+    try:
+        payload, top_k = search_params()
+    except (TypeError, ValueError):
+        return jsonify({
+            "error": "top_k must be an integer"
+        }), 400
+
+    job_description = payload.get("job_description")
+    if not job_description:
+        return jsonify({
+            "error": "Job Description missing"
+        }), 400
+
+    try:
+        candidates = find_candidates(job_description, top_k)
+    except AnalysisError as e:
+        return jsonify({
+            "error": str(e)
+        }), e.status_code
+
+    return jsonify({
+        "status": "success",
+        "candidates": candidates
+    })
+
+
+@app.route("/api/candidates/filter", methods=["POST"])
+def filter_candidates():
+    """Boolean skill query, e.g. {"query": "python AND docker AND NOT php"}."""
+    try:
+        payload, top_k = search_params()
+    except (TypeError, ValueError):
+        return jsonify({
+            "error": "top_k must be an integer"
+        }), 400
+
+    skill_index = get_skill_index()
+    if skill_index is None:
+        return jsonify({
+            "error": "Candidate index is disabled"
+        }), 404
+
+    try:
+        total, candidates = skill_index.query(payload.get("query") or "", top_k)
+    except SkillQueryError as e:
+        return jsonify({
+            "error": str(e)
+        }), 400
+
+    return jsonify({
+        "status": "success",
+        "total": total,
+        "candidates": candidates
+    })
+
+
+@app.route("/api/candidates/coverage", methods=["POST"])
+def rank_candidates_by_coverage():
+    """Rank candidates by ROLE_SKILLS coverage, optionally within a skill query."""
+    try:
+        payload, top_k = search_params()
+    except (TypeError, ValueError):
+        return jsonify({
+            "error": "top_k must be an integer"
+        }), 400
+
+    skill_index = get_skill_index()
+    if skill_index is None:
+        return jsonify({
+            "error": "Candidate index is disabled"
+        }), 404
+
+    try:
+        candidates = skill_index.coverage(payload.get("role") or "", top_k, payload.get("query") or None)
+    except SkillQueryError as e:
+        return jsonify({
+            "error": str(e)
+        }), 400
+
+    return jsonify({
+        "status": "success",
+        "candidates": candidates
+    })
+
+
+@app.route("/api/candidates/<candidate_id>", methods=["DELETE"])
+def remove_candidate(candidate_id):
+    if not delete_candidate(candidate_id):
+        return jsonify({
+            "error": "Candidate not found"
+        }), 404
+    return jsonify({
+        "status": "success"
+    })
+
+
+# ---------------- Cache Stats ----------------
+@app.route("/api/stats", methods=["GET"])
+def cache_stats():
+    result_cache = get_result_cache()
+    vector_index = get_vector_index()
+    skill_index = get_skill_index()
+    return jsonify({
+        "result_cache": result_cache.stats() if result_cache else None,
+        "job_profile_cache": job_profile_cache_stats(),
+        "embedding_cache": embedding_service.stats(),
+        "report_store": report_store_stats(),
+        "job_queue": job_queue_stats(),
+        "vector_index": vector_index.stats() if vector_index else None,
+        "skill_index": skill_index.stats() if skill_index else None
+    })
+
+
+# ---------------- Metrics ----------------
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    if not METRICS_ENABLED:
+        return jsonify({
+            "error": "Metrics are disabled"
+        }), 404
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
 
 
 # ---------------- Download Report ----------------
 @app.route("/download-report/<report_id>", methods=["GET"])
 def download_report(report_id):
-    file_path = os.path.join(OUTPUT_FOLDER, f"{report_id}.pdf")
+    try:
+        pdf = get_report_pdf(report_id)
+    except Exception as e:
+        print("❌ Report rendering failed:", str(e))
+        return jsonify({
+            "error": "Report generation failed",
+            "details": str(e)
+        }), 500
 
-    if not os.path.exists(file_path):
+    if not pdf:
         return jsonify({
             "error": "Report not found"
         }), 404
 
+    # Memory storage hands back the PDF itself, disk storage its path
     return send_file(
-        file_path,
+        io.BytesIO(pdf) if isinstance(pdf, bytes) else pdf,
+        mimetype="application/pdf",
         as_attachment=True,
         download_name="resume_analysis_report.pdf"
     )
@@ -0,0 +1,299 @@
+"""ASGI entry point serving the same analysis API as app.py.
+
+Run with ``uvicorn asgi:app --host 0.0.0.0 --port 10000 --workers 2``.
+The event loop only parses uploads and streams downloads; the blocking
+pipeline (PDF extraction, NLP, embedding, report rendering) runs on a
+thread pool, so slow resumes never hold up other connections.
+"""
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.formparsers import MultiPartParser
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from services.job_queue import (
+    JOB_EVENTS_KEEPALIVE_SECONDS, JOB_EVENTS_POLL_SECONDS, JOB_QUEUE_ENABLED, JOB_RETRY_AFTER_SECONDS, QueueFull,
+    is_finished, job_status, next_job_event, submit_analysis_job
+)
+from services.pipeline import AnalysisError, run_analysis
+from services.report_store import get_report_pdf
+from services.uploads import UPLOAD_MAX_REQUEST_BYTES, UPLOAD_SPOOL_BYTES, UploadError, read_upload
+from utils.metrics import (
+    METRICS_ENABLED, METRICS_TIMING_HEADER, record_request, render_metrics, server_timing, start_request, timed
+)
+
+# ---------------- App Config ----------------
+ASGI_ANALYSIS_THREADS = int(os.environ.get("ASGI_ANALYSIS_THREADS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=ASGI_ANALYSIS_THREADS, thread_name_prefix="analysis")
+
+# File parts above this size are spooled to a temporary file
+MultiPartParser.spool_max_size = UPLOAD_SPOOL_BYTES
+
+
+async def run_blocking(func, *args):
+    # In a copy of the context, so stages timed on the thread count for this request
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(_executor, context.run, func, *args)
+
+
+# ---------------- Request Timing ----------------
+class RequestTimingMiddleware:
+    """Records latency and status per endpoint; optionally adds a Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = start_request()
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if METRICS_TIMING_HEADER:
+                    header = server_timing(timings, time.perf_counter() - started)
+                    message = dict(message, headers=list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode("latin-1"))
+                    ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            endpoint = getattr(scope.get("endpoint"), "__name__", "unmatched")
+            record_request(endpoint, status, time.perf_counter() - started)
+
+
+# ---------------- Health Check ----------------
+async def home(request):
+    return JSONResponse({
+        "status": "AI Resume Analyzer Backend Running"
+    })
+
+
+# ---------------- Analyze Resume ----------------
+class RequestTooLarge(Exception):
+    """Raised while reading a request body that grows past its limit."""
+
+
+def limit_body(request, max_bytes):
+    """The same request, refusing its body once more than ``max_bytes`` arrive.
+
+    Counts what is actually received, so chunked requests (which have no
+    Content-Length) are held to the limit too.
+    """
+    receive = request.receive
+    received = 0
+
+    async def limited_receive():
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_bytes:
+                raise RequestTooLarge()
+        return message
+
+    return Request(request.scope, limited_receive)
+
+
+def request_too_large():
+    return JSONResponse({
+        "error": f"Request is larger than {UPLOAD_MAX_REQUEST_BYTES // (1024 * 1024)} MB"
+    }, status_code=413)
+
+
+async def analyze(request):
+    try:
+        # Refuse oversized bodies before the form is parsed
+        try:
+            content_length = int(request.headers.get("content-length", "0"))
+        except ValueError:
+            content_length = 0
+        if content_length > UPLOAD_MAX_REQUEST_BYTES:
+            return request_too_large()
+
+        try:
+            form = await limit_body(request, UPLOAD_MAX_REQUEST_BYTES).form()
+        except RequestTooLarge:
+            return request_too_large()
+        resume = form.get("resume")
+        job_description = form.get("job_description")
+        selected_role = form.get("role")
+
+        if not resume or isinstance(resume, str) or not job_description:
+            print("❌ Missing resume or job description in request")
+            return JSONResponse({
+                "error": "Resume file or Job Description missing"
+            }, status_code=400)
+
+        # Checks the PDF header, size and page count, not the filename
+        try:
+            with timed("upload_read"):
+                upload = await run_blocking(read_upload, resume.file, resume.filename)
+        except UploadError as e:
+            print("❌ Upload rejected:", str(e))
+            return JSONResponse({
+                "error": str(e)
+            }, status_code=e.status_code)
+
+        if JOB_QUEUE_ENABLED:
+            try:
+                job_id = await run_blocking(
+                    submit_analysis_job, upload.data, job_description, selected_role, resume.filename
+                )
+            except QueueFull as e:
+                return JSONResponse({
+                    "error": "Too many analyses are waiting; try again shortly",
+                    "details": str(e)
+                }, status_code=429, headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)})
+            root = str(request.base_url).rstrip('/')
+            return JSONResponse({
+                "status": "queued",
+                "job_id": job_id,
+                "status_url": f"{root}/jobs/{job_id}",
+                "events_url": f"{root}/jobs/{job_id}/events"
+            }, status_code=202)
+
+        try:
+            result = await run_blocking(
+                run_analysis, upload.data, job_description, selected_role, resume.filename, upload.digest, upload.key
+            )
+        except AnalysisError as e:
+            return JSONResponse({
+                "error": str(e)
+            }, status_code=e.status_code)
+
+        download_url = f"{str(request.base_url).rstrip('/')}/download-report/{result['report_id']}"
+        return JSONResponse({
+            "status": "success",
+            "analysis": result["analysis"],
+            "report_id": result["report_id"],
+            "download_url": download_url,
+            "cached": result["cached"]
+        })
+
+    except Exception as e:
+        print("❌ ERROR:", str(e))
+        return JSONResponse({
+            "error": "Internal Server Error",
+            "details": str(e)
+        }, status_code=500)
+
+
+# ---------------- Download Report ----------------
+async def download_report(request):
+    report_id = request.path_params["report_id"]
+    try:
+        pdf = await run_blocking(get_report_pdf, report_id)
+    except Exception as e:
+        print("❌ Report rendering failed:", str(e))
+        return JSONResponse({
+            "error": "Report generation failed",
+            "details": str(e)
+        }, status_code=500)
+
+    if not pdf:
+        return JSONResponse({
+            "error": "Report not found"
+        }, status_code=404)
+
+    # Memory storage hands back the PDF itself, disk storage its path
+    if isinstance(pdf, bytes):
+        return Response(
+            pdf,
+            media_type="application/pdf",
+            headers={"Content-Disposition": 'attachment; filename="resume_analysis_report.pdf"'}
+        )
+    return FileResponse(
+        pdf,
+        media_type="application/pdf",
+        filename="resume_analysis_report.pdf"
+    )
+
+
+# ---------------- Jobs ----------------
+def with_download_url(request, status):
+    result = status.get("result")
+    if status["kind"] == "single" and result:
+        result["download_url"] = f"{str(request.base_url).rstrip('/')}/download-report/{result['report_id']}"
+    return status
+
+
+async def get_job(request):
+    status = await run_blocking(job_status, request.path_params["job_id"])
+    if status is None:
+        return JSONResponse({
+            "error": "Job not found"
+        }, status_code=404)
+    return JSONResponse(with_download_url(request, status))
+
+
+async def job_event_stream(request):
+    job_id = request.path_params["job_id"]
+    if await run_blocking(job_status, job_id) is None:
+        return JSONResponse({
+            "error": "Job not found"
+        }, status_code=404)
+
+    async def events():
+        last_status, last_sent = None, time.monotonic()
+        while True:
+            status = await run_blocking(job_status, job_id)
+            if status is not None:
+                status = with_download_url(request, status)
+            event = next_job_event(status, last_status)
+            if event:
+                yield event
+                last_sent = time.monotonic()
+                if status is None or is_finished(status):
+                    return
+            elif time.monotonic() - last_sent > JOB_EVENTS_KEEPALIVE_SECONDS:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+            last_status = status
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# ---------------- Metrics ----------------
+async def metrics(request):
+    if not METRICS_ENABLED:
+        return JSONResponse({
+            "error": "Metrics are disabled"
+        }, status_code=404)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+app = Starlette(
+    routes=[
+        Route("/", home, methods=["GET"]),
+        Route("/analyze", analyze, methods=["POST"]),
+        Route("/download-report/{report_id}", download_report, methods=["GET"]),
+        Route("/jobs/{job_id}", get_job, methods=["GET"]),
+        Route("/jobs/{job_id}/events", job_event_stream, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+    ],
+    middleware=[
+        Middleware(RequestTimingMiddleware),
+        Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    ]
+)
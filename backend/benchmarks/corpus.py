@@ -0,0 +1,83 @@
+"""Synthetic resumes and job descriptions built from the skill vocabularies."""
+import io
+import random
+import textwrap
+
+from utils.skills import CERTIFICATIONS, GENERAL_SKILLS, ROLE_SKILLS, SOFT_SKILLS
+
+FILLER = [
+    "designed", "built", "shipped", "maintained", "improved", "led", "the", "a", "for",
+    "with", "using", "across", "team", "service", "platform", "customers", "latency",
+    "reduced", "by", "percent", "project", "projects", "experience", "responsible",
+    "education", "bachelor", "university", "internship", "work", "delivered", "features"
+]
+
+
+def make_resume_text(rng, words=400):
+    """Resume-like text: mostly filler with skills, soft skills and certs mixed in."""
+    vocab = GENERAL_SKILLS + SOFT_SKILLS
+    out = []
+    for _ in range(words):
+        roll = rng.random()
+        if roll < 0.15:
+            out.append(rng.choice(vocab))
+        elif roll < 0.16:
+            out.append(rng.choice(CERTIFICATIONS))
+        else:
+            out.append(rng.choice(FILLER))
+        if rng.random() < 0.08:
+            out.append(".\n")
+    return " ".join(out)
+
+
+def make_jd_text(rng, words=120, role=None):
+    role = role or rng.choice(list(ROLE_SKILLS))
+    skills = ROLE_SKILLS[role]
+    out = [f"we are hiring a {role}."]
+    for _ in range(words):
+        roll = rng.random()
+        if roll < 0.25:
+            out.append(rng.choice(skills))
+        elif roll < 0.3:
+            out.append(rng.choice(SOFT_SKILLS))
+        else:
+            out.append(rng.choice(FILLER))
+    return " ".join(out)
+
+
+def make_resume_pages(rng, pages, words_per_page=350):
+    return [
+        ["experience", "projects", "education"][page % 3] + "\n" + make_resume_text(rng, words_per_page)
+        for page in range(pages)
+    ]
+
+
+def make_resume_pdf(rng, pages, words_per_page=350):
+    """A resume PDF of ``pages`` letter pages of text (needs reportlab)."""
+    return render_resume_pdf(make_resume_pages(rng, pages, words_per_page))
+
+
+def render_resume_pdf(page_texts):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    for text in page_texts:
+        y = height - 50
+        c.setFont("Helvetica", 10)
+        for line in text.split("\n"):
+            for wrapped in textwrap.wrap(line, 95) or [""]:
+                if y < 40:
+                    break
+                c.drawString(40, y, wrapped)
+                y -= 13
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def make_pairs(count, seed=0, resume_words=400, jd_words=120):
+    rng = random.Random(seed)
+    return [(make_resume_text(rng, resume_words), make_jd_text(rng, jd_words)) for _ in range(count)]
@@ -0,0 +1,101 @@
+"""Parity and latency/memory benchmark for the embedding backends.
+
+    python -m benchmarks.embedding_backends --backends torch torch-int8 onnx onnx-int8
+
+Every backend runs in a fresh interpreter (so RSS is not shared between
+them) and scores the same synthetic resume/JD pairs the way
+``semantic_similarity`` does. The first backend is the reference; the
+others fail the parity check when any score differs from it by more than
+``--tolerance`` points (scores are percentages). Exits non-zero on a
+parity failure.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, os, resource, sys, time
+import numpy as np
+from benchmarks.corpus import make_pairs
+from models.backends import load_backend
+from models.embeddings import EMBEDDING_MODEL_NAME
+from utils.scoring import cosine_similarity
+
+backend_name, pairs_count, batch_size = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+pairs = make_pairs(pairs_count)
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+started = time.perf_counter()
+backend = load_backend(backend_name, EMBEDDING_MODEL_NAME)
+load_seconds = time.perf_counter() - started
+backend.encode(["warm up"])
+
+# Per-request latency: one pair at a time, like /analyze
+latencies, scores = [], []
+for resume, jd in pairs:
+    started = time.perf_counter()
+    a, b = backend.encode([resume, jd])
+    latencies.append(time.perf_counter() - started)
+    scores.append(round(cosine_similarity(a, b) * 100, 2))
+
+# Throughput: batched, like /analyze/batch
+texts = [text for pair in pairs for text in pair]
+started = time.perf_counter()
+for i in range(0, len(texts), batch_size):
+    backend.encode(texts[i:i + batch_size])
+batch_seconds = time.perf_counter() - started
+
+latencies.sort()
+print(json.dumps({
+    "backend": backend_name,
+    "load_seconds": round(load_seconds, 3),
+    "p50_pair_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+    "p95_pair_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+    "batched_texts_per_second": round(len(texts) / batch_seconds, 1),
+    "model_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - rss_before, 1),
+    "scores": scores
+}))
+"""
+
+
+def run_backend(name, pairs, batch_size):
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE, name, str(pairs), str(batch_size)],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        return {"backend": name, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx", "onnx-int8"])
+    parser.add_argument("--pairs", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--tolerance", type=float, default=2.0, help="max score difference, in points")
+    args = parser.parse_args()
+
+    results = [run_backend(name, args.pairs, args.batch_size) for name in args.backends]
+    reference = next((r["scores"] for r in results if "scores" in r), None)
+    failed = False
+    for result in results:
+        if "scores" not in result:
+            failed = True
+            continue
+        diffs = [abs(a - b) for a, b in zip(result.pop("scores"), reference)]
+        result["max_score_diff"] = round(max(diffs), 3)
+        result["mean_score_diff"] = round(sum(diffs) / len(diffs), 3)
+        result["parity"] = result["max_score_diff"] <= args.tolerance
+        failed = failed or not result["parity"]
+
+    print(json.dumps(results, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
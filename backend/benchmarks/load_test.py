@@ -0,0 +1,124 @@
+"""Concurrent load test for the /analyze endpoint.
+
+Compare the Flask (WSGI) and ASGI servers by starting both and pointing
+the test at each, e.g.::
+
+    gunicorn app:app --workers 2 --bind 127.0.0.1:5000 &
+    uvicorn asgi:app --workers 2 --port 8000 &
+    python -m benchmarks.load_test --resume sample.pdf \\
+        --url http://127.0.0.1:5000 --url http://127.0.0.1:8000
+
+Every request uploads a slightly different copy of the PDF (a trailing
+comment after %%EOF) so the result cache does not short-circuit the run;
+pass --same-file to measure cache hits instead.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_JD = (
+    "We are hiring a backend developer with python, flask, docker, aws, sql "
+    "and rest api experience. Strong communication and teamwork required."
+)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def multipart_body(fields, file_field, filename, file_bytes):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        )
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f"Content-Type: application/pdf\r\n\r\n".encode("utf-8") + file_bytes + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def run_load(url, pdf_bytes, jd, concurrency, total_requests, same_file=False, timeout=120):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def one_request(i):
+        data = pdf_bytes if same_file else pdf_bytes + f"\n% load-test {i} {uuid.uuid4().hex}\n".encode()
+        body, content_type = multipart_body({"job_description": jd}, "resume", "resume.pdf", data)
+        req = urllib.request.Request(
+            url.rstrip("/") + "/analyze", data=body, method="POST",
+            headers={"Content-Type": content_type}
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                response.read()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+        except (urllib.error.URLError, OSError) as e:
+            with lock:
+                errors.append(str(e))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(total_requests)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": len(errors),
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", action="append", required=True, help="server base URL (repeat to compare)")
+    parser.add_argument("--resume", required=True, help="PDF file to upload")
+    parser.add_argument("--jd", default=DEFAULT_JD, help="job description text")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--same-file", action="store_true", help="upload identical bytes every time")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    with open(args.resume, "rb") as f:
+        pdf_bytes = f.read()
+
+    results = [
+        run_load(url, pdf_bytes, args.jd, args.concurrency, args.requests, args.same_file)
+        for url in args.url
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    columns = ["url", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    print("  ".join(f"{c:>16}" for c in columns))
+    for result in results:
+        print("  ".join(f"{str(result[c]):>16}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
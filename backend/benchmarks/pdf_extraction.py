@@ -0,0 +1,154 @@
+"""Speed and text quality of the PDF extraction backends.
+
+    python -m benchmarks.pdf_extraction --backends pypdf2 pypdfium2 pymupdf pdfminer
+    python -m benchmarks.pdf_extraction --pdf-dir ~/resumes
+
+Extracts every page of every document with each backend directly (no
+process pool, so only the library is timed) and reports pages per
+second, p50/p95 per document and how close the text is to the truth:
+
+- on the seeded synthetic corpus (resumes of ``--pages`` pages, needs
+  reportlab) the truth is the text that was drawn;
+- with ``--pdf-dir`` (real resumes) there is none, so the first backend
+  that runs is the reference.
+
+Quality is the F1 of the extracted words against the reference words,
+per document, after the same lowercasing and whitespace folding as the
+analyzer. Exits non-zero when a backend is not installed or its lowest
+document F1 is under ``--min-f1``.
+"""
+import argparse
+import collections
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+from benchmarks.load_test import percentile
+
+
+def words(text):
+    return collections.Counter(text.lower().split())
+
+
+def word_f1(extracted, reference):
+    common = sum((extracted & reference).values())
+    if not common:
+        return 0.0
+    precision = common / sum(extracted.values())
+    recall = common / sum(reference.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def synthetic_corpus(page_counts, per_size, seed):
+    from benchmarks.corpus import make_resume_pages, render_resume_pdf
+
+    rng = random.Random(seed)
+    corpus = []
+    for pages in page_counts:
+        for _ in range(per_size):
+            page_texts = make_resume_pages(rng, pages)
+            corpus.append((render_resume_pdf(page_texts), " ".join(page_texts)))
+    return corpus
+
+
+def directory_corpus(path):
+    corpus = []
+    for name in sorted(glob.glob(os.path.join(path, "*.pdf"))):
+        with open(name, "rb") as f:
+            corpus.append((f.read(), None))
+    return corpus
+
+
+def extract(backend, data):
+    document = backend.open(data)
+    try:
+        return [document.page_text(index) or "" for index in range(document.page_count)]
+    finally:
+        document.close()
+
+
+def run_backend(name, corpus, repeat):
+    from services.pdf_backends import PDF_BACKENDS
+
+    try:
+        backend = PDF_BACKENDS[name]()
+    except ImportError as e:
+        return {"backend": name, "error": f"not installed ({e})"}, None
+
+    timings, texts, pages, failures = [], [], 0, 0
+    for data, _ in corpus:
+        best = float("inf")
+        page_texts = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            try:
+                page_texts = extract(backend, data)
+            except Exception:
+                page_texts = None
+                break
+            best = min(best, time.perf_counter() - started)
+        if page_texts is None:
+            failures += 1
+            texts.append("")
+            continue
+        timings.append(best)
+        texts.append(" ".join(page_texts))
+        pages += len(page_texts)
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        "backend": name,
+        "documents": len(corpus),
+        "failures": failures,
+        "pages_per_second": round(pages / total, 1) if total else None,
+        "p50_document_ms": round(percentile(timings, 50) * 1000, 2) if timings else None,
+        "p95_document_ms": round(percentile(timings, 95) * 1000, 2) if timings else None,
+        "empty_documents": sum(1 for text in texts if not text.strip()),
+    }, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["pypdf2", "pypdfium2", "pymupdf", "pdfminer"])
+    parser.add_argument("--pdf-dir", help="benchmark the PDFs in this directory instead of the synthetic corpus")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 5, 10])
+    parser.add_argument("--resumes-per-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs per document")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-f1", type=float, default=0.95)
+    args = parser.parse_args()
+
+    if args.pdf_dir:
+        corpus = directory_corpus(args.pdf_dir)
+    else:
+        corpus = synthetic_corpus(args.pages, args.resumes_per_size, args.seed)
+    if not corpus:
+        sys.exit(f"No PDFs found in {args.pdf_dir}")
+
+    references = [words(truth) if truth is not None else None for _, truth in corpus]
+    results, failed = [], False
+    for name in args.backends:
+        result, texts = run_backend(name, corpus, args.repeat)
+        results.append(result)
+        if texts is None:
+            failed = True
+            continue
+        extracted = [words(text) for text in texts]
+        if references[0] is None:
+            # No ground truth: the first backend that ran is the reference
+            references = extracted
+        scores = [word_f1(e, r) for e, r in zip(extracted, references)]
+        result["mean_f1"] = round(sum(scores) / len(scores), 4)
+        result["min_f1"] = round(min(scores), 4)
+        failed = failed or result["min_f1"] < args.min_f1
+
+    print(json.dumps(results, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Reproducible per-stage benchmark of the single-resume analysis pipeline.
+
+    python -m benchmarks.pipeline --stub-embeddings --output baseline.json
+    python -m benchmarks.pipeline --stub-embeddings --baseline baseline.json --threshold 10
+
+Builds a seeded synthetic corpus from the taxonomy's skill lists (PDF
+resumes of ``--pages`` pages, job descriptions of ``--jd-words`` words)
+and runs each resume through ``run_analysis`` and report rendering in a
+scratch directory, with the result cache and candidate indexes off.
+Stage timings come from the same instrumentation as ``/metrics``
+(utils.metrics), so stage names match the production histograms.
+
+Reports p50/p95/p99/mean per stage, end to end and per resume size,
+throughput, peak RSS and (with ``--tracemalloc``) peak Python heap. With
+``--baseline``, every p50/p95 that is more than ``--threshold`` percent
+and ``--min-delta-ms`` slower than the baseline is listed and the exit
+status is 1. ``--stub-embeddings`` swaps the model for the ``stub``
+backend, so the run needs no weights or network; compare runs made with
+the same setting.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.load_test import percentile
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "mean_ms": round(total / len(samples) * 1000, 3),
+        "per_second": round(len(samples) / total, 2) if total else None,
+    }
+
+
+def build_corpus(args):
+    from benchmarks.corpus import make_jd_text, make_resume_pdf
+
+    rng = random.Random(args.seed)
+    jds = [make_jd_text(rng, words) for words in args.jd_words]
+    corpus = []
+    for pages in args.pages:
+        for _ in range(args.resumes_per_size):
+            corpus.append((pages, make_resume_pdf(rng, pages), jds[len(corpus) % len(jds)]))
+    return corpus
+
+
+def run(args):
+    # Settings are read at import time, so configure before importing the pipeline
+    scratch = tempfile.mkdtemp(prefix="hirelens-bench-")
+    os.environ.update({
+        "RESULT_CACHE_ENABLED": "0",
+        "CANDIDATE_INDEX_ENABLED": "0",
+        "REPORT_PRERENDER": "0",
+        "REPORT_FOLDER": os.path.join(scratch, "output"),
+        "METRICS_ENABLED": "1",
+        "METRICS_DIR": "",
+    })
+    if args.stub_embeddings:
+        os.environ["EMBEDDING_BACKEND"] = "stub"
+
+    from models.embeddings import EMBEDDING_BACKEND, warm_up
+    from services.pipeline import ANALYSIS_VARIANT, run_analysis
+    from services.report_store import get_report_pdf
+    from utils.metrics import start_request
+    from utils.taxonomy import get_taxonomy
+
+    corpus = build_corpus(args)
+    # The pipeline logs every resume and analysis; keep stdout for the results
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        warm_up()
+        get_taxonomy().warm()
+        for _, pdf, jd in corpus[:args.warmup]:
+            get_report_pdf(run_analysis(pdf, jd)["report_id"])
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    stages, totals, by_pages = {}, [], {}
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for pages, pdf, jd in corpus:
+            timings = start_request()
+            request_started = time.perf_counter()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                result = run_analysis(pdf, jd)
+                get_report_pdf(result["report_id"])
+            elapsed = time.perf_counter() - request_started
+
+            per_stage = {}
+            for stage, seconds in timings:
+                per_stage[stage] = per_stage.get(stage, 0.0) + seconds
+            for stage, seconds in per_stage.items():
+                stages.setdefault(stage, []).append(seconds)
+            totals.append(elapsed)
+            by_pages.setdefault(pages, []).append(elapsed)
+    wall = time.perf_counter() - started
+    traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+    if args.tracemalloc:
+        tracemalloc.stop()
+    shutil.rmtree(scratch, ignore_errors=True)
+
+    return {
+        "config": {
+            "pages": args.pages,
+            "resumes_per_size": args.resumes_per_size,
+            "jd_words": args.jd_words,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "embedding_backend": EMBEDDING_BACKEND,
+            "analysis_variant": ANALYSIS_VARIANT,
+            "taxonomy": get_taxonomy().build_id,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "stages": {stage: summarize(samples) for stage, samples in sorted(stages.items())},
+        "end_to_end": summarize(totals),
+        "by_pages": {str(pages): summarize(samples) for pages, samples in sorted(by_pages.items())},
+        "resumes_per_second": round(len(totals) / wall, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_traced_mb": round(traced_peak / 1024 / 1024, 1) if traced_peak is not None else None,
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Latencies more than ``threshold`` percent (and ``min_delta_ms``) slower than the baseline."""
+    groups = [("stages", name) for name in results["stages"]] + [("end_to_end", None)]
+    groups += [("by_pages", pages) for pages in results["by_pages"]]
+    regressions = []
+    for section, name in groups:
+        current = results[section] if name is None else results[section][name]
+        before = baseline.get(section, {}) if name is None else baseline.get(section, {}).get(name)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            old, new = before[metric], current[metric]
+            if new - old > min_delta_ms and new > old * (1 + threshold / 100):
+                regressions.append({
+                    "series": section if name is None else f"{section}.{name}",
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change_percent": round((new / old - 1) * 100, 1) if old else None,
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 5, 10, 25, 50])
+    parser.add_argument("--resumes-per-size", type=int, default=5)
+    parser.add_argument("--jd-words", type=int, nargs="+", default=[40, 120, 400])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=3, help="untimed runs first")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stub-embeddings", action="store_true", help="use the stub embedding backend")
+    parser.add_argument("--tracemalloc", action="store_true", help="also trace peak Python heap (slower)")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed slowdown, percent")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore smaller slowdowns")
+    args = parser.parse_args()
+
+    results = run(args)
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        results["regressions"] = compare(results, baseline, args.threshold, args.min_delta_ms)
+        failed = bool(results["regressions"])
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
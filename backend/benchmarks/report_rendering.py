@@ -0,0 +1,114 @@
+"""Report PDF rendering: cached text operators vs plain ReportLab drawString.
+
+    python -m benchmarks.report_rendering --reports 200 --repeat 5
+
+Analyses the same synthetic resume/JD pairs with the ``stub`` embedding
+backend (no weights needed), then renders every report both ways,
+interleaved so both see the same machine state:
+
+- ``cached``      REPORT_RENDER_CACHE=1, with the text caches warm as in
+                  a long-running worker
+- ``cold``        the same, caches cleared before every report
+- ``reference``   the previous renderer: REPORT_RENDER_CACHE=0 (drawString
+                  per line) and ReportLab's default ASCII85 stream filter
+
+Times are the best of ``--repeat`` runs, per report. Every report's
+extracted text (PyPDF2) must be identical with and without the cache;
+exits non-zero on a mismatch or when ``cached`` is not at least
+``--min-speedup`` times faster than ``reference``.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+
+_ASCII85 = None
+
+
+def use_renderer(cached):
+    from services import report_generator
+
+    global _ASCII85
+    if _ASCII85 is None:
+        _ASCII85 = report_generator.REPORT_ASCII85
+    report_generator.REPORT_RENDER_CACHE = cached
+    report_generator.REPORT_ASCII85 = _ASCII85 if cached else True
+
+
+def render_all(analyses, cached, cold=False):
+    from services import report_generator
+
+    use_renderer(cached)
+    started = time.perf_counter()
+    for analysis in analyses:
+        if cold:
+            clear_caches()
+        report_generator.render_report_pdf(analysis)
+    return (time.perf_counter() - started) / len(analyses)
+
+
+def clear_caches():
+    from services import report_generator
+
+    for cache in (report_generator.text_width, report_generator.wrap_text, report_generator.show_text_operator,
+                  report_generator.text_origin):
+        cache.cache_clear()
+
+
+def pdf_text(pdf_bytes):
+    from PyPDF2 import PdfReader
+
+    return [page.extract_text() for page in PdfReader(io.BytesIO(pdf_bytes)).pages]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-speedup", type=float, default=3.0)
+    args = parser.parse_args()
+
+    os.environ["EMBEDDING_BACKEND"] = "stub"
+    from benchmarks.corpus import make_pairs
+    from services import report_generator
+    from services.nlp_analyzer import analyze_resume
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        analyses = [analyze_resume(resume, jd) for resume, jd in make_pairs(args.reports, seed=args.seed)]
+
+    # Parity first: the wrap cache depends on the mode, so start each side empty
+    mismatches = 0
+    for analysis in analyses:
+        rendered = {}
+        for cached in (True, False):
+            clear_caches()
+            use_renderer(cached)
+            rendered[cached] = pdf_text(report_generator.render_report_pdf(analysis))
+        mismatches += rendered[True] != rendered[False]
+
+    best = {"cached": float("inf"), "cold": float("inf"), "reference": float("inf")}
+    for _ in range(args.repeat):
+        clear_caches()
+        best["reference"] = min(best["reference"], render_all(analyses, cached=False))
+        clear_caches()
+        best["cold"] = min(best["cold"], render_all(analyses, cached=True, cold=True))
+        render_all(analyses, cached=True)
+        best["cached"] = min(best["cached"], render_all(analyses, cached=True))
+
+    speedup = best["reference"] / best["cached"]
+    print(json.dumps({
+        "reports": len(analyses),
+        **{f"ms_per_report_{name}": round(seconds * 1000, 3) for name, seconds in best.items()},
+        "speedup": round(speedup, 2),
+        "text_mismatches": mismatches,
+    }, indent=2))
+    sys.exit(1 if mismatches or speedup < args.min_speedup else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Cost of skill alias normalization in the single-pass matchers.
+
+    python -m benchmarks.skill_matching --docs 500 --repeat 7
+
+Scans the same synthetic resumes and job descriptions (with alias
+spellings such as "nodejs" and "k8s" mixed in) with three matcher sets,
+interleaved so all see the same machine state:
+
+- ``aliases``      the taxonomy's matchers, reporting canonical skills
+- ``surface``      the same vocabulary with every spelling reported as is
+- ``no_aliases``   the canonical vocabulary only (alias spellings unseen)
+
+``aliases`` vs ``surface`` is the cost of normalization itself; it exits
+non-zero when that exceeds ``--max-overhead`` percent. ``no_aliases``
+shows what recognizing the extra spellings costs at all. Times are the
+best of ``--repeat`` runs, per resume/JD pair.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from benchmarks.corpus import make_jd_text, make_resume_text
+from utils.matching import RoleModel, SkillMatcher
+from utils.taxonomy import get_taxonomy
+
+
+def make_texts(count, aliases, seed=0):
+    rng = random.Random(seed)
+    resumes, jds = [], []
+    for _ in range(count):
+        words = make_resume_text(rng).split(" ")
+        for _ in range(len(words) // 40):
+            words.insert(rng.randrange(len(words)), rng.choice(aliases))
+        resumes.append(" ".join(words))
+        jds.append(make_jd_text(rng) + " " + " ".join(rng.choice(aliases) for _ in range(3)))
+    return resumes, jds
+
+
+def time_scan(matcher, role_model, resumes, jds):
+    started = time.perf_counter()
+    for resume in resumes:
+        matcher.extract(resume)
+    for jd in jds:
+        matcher.extract(jd)
+        role_model.scores(jd.lower())
+    return (time.perf_counter() - started) / len(resumes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=500, help="resume/JD pairs")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--max-overhead", type=float, default=5.0, help="percent")
+    args = parser.parse_args()
+
+    taxonomy = get_taxonomy().warm()
+    role_model = taxonomy.role_model
+    # Same terms in the same order (so the same weight rows), no alias mapping
+    surface_roles = RoleModel(role_model.roles, SkillMatcher(role_model.matcher.terms), role_model.weights,
+                              role_model.aliases)
+    variants = {
+        "aliases": (taxonomy.skill_matcher, taxonomy.role_model),
+        "surface": (SkillMatcher(taxonomy.skill_matcher.terms), surface_roles),
+        "no_aliases": (
+            SkillMatcher(taxonomy.general_skills),
+            RoleModel.build(taxonomy.role_skills, taxonomy.role_aliases)
+        ),
+    }
+    resumes, jds = make_texts(args.docs, list(taxonomy.skill_aliases) or ["-"])
+
+    best = {name: float("inf") for name in variants}
+    for _ in range(args.repeat):
+        for name, (matcher, role_model) in variants.items():
+            best[name] = min(best[name], time_scan(matcher, role_model, resumes, jds))
+
+    overhead = (best["aliases"] / best["surface"] - 1) * 100
+    print(json.dumps({
+        "taxonomy": taxonomy.build_id,
+        "skill_aliases": len(taxonomy.skill_aliases),
+        "docs": args.docs,
+        **{f"us_per_pair_{name}": round(seconds * 1e6, 1) for name, seconds in best.items()},
+        "normalization_overhead_percent": round(overhead, 2)
+    }, indent=2))
+    sys.exit(1 if overhead > args.max_overhead else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Startup time and memory of the backend.
+
+``python -m benchmarks.startup`` measures, in fresh interpreters, how long
+``import app`` takes and how long the embedding model takes to load and
+warm up, with peak RSS after each step.
+
+``python -m benchmarks.startup --gunicorn-master PID`` reports RSS, PSS
+and private (USS) memory of every worker of a running gunicorn, which
+shows how much of the model is shared when PRELOAD_MODEL=1.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, resource, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+result = {"import_seconds": imported - started,
+          "import_max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+if WARM:
+    from models.embeddings import warm_up
+    warm_up()
+    result["warm_up_seconds"] = time.perf_counter() - imported
+    result["warm_max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(result))
+"""
+
+
+def probe(warm, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", f"WARM = {warm}\n" + _PROBE],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: round(min(s[key] for s in samples), 3) for key in samples[0]}
+
+
+def smaps_rollup(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss_mb": round(fields.get("Rss", 0) / 1024, 1),
+        "pss_mb": round(fields.get("Pss", 0) / 1024, 1),
+        "uss_mb": round((fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)) / 1024, 1),
+        "shared_mb": round((fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)) / 1024, 1)
+    }
+
+
+def gunicorn_workers(master_pid):
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+        pids = [int(pid) for pid in f.read().split()]
+    return {"master": smaps_rollup(master_pid), "workers": {pid: smaps_rollup(pid) for pid in pids}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per measurement (best is kept)")
+    parser.add_argument("--no-warm", action="store_true", help="skip loading the embedding model")
+    parser.add_argument("--gunicorn-master", type=int, help="report per-worker memory of this gunicorn")
+    args = parser.parse_args()
+
+    if args.gunicorn_master:
+        print(json.dumps(gunicorn_workers(args.gunicorn_master), indent=2))
+    else:
+        print(json.dumps(probe(not args.no_warm, args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Gunicorn settings, picked up automatically when started from backend/.
+
+PRELOAD_MODEL=1 imports the app and loads the embedding weights in the
+master before it forks, so every worker shares the weight pages
+copy-on-write instead of holding a private copy. Inference only ever
+runs after fork (see post_fork): torch's thread pools do not survive a
+fork.
+"""
+import gc
+import os
+
+PRELOAD_MODEL = os.environ.get("PRELOAD_MODEL", "0") == "1"
+# Run one encode in each worker at boot so no request pays for model loading
+WARM_UP_WORKERS = os.environ.get("WARM_UP_WORKERS", "1") == "1"
+
+preload_app = PRELOAD_MODEL
+
+
+def on_starting(server):
+    from utils.metrics import METRICS_DIR, clear_snapshots
+    if METRICS_DIR:
+        # Snapshots of the previous run's workers would be added to this run's
+        clear_snapshots()
+    if PRELOAD_MODEL:
+        from models.embeddings import load_embedding_model
+        from utils.taxonomy import get_taxonomy
+        load_embedding_model()
+        get_taxonomy().warm()
+        # Keep the collector from touching (and so copying) preloaded objects
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if WARM_UP_WORKERS:
+        from models.embeddings import warm_up
+        from utils.taxonomy import get_taxonomy
+        warm_up()
+        get_taxonomy().warm()
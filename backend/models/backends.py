@@ -0,0 +1,118 @@
+"""Interchangeable CPU inference backends for the sentence embedding model.
+
+All backends serve the same MiniLM model and return float32 arrays, so
+anything built on ``EmbeddingService`` works with any of them. Pick one
+with ``EMBEDDING_BACKEND``:
+
+- ``torch``       PyTorch SentenceTransformer (reference implementation)
+- ``torch-int8``  same, with Linear layers dynamically quantized to int8
+- ``onnx``        ONNX Runtime export of the model
+- ``onnx-int8``   ONNX Runtime with the int8-quantized export
+- ``stub``        hashed bag of words, no model at all; for offline
+                  benchmarks and tests, not for real scoring
+
+The ONNX backends need ``sentence-transformers[onnx]`` (onnxruntime).
+"""
+import os
+import zlib
+
+import numpy as np
+
+# Quantized export shipped in the model repository; pick the file matching
+# the host CPU (avx2, avx512, avx512_vnni or arm64)
+EMBEDDING_ONNX_INT8_FILE = os.environ.get("EMBEDDING_ONNX_INT8_FILE", "onnx/model_qint8_avx2.onnx")
+
+
+class EmbeddingBackend:
+    """Minimal interface: turn a list of texts into an (n, dim) float32 array."""
+
+    name = "base"
+    # Longest input in tokens, special tokens included; backends that set it
+    # implement token_counts. None: inputs are not truncated
+    max_tokens = None
+
+    def encode(self, texts):
+        raise NotImplementedError
+
+    def token_counts(self, texts):
+        """Tokens per text as the model sees them, or None without a tokenizer."""
+        return None
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    name = "torch"
+
+    def __init__(self, model_name, **kwargs):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name, **kwargs)
+
+    def encode(self, texts):
+        return np.asarray(self.model.encode(texts, convert_to_numpy=True), dtype=np.float32)
+
+    @property
+    def max_tokens(self):
+        return self.model.max_seq_length
+
+    def token_counts(self, texts):
+        return [len(ids) for ids in self.model.tokenizer(texts)["input_ids"]]
+
+
+class QuantizedTorchBackend(SentenceTransformerBackend):
+    name = "torch-int8"
+
+    def __init__(self, model_name):
+        super().__init__(model_name, device="cpu")
+        import torch
+        self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend(SentenceTransformerBackend):
+    name = "onnx"
+
+    def __init__(self, model_name, file_name=None):
+        model_kwargs = {"file_name": file_name} if file_name else {}
+        super().__init__(model_name, backend="onnx", model_kwargs=model_kwargs)
+
+
+class QuantizedOnnxBackend(OnnxBackend):
+    name = "onnx-int8"
+
+    def __init__(self, model_name):
+        super().__init__(model_name, file_name=EMBEDDING_ONNX_INT8_FILE)
+
+
+class StubBackend(EmbeddingBackend):
+    """Deterministic feature-hashed word counts with the model's dimension."""
+
+    name = "stub"
+    dim = 384
+
+    def __init__(self, model_name=None):
+        self.model_name = model_name
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.array([zlib.crc32(word.encode("utf-8")) for word in text.lower().split()], dtype=np.uint32)
+            signs = np.where(hashes & 0x80000000, 1.0, -1.0)
+            vectors[row] = np.bincount(hashes % self.dim, weights=signs, minlength=self.dim)
+        return vectors
+
+
+EMBEDDING_BACKENDS = {
+    backend.name: backend
+    for backend in (SentenceTransformerBackend, QuantizedTorchBackend, OnnxBackend, QuantizedOnnxBackend, StubBackend)
+}
+
+
+def register_backend(name, factory):
+    """Add a backend; ``factory(model_name)`` must return an EmbeddingBackend."""
+    EMBEDDING_BACKENDS[name] = factory
+
+
+def load_backend(name, model_name):
+    try:
+        factory = EMBEDDING_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown embedding backend {name!r}; choose from {', '.join(EMBEDDING_BACKENDS)}")
+    return factory(model_name)
@@ -1,3 +1,162 @@
-from sentence_transformers import SentenceTransformer
+import os
+import threading
+import time
+from concurrent.futures import Future
 
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+import numpy as np
+
+from models.backends import load_backend
+from utils.cache import LRUCache, content_key
+
+# ---------------- Config ----------------
+EMBEDDING_MODEL_NAME = os.environ.get("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+# torch | torch-int8 | onnx | onnx-int8 | stub, see models/backends.py
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch")
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "2048"))
+EMBEDDING_BATCH_WINDOW_MS = float(os.environ.get("EMBEDDING_BATCH_WINDOW_MS", "3"))
+EMBEDDING_MAX_BATCH = int(os.environ.get("EMBEDDING_MAX_BATCH", "64"))
+
+
+# ---------------- Model Loading ----------------
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_embedding_model():
+    """Load the configured embedding backend on first use (thread-safe).
+
+    Importing this module stays cheap; torch/onnxruntime and the weights
+    are only loaded by the first caller, or up front by
+    ``load_embedding_model``.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                started = time.perf_counter()
+                _model = load_backend(EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME)
+                print(f"✅ Loaded embedding model {EMBEDDING_MODEL_NAME} ({EMBEDDING_BACKEND}) "
+                      f"in {time.perf_counter() - started:.2f}s")
+    return _model
+
+
+def load_embedding_model():
+    """Load the weights without running inference.
+
+    Safe to call in a gunicorn master before fork (see gunicorn.conf.py):
+    workers then share the weight pages copy-on-write.
+    """
+    return get_embedding_model()
+
+
+def warm_up():
+    """Load the model and run one encode so the first request is not slow."""
+    get_embedding_model().encode(["warm up"])
+
+
+def __getattr__(name):
+    # Backwards compatible ``from models.embeddings import embedding_model``
+    if name == "embedding_model":
+        return get_embedding_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ---------------- Embedding Service ----------------
+class EmbeddingService:
+    """Cached, micro-batched access to the sentence embedding model.
+
+    Texts missing from the cache are queued; the first caller to queue
+    waits up to ``batch_window_ms`` (or until ``max_batch`` texts are
+    waiting) and then encodes everything queued in one ``model.encode``
+    call on behalf of all waiting callers.
+    """
+
+    def __init__(self, model_loader, cache_size=EMBEDDING_CACHE_SIZE,
+                 batch_window_ms=EMBEDDING_BATCH_WINDOW_MS, max_batch=EMBEDDING_MAX_BATCH):
+        self.model_loader = model_loader
+        self.cache = LRUCache(cache_size)
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch = max_batch
+        self.batches = 0
+        self.batched_texts = 0
+        self._lock = threading.Lock()
+        self._batch_ready = threading.Condition(self._lock)
+        self._pending = []
+        self._pending_count = 0
+        self._collecting = False
+
+    def encode(self, texts):
+        """Return an array with one embedding row per text, in order."""
+        keys = [content_key(text) for text in texts]
+        vectors = [self.cache.get(key) for key in keys]
+        missing = {}
+        for text, key, vector in zip(texts, keys, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+
+        if missing:
+            computed = self._encode_batched(list(missing.values()))
+            fresh = dict(zip(missing, computed))
+            for key, vector in fresh.items():
+                self.cache.put(key, vector)
+            vectors = [fresh[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+
+        return np.vstack(vectors)
+
+    def _encode_batched(self, texts):
+        if self.batch_window <= 0:
+            return self._encode_now(texts)
+
+        future = Future()
+        with self._lock:
+            self._pending.append((texts, future))
+            self._pending_count += len(texts)
+            leader = not self._collecting
+            if leader:
+                self._collecting = True
+            elif self._pending_count >= self.max_batch:
+                self._batch_ready.notify()
+
+        if leader:
+            with self._lock:
+                self._batch_ready.wait_for(
+                    lambda: self._pending_count >= self.max_batch,
+                    timeout=self.batch_window
+                )
+                batch, self._pending = self._pending, []
+                self._pending_count = 0
+                self._collecting = False
+            self._run_batch(batch)
+
+        return future.result()
+
+    def _run_batch(self, batch):
+        unique = list(dict.fromkeys(text for texts, _ in batch for text in texts))
+        try:
+            computed = dict(zip(unique, self._encode_now(unique)))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for texts, future in batch:
+            future.set_result([computed[text] for text in texts])
+
+    def _encode_now(self, texts):
+        vectors = np.asarray(self.model_loader().encode(texts), dtype=np.float32)
+        vectors.setflags(write=False)
+        with self._lock:
+            self.batches += 1
+            self.batched_texts += len(texts)
+        return list(vectors)
+
+    def stats(self):
+        return {
+            "cache_size": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "batches": self.batches,
+            "batched_texts": self.batched_texts
+        }
+
+
+embedding_service = EmbeddingService(get_embedding_model)
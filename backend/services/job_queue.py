@@ -0,0 +1,489 @@
+"""Background analysis jobs: a SQLite queue shared by the web and worker processes.
+
+With JOB_QUEUE_ENABLED=1, ``/analyze`` and ``/analyze/batch`` enqueue a
+job and answer 202 with its id; ``/jobs/<id>`` reports its state, stage
+progress and, once done, the result, and ``/jobs/<id>/events`` streams
+the same as server-sent events.
+
+Jobs run in JOB_WORKERS local processes. The first web process to take
+the lock next to JOB_DB starts them; with JOB_WORKERS=0 run them
+separately with ``python -m services.job_queue``. No broker is needed:
+every process opens the same SQLite file (WAL mode) and claims jobs with
+a single write transaction.
+
+At most JOB_QUEUE_MAX jobs wait at a time; beyond that ``enqueue``
+raises QueueFull and the apps answer 429. Single and batch jobs queue in
+separate lanes: a free worker takes from the lane with fewer running
+jobs, the older job on a tie, so a large batch never holds up single
+analyses and a stream of single analyses never starves a batch.
+"""
+import fcntl
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from services.report_store import REPORT_STORAGE
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---------------- Config ----------------
+JOB_QUEUE_ENABLED = os.environ.get("JOB_QUEUE_ENABLED", "0") == "1"
+JOB_DB = os.environ.get("JOB_DB", os.path.join(BASE_DIR, "jobs", "jobs.sqlite3"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_QUEUE_MAX = int(os.environ.get("JOB_QUEUE_MAX", "100"))
+JOB_RETRY_AFTER_SECONDS = int(os.environ.get("JOB_RETRY_AFTER_SECONDS", "5"))
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", "0.2"))
+# A running job whose worker has not reported for this long is retried (or failed)
+JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "2"))
+# Finished jobs (and their results) are kept this long
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", "3600"))
+JOB_EVENTS_POLL_SECONDS = float(os.environ.get("JOB_EVENTS_POLL_SECONDS", "0.5"))
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+# An event stream holds a sync (WSGI) worker, so there it is closed after this long
+# and the client reconnects; the ASGI stream has no limit
+JOB_EVENTS_MAX_SECONDS = float(os.environ.get("JOB_EVENTS_MAX_SECONDS", "30"))
+JOB_EVENTS_RETRY_MS = 1000
+
+if JOB_QUEUE_ENABLED and REPORT_STORAGE == "memory":
+    raise ValueError("JOB_QUEUE_ENABLED=1 needs REPORT_STORAGE=disk: job workers store the reports")
+
+JOB_KINDS = ("single", "batch")
+_HEARTBEAT_SECONDS = 5
+_SWEEP_SECONDS = 60
+
+
+class QueueFull(Exception):
+    """Raised by ``enqueue`` when JOB_QUEUE_MAX jobs are already waiting."""
+
+
+# ---------------- Queue ----------------
+class JobQueue:
+    """Jobs, their uploaded inputs and their progress in one SQLite file.
+
+    Safe to share between threads; every process opens its own instance.
+    """
+
+    def __init__(self, path, max_queued=JOB_QUEUE_MAX):
+        self.path = path
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Transactions are begun explicitly, so claiming can take the write lock up front
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                state TEXT NOT NULL,
+                params TEXT NOT NULL,
+                stage TEXT,
+                progress TEXT,
+                result TEXT,
+                error TEXT,
+                status_code INTEGER,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created REAL NOT NULL,
+                started REAL,
+                finished REAL,
+                heartbeat REAL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (state, kind, created)")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS job_inputs (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                name TEXT,
+                data BLOB NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            )
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        # Caller holds self._lock; IMMEDIATE takes the write lock before the first read
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, kind, params, inputs):
+        """Queue a job with ``inputs`` [(name, bytes), ...]; returns its id or raises QueueFull."""
+        job_id = str(uuid.uuid4())
+        with self._lock, self._transaction() as db:
+            queued = db.execute("SELECT COUNT(*) FROM jobs WHERE state = 'queued'").fetchone()[0]
+            if queued >= self.max_queued:
+                raise QueueFull(f"{queued} jobs are already waiting")
+            db.execute(
+                "INSERT INTO jobs (job_id, kind, state, params, stage, created) VALUES (?, ?, 'queued', ?, 'queued', ?)",
+                (job_id, kind, json.dumps(params), time.time())
+            )
+            db.executemany(
+                "INSERT INTO job_inputs (job_id, seq, name, data) VALUES (?, ?, ?, ?)",
+                [(job_id, seq, name, data) for seq, (name, data) in enumerate(inputs)]
+            )
+        return job_id
+
+    def claim(self):
+        """Take the next job for this worker: ``(job_id, kind, params, inputs)``, or None."""
+        now = time.time()
+        with self._lock, self._transaction() as db:
+            self._recover_stale_locked(now)
+            running = dict(db.execute("SELECT kind, COUNT(*) FROM jobs WHERE state = 'running' GROUP BY kind"))
+            # Oldest waiting job per lane; fewer running first, then the older job
+            heads = [
+                row for row in (
+                    db.execute(
+                        "SELECT job_id, kind, params, created FROM jobs WHERE state = 'queued' AND kind = ? "
+                        "ORDER BY created LIMIT 1", (kind,)
+                    ).fetchone()
+                    for kind in JOB_KINDS
+                ) if row
+            ]
+            if not heads:
+                return None
+            job_id, kind, params, _ = min(heads, key=lambda row: (running.get(row[1], 0), row[3]))
+            db.execute(
+                "UPDATE jobs SET state = 'running', stage = 'started', attempts = attempts + 1, "
+                "started = ?, heartbeat = ? WHERE job_id = ?",
+                (now, now, job_id)
+            )
+            inputs = db.execute("SELECT name, data FROM job_inputs WHERE job_id = ? ORDER BY seq", (job_id,)).fetchall()
+        return job_id, kind, json.loads(params), inputs
+
+    def _recover_stale_locked(self, now):
+        # Caller holds the lock, inside a transaction. Jobs of workers that
+        # died mid-run go back to the queue, up to JOB_MAX_ATTEMPTS runs
+        cutoff = now - JOB_STALE_SECONDS
+        self._db.execute(
+            "UPDATE jobs SET state = 'queued', stage = 'queued' "
+            "WHERE state = 'running' AND heartbeat < ? AND attempts < ?",
+            (cutoff, JOB_MAX_ATTEMPTS)
+        )
+        stale = [row[0] for row in self._db.execute(
+            "SELECT job_id FROM jobs WHERE state = 'running' AND heartbeat < ?", (cutoff,)
+        )]
+        for job_id in stale:
+            self._finish_locked(job_id, "failed", None, "The job's worker stopped responding", 500, now)
+
+    def update(self, job_id, stage=None, progress=None):
+        """Record progress of a running job (and that its worker is alive)."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET stage = COALESCE(?, stage), progress = COALESCE(?, progress), heartbeat = ? "
+                "WHERE job_id = ? AND state = 'running'",
+                (stage, json.dumps(progress) if progress is not None else None, time.time(), job_id)
+            )
+
+    def finish(self, job_id, result):
+        with self._lock, self._transaction():
+            self._finish_locked(job_id, "done", result, None, None, time.time())
+
+    def fail(self, job_id, error, status_code=500):
+        with self._lock, self._transaction():
+            self._finish_locked(job_id, "failed", None, error, status_code, time.time())
+
+    def _finish_locked(self, job_id, state, result, error, status_code, now):
+        # Caller holds the lock, inside a transaction
+        self._db.execute(
+            "UPDATE jobs SET state = ?, stage = ?, result = ?, error = ?, status_code = ?, finished = ? "
+            "WHERE job_id = ?",
+            (state, state, json.dumps(result) if result is not None else None, error, status_code, now, job_id)
+        )
+        self._db.execute("DELETE FROM job_inputs WHERE job_id = ?", (job_id,))
+
+    def get(self, job_id):
+        """The job as a dict (without inputs), or None if unknown or expired."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT job_id, kind, state, stage, progress, result, error, status_code, created, started, finished "
+                "FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            position = None
+            if row[2] == "queued":
+                position = self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE state = 'queued' AND kind = ? AND created < ?", (row[1], row[8])
+                ).fetchone()[0]
+        job = dict(zip(
+            ("job_id", "kind", "state", "stage", "progress", "result", "error", "status_code",
+             "created", "started", "finished"), row
+        ))
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else None
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["queue_position"] = position
+        return job
+
+    def sweep(self, retention=JOB_RETENTION_SECONDS):
+        """Drop finished jobs older than ``retention`` seconds."""
+        with self._lock:
+            return self._db.execute(
+                "DELETE FROM jobs WHERE state IN ('done', 'failed') AND finished < ?", (time.time() - retention,)
+            ).rowcount
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "max_queued": self.max_queued
+        }
+
+
+_queue = None
+_queue_pid = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """This process's connection to the queue, opened on first use (after forks)."""
+    global _queue, _queue_pid
+    if not JOB_QUEUE_ENABLED:
+        return None
+    with _queue_lock:
+        if _queue is None or _queue_pid != os.getpid():
+            _queue = JobQueue(JOB_DB)
+            _queue_pid = os.getpid()
+        return _queue
+
+
+# ---------------- Submitting ----------------
+def submit_analysis_job(resume_bytes, job_description, selected_role=None, filename=None):
+    """Queue one resume; returns the job id. Raises QueueFull."""
+    start_job_workers()
+    params = {"job_description": job_description, "role": selected_role, "filename": filename}
+    return get_job_queue().enqueue("single", params, [(filename, resume_bytes)])
+
+
+def submit_batch_job(resumes, rejected, job_description, selected_role=None):
+    """Queue a batch of ``(candidate_id, pdf_bytes)``; returns the job id. Raises QueueFull."""
+    start_job_workers()
+    params = {"job_description": job_description, "role": selected_role, "rejected": rejected}
+    return get_job_queue().enqueue("batch", params, resumes)
+
+
+def job_status(job_id):
+    """Public view of a job for ``/jobs/<id>``, or None if unknown or expired."""
+    queue = get_job_queue()
+    job = queue.get(job_id) if queue else None
+    if job is None:
+        return None
+    status = {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "state": job["state"],
+        "stage": job["stage"],
+        "progress": job["progress"],
+    }
+    if job["state"] == "queued":
+        status["queue_position"] = job["queue_position"]
+    if job["state"] == "done":
+        status["result"] = job["result"]
+    if job["state"] == "failed":
+        status["error"] = job["error"]
+        status["status_code"] = job["status_code"]
+    return status
+
+
+def is_finished(status):
+    return status["state"] in ("done", "failed")
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def next_job_event(status, last_status):
+    """The event to send for ``status`` after ``last_status`` (None if unchanged).
+
+    ``progress`` for every change while the job waits or runs, then a
+    final ``done`` or ``failed`` carrying the whole status.
+    """
+    if status is None:
+        return sse_event("failed", {"state": "failed", "error": "Job not found", "status_code": 404})
+    if is_finished(status):
+        return sse_event(status["state"], status)
+    if status != last_status:
+        return sse_event("progress", status)
+    return None
+
+
+def job_events(job_id, view=None, max_seconds=None):
+    """Server-sent events following a job until it finishes (blocking; polls the queue).
+
+    ``view`` may adjust each status before it is sent. After ``max_seconds``
+    an unfinished job gets a ``reconnect`` event and the stream ends;
+    EventSource reconnects after ``retry`` and is sent the current progress.
+    """
+    started = last_sent = time.monotonic()
+    last_status = None
+    while True:
+        status = job_status(job_id)
+        if status is not None and view:
+            status = view(status)
+        event = next_job_event(status, last_status)
+        if event:
+            yield event
+            last_sent = time.monotonic()
+            if status is None or is_finished(status):
+                return
+        elif time.monotonic() - last_sent > JOB_EVENTS_KEEPALIVE_SECONDS:
+            yield ": keepalive\n\n"
+            last_sent = time.monotonic()
+        last_status = status
+        if max_seconds is not None and time.monotonic() - started >= max_seconds:
+            yield f"retry: {JOB_EVENTS_RETRY_MS}\n" + sse_event("reconnect", {"state": status["state"]})
+            return
+        time.sleep(JOB_EVENTS_POLL_SECONDS)
+
+
+def job_queue_stats():
+    queue = get_job_queue()
+    return queue.stats() if queue else None
+
+
+# ---------------- Workers ----------------
+def _run_single(queue, job_id, params, inputs):
+    from services.pipeline import run_analysis
+    from utils.metrics import start_request
+
+    stages = {}
+
+    class StageProgress(list):
+        # Every stage timed by the pipeline is reported as progress
+        def append(self, item):
+            super().append(item)
+            stage, seconds = item
+            stages[stage] = round(stages.get(stage, 0.0) + seconds * 1000, 1)
+            queue.update(job_id, stage, {"stages_ms": stages})
+
+    start_request(StageProgress())
+    (_, resume_bytes), = inputs
+    return run_analysis(resume_bytes, params["job_description"], params["role"], params["filename"])
+
+
+def _run_batch(queue, job_id, params, inputs):
+    from services.pipeline import run_batch_analysis
+
+    total = len(inputs) + len(params["rejected"])
+    candidates, done = [], 0
+    queue.update(job_id, "analysis", {"total": total, "done": 0})
+    for item in run_batch_analysis(inputs, params["rejected"], params["job_description"], params["role"]):
+        if item["type"] == "ranking":
+            return {"candidates": candidates, **item}
+        candidates.append(item)
+        done += 1
+        queue.update(job_id, "analysis", {"total": total, "done": done, "last_candidate": item["candidate_id"]})
+
+
+def run_worker():
+    """Claim and run jobs, forever."""
+    from models.embeddings import warm_up
+    from services.pipeline import AnalysisError
+    from utils.taxonomy import get_taxonomy
+
+    warm_up()
+    get_taxonomy().warm()
+    queue = get_job_queue()
+    current = {"job_id": None}
+
+    def heartbeat():
+        # Long stages (a big batch) report rarely; keep the job from looking stale
+        while True:
+            time.sleep(_HEARTBEAT_SECONDS)
+            if current["job_id"]:
+                queue.update(current["job_id"])
+
+    threading.Thread(target=heartbeat, name="job-heartbeat", daemon=True).start()
+    last_sweep = 0.0
+    while True:
+        if time.time() - last_sweep > _SWEEP_SECONDS:
+            queue.sweep()
+            last_sweep = time.time()
+        job = queue.claim()
+        if job is None:
+            time.sleep(JOB_POLL_SECONDS)
+            continue
+
+        job_id, kind, params, inputs = job
+        current["job_id"] = job_id
+        try:
+            runner = _run_batch if kind == "batch" else _run_single
+            queue.finish(job_id, runner(queue, job_id, params, inputs))
+        except AnalysisError as e:
+            queue.fail(job_id, str(e), e.status_code)
+        except Exception as e:
+            print("❌ Job failed:", str(e))
+            queue.fail(job_id, f"Internal Server Error: {e}", 500)
+        finally:
+            current["job_id"] = None
+
+
+def _worker_main():
+    # Each job worker is a whole process already; extract PDFs in it rather
+    # than in a pool of its own (a daemon process cannot have children).
+    # Spawn has already imported the parent's __main__, and with it
+    # pdf_extractor, so the setting is changed on the module itself.
+    from services import pdf_extractor
+
+    pdf_extractor.PDF_WORKERS = 0
+    run_worker()
+
+
+_workers = []
+_owner_lock_file = None
+_workers_lock = threading.Lock()
+
+
+def start_job_workers(count=JOB_WORKERS):
+    """Start the local worker processes, unless another process already runs them.
+
+    Ownership is an exclusive lock on a file next to JOB_DB, released when
+    the owner exits, so after a restart the next caller takes over.
+    Workers that died are replaced. Cheap enough to call per request.
+    """
+    global _owner_lock_file
+    if not JOB_QUEUE_ENABLED or count <= 0:
+        return
+    with _workers_lock:
+        if _owner_lock_file is None:
+            os.makedirs(os.path.dirname(JOB_DB) or ".", exist_ok=True)
+            lock_file = open(f"{JOB_DB}.workers.lock", "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return
+            _owner_lock_file = lock_file
+
+        _workers[:] = [worker for worker in _workers if worker.is_alive()]
+        # Spawned, not forked: the embedding model's thread pools do not survive a fork
+        context = multiprocessing.get_context("spawn")
+        while len(_workers) < count:
+            worker = context.Process(target=_worker_main, name="job-worker", daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+
+if __name__ == "__main__":
+    # Standalone workers for JOB_WORKERS=0 deployments: python -m services.job_queue
+    if not JOB_QUEUE_ENABLED:
+        raise SystemExit("Set JOB_QUEUE_ENABLED=1 to run job workers")
+    print(f"👷 Running job worker on {JOB_DB}")
+    run_worker()
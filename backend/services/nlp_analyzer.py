@@ -1,9 +1,18 @@
+import os
 import re
-from utils.skills import (
-    extract_skills, infer_role, extract_soft_skills, extract_certifications,
-    get_role_responsibilities, ROLE_SKILLS, get_role_keywords
-)
-from utils.scoring import semantic_similarity, calculate_skills_score
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from utils.skills import get_role_responsibilities, get_role_keywords
+from utils.taxonomy import get_taxonomy
+from utils.cache import LRUCache, content_key
+from utils.metrics import timed
+from utils.scoring import embedding_similarity, calculate_skills_score, reference_embedding
+
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "4"))
+JOB_PROFILE_CACHE_SIZE = int(os.environ.get("JOB_PROFILE_CACHE_SIZE", "256"))
+RESUME_MAX_CHARS = int(os.environ.get("RESUME_MAX_CHARS", "60000"))
+RESUME_MAX_PAGES = int(os.environ.get("RESUME_MAX_PAGES", "20"))
 
 # ---------------- Helpers ----------------
 def clean_text(text):
@@ -27,43 +36,323 @@ def has_degree(resume_text):
     return any(word in resume_text for word in degree_keywords)
 
 
+# ---------------- Job Profile ----------------
+class JobProfile:
+    """All JD-side analysis results, computed once and shared across resumes.
+
+    Skill requirements are also kept as bitsets over the taxonomy's
+    ``term_bits`` vocabularies, so each resume is compared with a few
+    integer operations.
+    """
+
+    __slots__ = (
+        "key", "taxonomy", "jd_text", "selected_role", "role_detected", "role_scores", "role_keywords",
+        "key_responsibilities", "recommended_keywords", "jd_skills",
+        "soft_skills_needed", "certs_needed", "jd_embedding",
+        "role_skill_bits", "jd_skill_bits", "soft_skill_bits", "cert_bits"
+    )
+
+    def __init__(self, jd_text, selected_role=None):
+        taxonomy = get_taxonomy()
+        jd_text = clean_text(jd_text)
+        role_scores = taxonomy.role_model.rank(jd_text, 3)
+        role_detected = selected_role or (role_scores[0]["role"] if role_scores else "general")
+        role_keywords = frozenset(taxonomy.role_skills.get(role_detected, []))
+
+        skill_bits = taxonomy.term_bits("skill")
+        self.role_skill_bits = taxonomy.role_skill_bits.get(role_detected, 0)
+        if jd_text.strip():
+            self.jd_skill_bits = taxonomy.skill_matcher.extract_bits(jd_text)
+        else:
+            self.jd_skill_bits = self.role_skill_bits
+        self.soft_skill_bits = taxonomy.soft_skill_matcher.extract_bits(jd_text)
+        self.cert_bits = taxonomy.certification_matcher.extract_bits(jd_text)
+
+        self.key = job_profile_key(jd_text, selected_role)
+        self.taxonomy = taxonomy
+        self.jd_text = jd_text
+        self.selected_role = selected_role
+        self.role_detected = role_detected
+        self.role_scores = role_scores
+        self.role_keywords = role_keywords
+        self.key_responsibilities = get_role_responsibilities(role_detected)
+        self.recommended_keywords = get_role_keywords(role_detected)
+        self.jd_skills = skill_bits.decode(self.jd_skill_bits)
+        self.soft_skills_needed = taxonomy.term_bits("soft_skill").decode(self.soft_skill_bits)
+        self.certs_needed = taxonomy.term_bits("certification").decode(self.cert_bits)
+        self.jd_embedding = reference_embedding(jd_text) if jd_text.strip() else None
+
+
+def job_profile_key(jd_text, selected_role=None):
+    # Profiles (and the results cached under them) are tied to one taxonomy build
+    return content_key(clean_text(jd_text), selected_role or "", get_taxonomy().build_id)
+
+
+_job_profiles = LRUCache(JOB_PROFILE_CACHE_SIZE)
+
+
+def get_job_profile(jd_text, selected_role=None):
+    """Return the cached JobProfile for this JD and role, building it on a miss."""
+    key = job_profile_key(jd_text, selected_role)
+    profile = _job_profiles.get(key)
+    if profile is None:
+        profile = JobProfile(jd_text, selected_role)
+        _job_profiles.put(key, profile)
+    return profile
+
+
+def job_profile_cache_stats():
+    return _job_profiles.stats()
+
+
+# ---------------- Streaming Resume Scan ----------------
+class ResumeScan:
+    """Resume text and skill matches accumulated page by page.
+
+    Each page is matched as it arrives, together with the tail of the text
+    before it so terms broken across a page are still found. ``feed``
+    returns False once the character or page budget is used up.
+    ``clean_seconds`` and ``match_seconds`` add up the time spent
+    cleaning and matching, which happens between page extractions.
+    """
+
+    __slots__ = (
+        "taxonomy", "max_chars", "max_pages", "pages", "chars", "truncated",
+        "skill_bits", "soft_skill_bits", "cert_bits", "clean_seconds", "match_seconds", "_parts", "_tail",
+        "_tail_start"
+    )
+
+    def __init__(self, max_chars=RESUME_MAX_CHARS, max_pages=RESUME_MAX_PAGES):
+        # Pinned for the whole scan, even if the taxonomy is reloaded meanwhile
+        self.taxonomy = get_taxonomy()
+        self.max_chars = max_chars
+        self.max_pages = max_pages
+        self.pages = 0
+        self.chars = 0
+        self.truncated = False
+        self.skill_bits = 0
+        self.soft_skill_bits = 0
+        self.cert_bits = 0
+        self.clean_seconds = 0.0
+        self.match_seconds = 0.0
+        self._parts = []
+        self._tail = ""
+        self._tail_start = 0
+
+    def feed(self, page_text):
+        if self.pages >= self.max_pages or self.chars >= self.max_chars:
+            self.truncated = True
+            return False
+
+        started = time.perf_counter()
+        text = clean_text(page_text)
+        self.clean_seconds += time.perf_counter() - started
+        if not text:
+            return True
+        room = self.max_chars - self.chars - (1 if self._parts else 0)
+        if len(text) > room:
+            # Cut at a word boundary so no partial word can match
+            cut = text.rfind(" ", 0, room + 1)
+            text = text[:cut] if cut > 0 else ""
+            self.truncated = True
+            if not text:
+                return False
+
+        window = f"{self._tail} {text}" if self._tail else text
+        pos = self._tail_start
+        taxonomy = self.taxonomy
+        started = time.perf_counter()
+        self.skill_bits |= taxonomy.skill_matcher.extract_bits(window, pos)
+        self.soft_skill_bits |= taxonomy.soft_skill_matcher.extract_bits(window, pos)
+        self.cert_bits |= taxonomy.certification_matcher.extract_bits(window, pos)
+        self.match_seconds += time.perf_counter() - started
+
+        self._parts.append(text)
+        self.chars += len(text) + (1 if len(self._parts) > 1 else 0)
+        self.pages += 1
+        keep = taxonomy.scan_overlap + 1
+        # A cut tail starts mid-text: its first character only serves the word-boundary
+        # lookbehind. An uncut tail is the whole document so far and starts a term.
+        self._tail = window[-keep:]
+        self._tail_start = 1 if len(window) > keep else 0
+        return not self.truncated
+
+    @property
+    def text(self):
+        return " ".join(self._parts)
+
+    @property
+    def skills(self):
+        return set(self.taxonomy.term_bits("skill").decode(self.skill_bits))
+
+    @property
+    def soft_skills(self):
+        return set(self.taxonomy.term_bits("soft_skill").decode(self.soft_skill_bits))
+
+    @property
+    def certifications(self):
+        return set(self.taxonomy.term_bits("certification").decode(self.cert_bits))
+
+
+def scan_resume(pages, max_chars=RESUME_MAX_CHARS, max_pages=RESUME_MAX_PAGES):
+    """Consume page texts until the budget is hit; returns a ResumeScan.
+
+    Closes ``pages`` when done, so a generator-based extractor stops
+    extracting the pages that were not needed.
+    """
+    scan = ResumeScan(max_chars, max_pages)
+    try:
+        for page_text in pages:
+            if not scan.feed(page_text):
+                break
+    finally:
+        close = getattr(pages, "close", None)
+        if close:
+            close()
+    return scan
+
+
+def resume_text_and_skills(resume):
+    """Cleaned text and technical skills of raw resume text or a ResumeScan."""
+    if isinstance(resume, ResumeScan):
+        return resume.text, resume.skills
+    resume_text = clean_text(resume)
+    return resume_text, get_taxonomy().skill_matcher.extract(resume_text)
+
+
 # ---------------- Main Analyzer ----------------
-def analyze_resume(resume_text, jd_text, selected_role=None):
-    resume_text = clean_text(resume_text)
-    jd_text = clean_text(jd_text)
-    role_detected = selected_role if selected_role else infer_role(jd_text)
-    role_keywords = set(ROLE_SKILLS.get(role_detected, []))
-    key_responsibilities = get_role_responsibilities(role_detected)
-    recommended_keywords = get_role_keywords(role_detected)
-
-    resume_skills = extract_skills(resume_text)
-    if jd_text.strip():
-        jd_skills = extract_skills(jd_text)
-    else:
-        jd_skills = list(role_keywords)
+def analyze_resume_batch(resumes, jd_text, selected_role=None, max_workers=BATCH_WORKERS, on_analyzed=None):
+    """Analyze many resumes against one job description.
+
+    ``resumes`` is an iterable of ``(candidate_id, resume)`` pairs where
+    ``resume`` is either text or a Future resolving to text (e.g. from the
+    PDF extraction pool). ``jd_text`` may also be a prebuilt JobProfile.
+    Yields one result dict per candidate as soon as it finishes; concurrent
+    analyses share embedding batches. ``on_analyzed(candidate_id,
+    resume_text, analysis)`` is called from the worker thread after each
+    successful analysis.
+    """
+    profile = jd_text if isinstance(jd_text, JobProfile) else get_job_profile(jd_text, selected_role)
+
+    def analyze(candidate_id, resume_text):
+        analysis = analyze_resume(resume_text, profile)
+        if on_analyzed:
+            on_analyzed(candidate_id, resume_text, analysis)
+        return analysis
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+        for candidate_id, resume in resumes:
+            if isinstance(resume, Future):
+                pending[resume] = ("extract", candidate_id)
+            else:
+                pending[pool.submit(analyze, candidate_id, resume)] = ("analyze", candidate_id)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, candidate_id = pending.pop(future)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    yield {"candidate_id": candidate_id, "status": "error", "error": str(e)}
+                    continue
+
+                if stage == "analyze":
+                    yield _candidate_result(candidate_id, value)
+                elif not value or not value.strip():
+                    yield {"candidate_id": candidate_id, "status": "error",
+                           "error": "Unable to extract text from resume PDF"}
+                else:
+                    pending[pool.submit(analyze, candidate_id, value)] = ("analyze", candidate_id)
+
+
+def _candidate_result(candidate_id, analysis):
+    skills = analysis["skills"]
+    return {
+        "candidate_id": candidate_id,
+        "status": "success",
+        "overall_score": analysis["overall_score"],
+        "score_breakdown": analysis["score_breakdown"],
+        "techstack_coverage": analysis["techstack_coverage"],
+        "semantic_score": analysis["semantic_score"],
+        "profile_type": analysis["profile_type"],
+        "matched_skills": [s for s in skills["matched_skills"] if not s.startswith(("No ", "Review "))],
+        "missing_skills": [s for s in skills["missing_skills"] if not s.startswith(("No ", "Review "))]
+    }
 
-    resume_soft_skills = extract_soft_skills(resume_text)
-    resume_certs = extract_certifications(resume_text)
 
-    matched_skills = list(set(resume_skills) & set(jd_skills))
-    missing_skills = list(set(jd_skills) - set(resume_skills))
-    extra_skills = list(set(resume_skills) - set(jd_skills))
+def rank_candidates(results):
+    """Order successful batch results by overall score, best first."""
+    ranked = sorted(
+        (r for r in results if r.get("status") == "success"),
+        key=lambda r: (r["overall_score"], r["semantic_score"] or 0),
+        reverse=True
+    )
+    return [dict(r, rank=i) for i, r in enumerate(ranked, start=1)]
+
 
-    matched_role_skills = list(set(resume_skills) & role_keywords)
-    missing_role_skills = list(role_keywords - set(resume_skills))
+def analyze_resume(resume_text, jd_text, selected_role=None):
+    """Analyze a resume against a job description.
+
+    ``resume_text`` may be raw text or a ResumeScan whose skills were
+    already matched page by page. ``jd_text`` may be raw text or a
+    JobProfile; passing a profile skips all JD-side work (``selected_role``
+    is then taken from the profile).
+    """
+    profile = jd_text if isinstance(jd_text, JobProfile) else JobProfile(jd_text, selected_role)
+    taxonomy = profile.taxonomy
+    skill_bits = taxonomy.term_bits("skill")
+    soft_skill_bits = taxonomy.term_bits("soft_skill")
+    cert_bits = taxonomy.term_bits("certification")
+    if isinstance(resume_text, ResumeScan):
+        scan = resume_text
+        resume_text = scan.text
+        if scan.taxonomy is taxonomy:
+            resume_bits = (scan.skill_bits, scan.soft_skill_bits, scan.cert_bits)
+        else:
+            # The taxonomy was reloaded between the scan and the profile
+            resume_bits = (skill_bits.encode(scan.skills), soft_skill_bits.encode(scan.soft_skills),
+                           cert_bits.encode(scan.certifications))
+    else:
+        with timed("clean_text"):
+            resume_text = clean_text(resume_text)
+        with timed("skill_extraction"):
+            resume_bits = (
+                taxonomy.skill_matcher.extract_bits(resume_text),
+                taxonomy.soft_skill_matcher.extract_bits(resume_text),
+                taxonomy.certification_matcher.extract_bits(resume_text)
+            )
+    resume_skill_bits, resume_soft_skill_bits, resume_cert_bits = resume_bits
+    resume_soft_skills = soft_skill_bits.decode(resume_soft_skill_bits)
+    resume_certs = cert_bits.decode(resume_cert_bits)
+
+    selected_role = profile.selected_role
+    role_detected = profile.role_detected
+    role_keywords = profile.role_keywords
+    key_responsibilities = profile.key_responsibilities
+    recommended_keywords = profile.recommended_keywords
+    jd_skills = profile.jd_skills
+    soft_skills_needed = profile.soft_skills_needed
+    certs_needed = profile.certs_needed
+
+    matched_skills = skill_bits.decode(resume_skill_bits & profile.jd_skill_bits)
+    missing_skills = skill_bits.decode(profile.jd_skill_bits & ~resume_skill_bits)
+
+    matched_role_skills = skill_bits.decode(resume_skill_bits & profile.role_skill_bits)
+    missing_role_skills = skill_bits.decode(profile.role_skill_bits & ~resume_skill_bits)
     techstack_coverage = round((len(matched_role_skills) / len(role_keywords)) * 100, 2) if role_keywords else 0.0
 
-    soft_skills_needed = extract_soft_skills(jd_text)
-    matched_soft_skills = list(set(resume_soft_skills) & set(soft_skills_needed))
-    missing_soft_skills = list(set(soft_skills_needed) - set(resume_soft_skills))
+    matched_soft_skills = soft_skill_bits.decode(resume_soft_skill_bits & profile.soft_skill_bits)
+    missing_soft_skills = soft_skill_bits.decode(profile.soft_skill_bits & ~resume_soft_skill_bits)
 
-    certs_needed = extract_certifications(jd_text)
-    matched_certs = list(set(resume_certs) & set(certs_needed))
-    missing_certs = list(set(certs_needed) - set(resume_certs))
+    matched_certs = cert_bits.decode(resume_cert_bits & profile.cert_bits)
+    missing_certs = cert_bits.decode(profile.cert_bits & ~resume_cert_bits)
 
     # Use semantic similarity for overall match if job description is provided
-    if jd_text.strip():
-        semantic_score = semantic_similarity(resume_text, jd_text)
+    if profile.jd_embedding is not None:
+        with timed("semantic_similarity"):
+            semantic_score = embedding_similarity(resume_text, profile.jd_embedding)
     else:
         semantic_score = None
 
@@ -323,8 +612,10 @@ def analyze_resume(resume_text, jd_text, selected_role=None):
     analysis = {
         "selected_role": selected_role or "",
         "role_detected": role_detected or "",
+        "role_scores": profile.role_scores,
         "profile_type": "Fresher" if detect_fresher(resume_text) else "Experienced",
         "overall_score": round(float(overall_score), 2),
+        "semantic_score": semantic_score,
         "score_breakdown": {
             "skills_match": round(float(skills_score), 2),
             "experience_match": round(float(experience_score), 2),
@@ -0,0 +1,185 @@
+"""Interchangeable PDF text extraction backends.
+
+Every backend opens a document from bytes and returns the text of one
+page at a time, so ``pdf_extractor`` can split a document into page
+ranges the same way whichever library does the work. Pick them with
+``PDF_BACKENDS``, a comma-separated list tried in order:
+
+- ``pypdf2``      PyPDF2, pure Python (reference implementation)
+- ``pypdfium2``   PDFium bindings; much faster, needs ``pypdfium2``
+- ``pymupdf``     MuPDF bindings; much faster, needs ``pymupdf``
+- ``pdfminer``    pdfminer.six layout analysis; slower than PyPDF2 but
+                  keeps reading order on multi-column pages
+
+A later backend is used for a page range when an earlier one fails on it
+or finds no text at all. Backends whose library is not installed are
+skipped with a warning.
+"""
+import io
+
+
+class PdfBackend:
+    """Minimal interface: ``open(data)`` returns a PdfDocument."""
+
+    name = "base"
+
+    def open(self, data):
+        raise NotImplementedError
+
+
+class PdfDocument:
+    """An open document; ``close`` releases whatever the library holds."""
+
+    page_count = 0
+
+    def page_text(self, index):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PyPdf2Document(PdfDocument):
+    def __init__(self, data):
+        from PyPDF2 import PdfReader
+        self.reader = PdfReader(io.BytesIO(data))
+        self.page_count = len(self.reader.pages)
+
+    def page_text(self, index):
+        return self.reader.pages[index].extract_text() or ""
+
+
+class PyPdf2Backend(PdfBackend):
+    name = "pypdf2"
+
+    def __init__(self):
+        import PyPDF2  # noqa: F401
+
+    def open(self, data):
+        return PyPdf2Document(data)
+
+
+class PdfiumDocument(PdfDocument):
+    def __init__(self, pdfium, data):
+        self.pdf = pdfium.PdfDocument(data)
+        self.page_count = len(self.pdf)
+
+    def page_text(self, index):
+        page = self.pdf[index]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range()
+        finally:
+            textpage.close()
+            page.close()
+
+    def close(self):
+        self.pdf.close()
+
+
+class PdfiumBackend(PdfBackend):
+    name = "pypdfium2"
+
+    def __init__(self):
+        import pypdfium2
+        self.pdfium = pypdfium2
+
+    def open(self, data):
+        return PdfiumDocument(self.pdfium, data)
+
+
+class MuPdfDocument(PdfDocument):
+    def __init__(self, pymupdf, data):
+        self.doc = pymupdf.open(stream=data, filetype="pdf")
+        self.page_count = self.doc.page_count
+
+    def page_text(self, index):
+        return self.doc[index].get_text()
+
+    def close(self):
+        self.doc.close()
+
+
+class MuPdfBackend(PdfBackend):
+    name = "pymupdf"
+
+    def __init__(self):
+        try:
+            import pymupdf
+        except ImportError:
+            # Releases before 1.24.3 only have the old module name
+            import fitz as pymupdf
+        self.pymupdf = pymupdf
+
+    def open(self, data):
+        return MuPdfDocument(self.pymupdf, data)
+
+
+class PdfMinerDocument(PdfDocument):
+    def __init__(self, data):
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+
+        self.document = PDFDocument(PDFParser(io.BytesIO(data)))
+        self.pages = list(PDFPage.create_pages(self.document))
+        self.page_count = len(self.pages)
+        self.resources = PDFResourceManager(caching=True)
+
+    def page_text(self, index):
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter
+
+        out = io.StringIO()
+        device = TextConverter(self.resources, out, laparams=LAParams())
+        try:
+            PDFPageInterpreter(self.resources, device).process_page(self.pages[index])
+        finally:
+            device.close()
+        return out.getvalue()
+
+
+class PdfMinerBackend(PdfBackend):
+    name = "pdfminer"
+
+    def __init__(self):
+        import pdfminer  # noqa: F401
+
+    def open(self, data):
+        return PdfMinerDocument(data)
+
+
+PDF_BACKENDS = {
+    backend.name: backend
+    for backend in (PyPdf2Backend, PdfiumBackend, MuPdfBackend, PdfMinerBackend)
+}
+
+
+def register_backend(name, factory):
+    """Add a backend; ``factory()`` must return a PdfBackend."""
+    PDF_BACKENDS[name] = factory
+
+
+def parse_backend_names(value):
+    names = [name.strip().lower() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in PDF_BACKENDS]
+    if unknown or not names:
+        raise ValueError(
+            f"Unknown PDF backend {', '.join(unknown) or value!r}; choose from {', '.join(PDF_BACKENDS)}"
+        )
+    return names
+
+
+def load_backends(names):
+    """Instantiate the installed backends among ``names``, keeping their order."""
+    backends = []
+    for name in names:
+        try:
+            backends.append(PDF_BACKENDS[name]())
+        except ImportError as e:
+            print(f"⚠️ PDF backend {name} is not available ({e}); skipping it")
+    if not backends:
+        raise ValueError(f"None of the PDF backends {', '.join(names)} is installed")
+    return backends
@@ -1,12 +1,234 @@
-from PyPDF2 import PdfReader
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from services.pdf_backends import load_backends, parse_backend_names
+
+# ---------------- Config ----------------
+# PDF_WORKERS=0 extracts in the calling thread (no process pool)
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_MAX_BYTES = int(os.environ.get("PDF_MAX_MB", "10")) * 1024 * 1024
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "50"))
+PDF_PAGES_PER_TASK = int(os.environ.get("PDF_PAGES_PER_TASK", "8"))
+PDF_TIMEOUT_SECONDS = float(os.environ.get("PDF_TIMEOUT_SECONDS", "20"))
+# Tried in order per page range; see services.pdf_backends
+PDF_BACKENDS = parse_backend_names(os.environ.get("PDF_BACKENDS", "pypdf2"))
+
+_backends = None
+_pool = None
+_coordinator = None
+_pool_lock = threading.Lock()
+
+
+class PdfExtractionError(Exception):
+    """Raised when a PDF is rejected or cannot be processed in time."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _Deadline(Exception):
+    pass
+
+
+def _on_deadline(signum, frame):
+    raise _Deadline()
+
+
+# ---------------- Worker Side ----------------
+def _get_backends():
+    # Loaded in each pool process on its first task
+    global _backends
+    if _backends is None:
+        _backends = load_backends(PDF_BACKENDS)
+    return _backends
+
+
+def _extract_with(backend, data, start, stop, deadline):
+    document = backend.open(data)
+    try:
+        page_count = document.page_count
+        texts = []
+        for index in range(start, min(stop, page_count)):
+            texts.append(document.page_text(index) or "")
+            if time.time() > deadline:
+                raise _Deadline()
+        return page_count, texts
+    finally:
+        document.close()
+
+
+def _extract_pages(data, start, stop, deadline):
+    """Return (page_count, [page_text, ...]) for pages[start:stop].
+
+    Runs inside a pool process; a real-time timer interrupts a page that
+    is still being parsed when the document deadline passes. The next
+    backend takes over when one fails or finds no text in the range.
+    """
+    use_timer = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if use_timer:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise _Deadline()
+        signal.signal(signal.SIGALRM, _on_deadline)
+        signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        error = empty = None
+        for backend in _get_backends():
+            try:
+                page_count, texts = _extract_with(backend, data, start, stop, deadline)
+            except _Deadline:
+                raise
+            except Exception as e:
+                error = error or e
+                continue
+            if any(text.strip() for text in texts):
+                return page_count, texts
+            empty = empty or (page_count, texts)
+        if empty is not None:
+            return empty
+        raise error
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+# ---------------- Parent Side ----------------
+def _get_pool():
+    # Created lazily so gunicorn workers fork before any pool processes exist
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+        return _pool
+
+
+def _discard_pool(pool):
+    """Drop a pool whose worker died (OOM kill, segfault); the next task gets a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not pool:
+            return
+        _pool = None
+    print("⚠️ PDF worker process died; restarting the extraction pool")
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_coordinator():
+    global _coordinator
+    with _pool_lock:
+        if _coordinator is None:
+            _coordinator = ThreadPoolExecutor(max_workers=max(4, PDF_WORKERS * 4))
+        return _coordinator
+
+
+def _submit(data, start, stop, deadline):
+    if PDF_WORKERS > 0:
+        pool = _get_pool()
+        try:
+            future = pool.submit(_extract_pages, data, start, stop, deadline)
+        except BrokenProcessPool:
+            # Broken by an earlier task; this one has not run yet, so a new pool can take it
+            _discard_pool(pool)
+            pool = _get_pool()
+            future = pool.submit(_extract_pages, data, start, stop, deadline)
+        future.pool = pool
+        return future
+    future = Future()
+    try:
+        future.set_result(_extract_pages(data, start, stop, deadline))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _wait(future, deadline, timeout):
+    try:
+        return future.result(timeout=max(0.0, deadline - time.time()))
+    except (_Deadline, FutureTimeoutError):
+        raise PdfExtractionError(f"PDF could not be processed within {timeout:g} seconds", 422)
+    except BrokenProcessPool:
+        # Not the client's fault: a worker process died while this task was queued or running
+        _discard_pool(future.pool)
+        raise PdfExtractionError("PDF extraction was interrupted; try again", 503)
+    except Exception as e:
+        raise PdfExtractionError(f"Unable to read PDF: {e}")
+
+
+def _check_size(data):
+    if len(data) > PDF_MAX_BYTES:
+        raise PdfExtractionError(f"PDF is larger than {PDF_MAX_BYTES // (1024 * 1024)} MB", 413)
+
+
+def extract_text_from_bytes(data, max_pages=PDF_MAX_PAGES, timeout=PDF_TIMEOUT_SECONDS):
+    _check_size(data)
+    deadline = time.time() + timeout
+
+    # The first task also reports the page count; the rest of a large
+    # document is then split into page ranges extracted concurrently.
+    page_count, texts = _wait(_submit(data, 0, PDF_PAGES_PER_TASK, deadline), deadline, timeout)
+    if page_count > max_pages:
+        raise PdfExtractionError(f"PDF has {page_count} pages; the limit is {max_pages}", 413)
+
+    futures = [
+        _submit(data, start, start + PDF_PAGES_PER_TASK, deadline)
+        for start in range(PDF_PAGES_PER_TASK, page_count, PDF_PAGES_PER_TASK)
+    ]
+    try:
+        for future in futures:
+            texts.extend(_wait(future, deadline, timeout)[1])
+    finally:
+        for future in futures:
+            future.cancel()
+
+    return "".join(text + " " for text in texts if text).lower()
+
+
+def normalize_page_text(text):
+    return " ".join(text.split()).lower()
+
+
+def iter_pdf_pages(data, max_pages=PDF_MAX_PAGES, timeout=PDF_TIMEOUT_SECONDS):
+    """Yield normalized text for each non-empty page, in order.
+
+    Pages are extracted one task at a time with the next range prefetched,
+    so a caller that stops iterating early never pays for the remaining
+    pages. Unlike extract_text_from_bytes, a longer document is not
+    refused: only its first ``max_pages`` pages are read, and the
+    consumer's own budget may stop it sooner.
+    """
+    _check_size(data)
+    deadline = time.time() + timeout
+    future = _submit(data, 0, min(PDF_PAGES_PER_TASK, max_pages), deadline)
+    start = 0
+    try:
+        while future is not None:
+            page_count, texts = _wait(future, deadline, timeout)
+            last = min(page_count, max_pages)
+            texts = texts[:max(0, last - start)]
+            start += PDF_PAGES_PER_TASK
+            future = _submit(data, start, min(start + PDF_PAGES_PER_TASK, last), deadline) if start < last else None
+            for text in texts:
+                text = normalize_page_text(text)
+                if text:
+                    yield text
+    finally:
+        if future is not None:
+            future.cancel()
+
 
 def extract_text_from_pdf(file):
-    reader = PdfReader(file)
-    text = ""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return extract_text_from_bytes(f.read())
+    return extract_text_from_bytes(file.read())
 
-    for page in reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            text += page_text + " "
 
-    return text.lower()
+def submit_pdf_extraction(data):
+    """Extract text from PDF bytes without blocking; returns a Future."""
+    return _get_coordinator().submit(extract_text_from_bytes, data)
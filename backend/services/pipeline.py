@@ -0,0 +1,182 @@
+import os
+import time
+
+from services.pdf_extractor import (
+    PDF_BACKENDS, PdfExtractionError, extract_text_from_bytes, iter_pdf_pages, submit_pdf_extraction
+)
+from services.nlp_analyzer import (
+    analyze_resume, analyze_resume_batch, clean_text, get_job_profile, rank_candidates, resume_text_and_skills,
+    scan_resume, RESUME_MAX_CHARS, RESUME_MAX_PAGES
+)
+from utils.scoring import (
+    SEMANTIC_CHUNKING, CHUNK_WORDS, CHUNK_OVERLAP_WORDS, CHUNK_POOLING, document_embedding
+)
+from services.report_store import new_report_id, report_exists, save_report_analysis
+from services.result_cache import get_result_cache, result_key
+from services.skill_index import get_skill_index
+from services.vector_index import EMBEDDING_ID, EmbeddingMismatch, candidate_key, get_vector_index
+from utils.metrics import observe_stage, timed
+
+# ---------------- Config ----------------
+# Match skills page by page and stop at RESUME_MAX_CHARS / RESUME_MAX_PAGES
+ANALYZE_STREAMING = os.environ.get("ANALYZE_STREAMING", "1") == "1"
+# Part of the result cache key, so changing these settings never serves stale results
+ANALYSIS_VARIANT = f"streaming={ANALYZE_STREAMING}:{RESUME_MAX_CHARS}:{RESUME_MAX_PAGES}:embedding={EMBEDDING_ID}"
+if SEMANTIC_CHUNKING:
+    ANALYSIS_VARIANT += f":chunked={CHUNK_WORDS}/{CHUNK_OVERLAP_WORDS}/{CHUNK_POOLING}"
+# Backends extract slightly different text; PyPDF2 alone keeps the old keys
+if PDF_BACKENDS != ["pypdf2"]:
+    ANALYSIS_VARIANT += f":pdf={','.join(PDF_BACKENDS)}"
+
+
+class AnalysisError(Exception):
+    """A request-level failure with the HTTP status it should map to."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def index_candidate(key, resume, name=None, report_id=None):
+    """Add an analyzed resume (text or ResumeScan) to the candidate indexes under ``key``.
+
+    Never fails the analysis it belongs to; the resume embedding is
+    normally still in the embedding cache from the analysis itself.
+    """
+    vector_index = get_vector_index()
+    if vector_index is None:
+        return
+    try:
+        resume_text, skills = resume_text_and_skills(resume)
+        get_skill_index().add(key, skills, name, report_id)
+        vector_index.add(key, document_embedding(resume_text), name, report_id)
+    except Exception as e:
+        print("❌ Candidate indexing failed:", str(e))
+
+
+def delete_candidate(key):
+    """Remove a candidate from both indexes; returns False if it was not indexed."""
+    vector_index = get_vector_index()
+    if vector_index is None:
+        return False
+    removed = vector_index.delete(key)
+    return get_skill_index().delete(key) or removed
+
+
+def find_candidates(job_description, top_k=10):
+    """Indexed resumes most similar to a job description, best first."""
+    vector_index = get_vector_index()
+    if vector_index is None:
+        raise AnalysisError("Candidate index is disabled", 404)
+    jd_text = clean_text(job_description)
+    if not jd_text:
+        raise AnalysisError("Job Description missing")
+    try:
+        return vector_index.search(document_embedding(jd_text), top_k)
+    except EmbeddingMismatch as e:
+        raise AnalysisError(str(e), e.status_code)
+
+
+def run_analysis(resume_bytes, job_description, selected_role=None, candidate_name=None,
+                 digest_of_pdf=None, resume_key=None):
+    """Full single-resume pipeline shared by the WSGI and ASGI apps.
+
+    Blocking: PDF extraction waits on the process pool and analysis on the
+    embedding model. Returns ``{"analysis", "report_id", "cached"}``.
+    ``digest_of_pdf`` and ``resume_key`` are the hashes of ``resume_bytes``
+    (see services.uploads) when they are already known.
+    """
+    with timed("job_profile"):
+        job_profile = get_job_profile(job_description, selected_role)
+
+    # Same PDF, JD and role as an earlier request: reuse its analysis and report
+    result_cache = get_result_cache()
+    cache_key = result_key(resume_bytes, job_profile.key, ANALYSIS_VARIANT, digest_of_pdf)
+    cached = result_cache.get(cache_key) if result_cache else None
+    if cached:
+        analysis_result, report_id = cached
+        if not report_exists(report_id):
+            save_report_analysis(report_id, analysis_result)
+        return {"analysis": analysis_result, "report_id": report_id, "cached": True}
+
+    # Extract resume text
+    try:
+        if ANALYZE_STREAMING:
+            started = time.perf_counter()
+            resume_input = scan_resume(iter_pdf_pages(resume_bytes))
+            resume_text = resume_input.text
+            # Pages are cleaned and matched as they arrive; split that time out
+            scan_seconds = resume_input.clean_seconds + resume_input.match_seconds
+            observe_stage("pdf_extract", time.perf_counter() - started - scan_seconds)
+            observe_stage("clean_text", resume_input.clean_seconds)
+            observe_stage("skill_extraction", resume_input.match_seconds)
+        else:
+            with timed("pdf_extract"):
+                resume_input = resume_text = extract_text_from_bytes(resume_bytes)
+    except PdfExtractionError as e:
+        print("❌ PDF extraction failed:", str(e))
+        raise AnalysisError(str(e), e.status_code)
+    print("Extracted resume text:", resume_text[:500])  # Log first 500 chars
+
+    if not resume_text or not resume_text.strip():
+        print("❌ No text extracted from PDF")
+        raise AnalysisError("Unable to extract text from resume PDF")
+
+    # NLP Analysis
+    with timed("analysis"):
+        analysis_result = analyze_resume(resume_input, job_profile)
+    print("Analysis result:", analysis_result)  # Log analysis result
+
+    if not analysis_result or not isinstance(analysis_result, dict):
+        print("❌ Analysis result is invalid")
+        raise AnalysisError("Resume analysis failed. Try again.", 500)
+
+    # The PDF itself is rendered on first download
+    report_id = new_report_id()
+    save_report_analysis(report_id, analysis_result)
+    with timed("candidate_index"):
+        index_candidate(resume_key or candidate_key(resume_bytes), resume_input, candidate_name, report_id)
+
+    if result_cache:
+        result_cache.put(cache_key, analysis_result, report_id)
+
+    return {"analysis": analysis_result, "report_id": report_id, "cached": False}
+
+
+def run_batch_analysis(resumes, rejected, job_description, selected_role=None):
+    """Screen ``(candidate_id, pdf_bytes)`` resumes against one job description.
+
+    PDF extraction starts right away; returns a generator of result dicts:
+    the ``rejected`` entries and then every analyzed candidate as it
+    finishes (``"type": "candidate"``), and last the ranking
+    (``"type": "ranking"``).
+    """
+    extractions = [(candidate_id, submit_pdf_extraction(data)) for candidate_id, data in resumes]
+    keys = {candidate_id: candidate_key(data) for candidate_id, data in resumes}
+
+    def generate():
+        results = []
+        for result in rejected:
+            yield dict(result, type="candidate")
+        job_profile = get_job_profile(job_description, selected_role)
+        indexed = analyze_resume_batch(
+            extractions, job_profile,
+            on_analyzed=lambda candidate_id, resume_text, analysis: index_candidate(
+                keys[candidate_id], resume_text, candidate_id
+            )
+        )
+        for result in indexed:
+            results.append(result)
+            yield dict(result, type="candidate")
+        ranking = [
+            {"rank": r["rank"], "candidate_id": r["candidate_id"], "overall_score": r["overall_score"]}
+            for r in rank_candidates(results)
+        ]
+        yield {
+            "type": "ranking",
+            "total": len(resumes) + len(rejected),
+            "analyzed": len(ranking),
+            "ranking": ranking
+        }
+
+    return generate()
@@ -1,18 +1,135 @@
+from contextlib import contextmanager
+from functools import lru_cache
+import io
+import os
+import threading
+
+from reportlab import rl_config
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
+from reportlab.lib.rl_accel import escapePDF, fp_str
 from reportlab.lib.utils import simpleSplit
-import os
+from reportlab.pdfbase.pdfmetrics import getFont, stringWidth, unicode2T1
+
+# ---------------- Config ----------------
+# Draw text from cached, pre-encoded PDF operators instead of building a
+# ReportLab text object per line; REPORT_RENDER_CACHE=0 uses drawString
+REPORT_RENDER_CACHE = os.environ.get("REPORT_RENDER_CACHE", "1") == "1"
+REPORT_TEXT_CACHE_SIZE = int(os.environ.get("REPORT_TEXT_CACHE_SIZE", "8192"))
+# ASCII85 only makes the binary PDF streams printable, at ~15% more bytes
+# and a pure-Python encoding pass per page
+REPORT_ASCII85 = os.environ.get("REPORT_ASCII85", "0") == "1"
+
+_rl_config_lock = threading.Lock()
+
+
+@contextmanager
+def ascii85_streams(enabled):
+    """Set ReportLab's useA85 while one of our documents is written, then restore it.
+
+    The canvas takes no such option: the process-wide setting is read when
+    ``save`` formats the page streams, so only that call is covered.
+    """
+    with _rl_config_lock:
+        previous = rl_config.useA85
+        rl_config.useA85 = int(enabled)
+        try:
+            yield
+        finally:
+            rl_config.useA85 = previous
+
+
+# ---------------- Text Cache ----------------
+# Most report text repeats from report to report (the branding, headings,
+# role responsibilities, keywords and stock suggestions), so line wrapping
+# and string encoding are cached per string. Only the text-showing
+# operators are cached; font and colour still go through the canvas, so
+# the cached code is valid in any document and on any page.
+@lru_cache(maxsize=REPORT_TEXT_CACHE_SIZE * 4)
+def text_width(text, font, font_size):
+    return stringWidth(text, font, font_size)
+
+
+@lru_cache(maxsize=REPORT_TEXT_CACHE_SIZE)
+def wrap_text(text, font, font_size, max_width):
+    """The lines ``simpleSplit`` gives, measuring each word once per process."""
+    if not REPORT_RENDER_CACHE:
+        return tuple(simpleSplit(text, font, font_size, max_width))
+    space = text_width(" ", font, font_size)
+    lines = []
+    for paragraph in text.split("\n"):
+        words, line_width = [], -space
+        for word in paragraph.split():
+            width = text_width(word, font, font_size)
+            if not words or line_width + space + width <= max_width:
+                words.append(word)
+                line_width += space + width
+            else:
+                lines.append(" ".join(words))
+                words, line_width = [word], width
+        if words:
+            lines.append(" ".join(words))
+    return tuple(lines)
+
+
+@lru_cache(maxsize=REPORT_TEXT_CACHE_SIZE)
+def show_text_operator(text, font):
+    """``(...) Tj`` for ``text`` in ``font``, or None if it needs a substitution font."""
+    face = getFont(font)
+    segments = unicode2T1(text, [face] + face.substitutionFonts)
+    if len(segments) != 1 or segments[0][0] is not face:
+        return None
+    return f"({escapePDF(segments[0][1])}) Tj"
+
+
+@lru_cache(maxsize=REPORT_TEXT_CACHE_SIZE)
+def text_origin(x, y):
+    return f"BT 1 0 0 1 {fp_str(x, y)} Tm"
+
+
+# The canvas has no public getters for its text state. These attributes
+# are the same from ReportLab 3 to 5 (requirements.txt stays below 6); if
+# a release drops them, every call below takes the plain ReportLab path.
+def _font_state(c):
+    return getattr(c, "_fontname", None), getattr(c, "_fontsize", None), getattr(c, "_leading", None)
+
+
+def set_text_style(c, font, font_size, color):
+    """``setFont`` and ``setFillColor``, skipping what the canvas already has set."""
+    if not (REPORT_RENDER_CACHE and _font_state(c) == (font, font_size, font_size * 1.2)):
+        c.setFont(font, font_size)
+    if not (REPORT_RENDER_CACHE and getattr(c, "_fillColorObj", None) is color):
+        c.setFillColor(color)
+
+
+def draw_string(c, x, y, text):
+    """``c.drawString`` in the canvas's current font, from the cache when possible."""
+    font = _font_state(c)[0] if REPORT_RENDER_CACHE else None
+    operator = show_text_operator(text, font) if font else None
+    if operator is None:
+        c.drawString(x, y, text)
+    else:
+        c.addLiteral(f"{text_origin(x, y)} {operator} T* ET")
+
+
+def draw_centred_string(c, x, y, text):
+    font, font_size, _ = _font_state(c)
+    width = text_width(text, font, font_size) if font else c.stringWidth(text)
+    draw_string(c, x - width / 2, y, text)
+
+
+# ---------------- Drawing Helpers ----------------
 
 def draw_logo(c, width, y):
     # Large logo initials
     c.setFont("Helvetica-Bold", 44)
     c.setFillColorRGB(1, 0.6, 0.1)
-    c.drawCentredString(width / 2, y, "HireLens")
+    draw_centred_string(c, width / 2, y, "HireLens")
     # Subtitle
     c.setFont("Helvetica-Bold", 18)
     c.setFillColorRGB(0.2, 0.2, 0.2)
-    c.drawCentredString(width / 2, y - 32, "ATS Resume Analyzer Report")
+    draw_centred_string(c, width / 2, y - 32, "ATS Resume Analyzer Report")
     # Divider
     c.setStrokeColorRGB(1, 0.6, 0.1)
     c.setLineWidth(3)
@@ -20,14 +137,12 @@ def draw_logo(c, width, y):
     c.setFillColorRGB(0, 0, 0)
 
 def draw_wrapped_text(c, text, x, y, max_width, font="Helvetica", font_size=12, color=colors.black, line_height=15):
-    c.setFont(font, font_size)
-    c.setFillColor(color)
-    lines = simpleSplit(text, font, font_size, max_width)
-    for line in lines:
+    set_text_style(c, font, font_size, color)
+    for line in wrap_text(text, font, font_size, max_width):
         if y < 60:
             c.showPage()
             y = letter[1] - 40
-        c.drawString(x, y, line)
+        draw_string(c, x, y, line)
         y -= line_height
     return y
 
@@ -44,10 +159,11 @@ def draw_tag_list(c, label, items, x, y, color, width):
     y -= 5
     return y
 
-def generate_report_pdf(analysis_result, output_dir, filename):
-    os.makedirs(output_dir, exist_ok=True)
-    pdf_path = os.path.join(output_dir, filename)
-    c = canvas.Canvas(pdf_path, pagesize=letter)
+# ---------------- Report ----------------
+def render_report_pdf(analysis_result):
+    """Render the analysis report and return the PDF bytes."""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
     width, height = letter
 
     # Branding & Logo
@@ -58,7 +174,7 @@ def generate_report_pdf(analysis_result, output_dir, filename):
     # Summary Section
     c.setFont("Helvetica-Bold", 15)
     c.setFillColorRGB(1, 0.6, 0.1)
-    c.drawString(40, y, "Summary & Key Insights:")
+    draw_string(c, 40, y, "Summary & Key Insights:")
     y -= 22
     summary = analysis_result.get("summary", "No summary available.")
     y = draw_wrapped_text(c, summary, 60, y, width - 100)
@@ -70,7 +186,7 @@ def generate_report_pdf(analysis_result, output_dir, filename):
     profile_type = analysis_result.get("profile_type", "General")
     c.setFont("Helvetica-Bold", 13)
     c.setFillColor(colors.orange)
-    c.drawString(40, y, "Resume & Role Details:")
+    draw_string(c, 40, y, "Resume & Role Details:")
     y -= 18
     c.setFont("Helvetica", 12)
     c.setFillColor(colors.black)
@@ -144,7 +260,17 @@ def generate_report_pdf(analysis_result, output_dir, filename):
     y -= 30
     c.setFont("Helvetica-Oblique", 10)
     c.setFillColor(colors.gray)
-    c.drawCentredString(width / 2, 30, "Generated by HireLens ATS Resume Analyzer | hirelens.ai")
+    draw_centred_string(c, width / 2, 30, "Generated by HireLens ATS Resume Analyzer | hirelens.ai")
+
+    with ascii85_streams(REPORT_ASCII85):
+        c.save()
+    return buffer.getvalue()
 
-    c.save()
+
+def generate_report_pdf(analysis_result, output_dir, filename):
+    os.makedirs(output_dir, exist_ok=True)
+    pdf_path = os.path.join(output_dir, filename)
+    pdf_bytes = render_report_pdf(analysis_result)
+    with open(pdf_path, "wb") as f:
+        f.write(pdf_bytes)
     return pdf_path
@@ -0,0 +1,544 @@
+import fcntl
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from services.report_generator import generate_report_pdf, render_report_pdf
+from utils.metrics import timed
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---------------- Config ----------------
+# "disk": analyses and rendered PDFs under REPORT_FOLDER, served from file.
+# "memory": both kept compressed in this process for a short window and PDFs
+# served from memory, for deployments with slow or read-only disks. Each
+# worker has its own store, so run one worker (or route downloads back to
+# the worker that analyzed the resume). The result cache then lives in
+# memory as well and the candidate indexes default to off; see README.
+REPORT_STORAGE = os.environ.get("REPORT_STORAGE", "disk")
+REPORT_FOLDER = os.environ.get("REPORT_FOLDER", os.path.join(BASE_DIR, "output"))
+# Render PDFs in a background thread right after analysis instead of on first download
+REPORT_PRERENDER = os.environ.get("REPORT_PRERENDER", "0") == "1"
+REPORT_MAX_AGE_SECONDS = int(os.environ.get("REPORT_MAX_AGE_SECONDS", str(30 * 24 * 3600)))
+REPORT_MAX_BYTES = int(os.environ.get("REPORT_MAX_MB", "1024")) * 1024 * 1024
+REPORT_SWEEP_INTERVAL_SECONDS = int(os.environ.get("REPORT_SWEEP_INTERVAL_SECONDS", "300"))
+# Reports opened this recently are never swept, so a download in progress keeps its file
+REPORT_SWEEP_GRACE_SECONDS = int(os.environ.get("REPORT_SWEEP_GRACE_SECONDS", "60"))
+REPORT_MEMORY_MAX_BYTES = int(os.environ.get("REPORT_MEMORY_MB", "64")) * 1024 * 1024
+REPORT_MEMORY_TTL_SECONDS = int(os.environ.get("REPORT_MEMORY_TTL_SECONDS", "3600"))
+# How long a rendered PDF stays in memory after rendering (0: render on every download)
+REPORT_MEMORY_PDF_SECONDS = int(os.environ.get("REPORT_MEMORY_PDF_SECONDS", "300"))
+REPORT_MEMORY_COMPRESS = os.environ.get("REPORT_MEMORY_COMPRESS", "1") == "1"
+
+if REPORT_STORAGE not in ("disk", "memory"):
+    raise ValueError(f"REPORT_STORAGE must be 'disk' or 'memory', not {REPORT_STORAGE!r}")
+
+_REPORT_ID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+_render_locks = {}
+_render_locks_guard = threading.Lock()
+_prerender_pool = None
+
+
+def new_report_id():
+    return str(uuid.uuid4())
+
+
+def _report_dir(report_id):
+    # Two levels of 256-way sharding keep every directory small
+    return os.path.join(REPORT_FOLDER, report_id[0:2], report_id[2:4])
+
+
+def _analysis_path(report_id):
+    return os.path.join(_report_dir(report_id), f"{report_id}.json.z")
+
+
+def _pdf_path(report_id):
+    return os.path.join(_report_dir(report_id), f"{report_id}.pdf")
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# ---------------- Report Index ----------------
+class ReportIndex:
+    """SQLite index of stored reports: sizes, creation and last access times."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS reports (
+                report_id TEXT PRIMARY KEY,
+                analysis_size INTEGER NOT NULL,
+                pdf_size INTEGER NOT NULL DEFAULT 0,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS reports_created ON reports (created)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS reports_accessed ON reports (accessed)")
+        self._db.commit()
+
+    def add(self, report_id, analysis_size):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO reports (report_id, analysis_size, pdf_size, created, accessed) "
+                "VALUES (?, ?, 0, ?, ?)",
+                (report_id, analysis_size, now, now)
+            )
+            self._db.commit()
+
+    def adopt(self, reports):
+        """Index existing ``(report_id, analysis_size, pdf_size, created)`` files, keeping known entries."""
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO reports (report_id, analysis_size, pdf_size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(report_id, analysis_size, pdf_size, created, created)
+                 for report_id, analysis_size, pdf_size, created in reports]
+            )
+            self._db.commit()
+
+    def set_pdf_size(self, report_id, pdf_size):
+        with self._lock:
+            self._db.execute("UPDATE reports SET pdf_size = ? WHERE report_id = ?", (pdf_size, report_id))
+            self._db.commit()
+
+    def touch(self, report_id):
+        """Record an access; returns False if the report is not indexed."""
+        with self._lock:
+            updated = self._db.execute(
+                "UPDATE reports SET accessed = ? WHERE report_id = ?", (time.time(), report_id)
+            ).rowcount
+            self._db.commit()
+        return updated > 0
+
+    def contains(self, report_id):
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM reports WHERE report_id = ?", (report_id,)
+            ).fetchone() is not None
+
+    def expired(self, max_age, grace=REPORT_SWEEP_GRACE_SECONDS):
+        """Report ids created more than ``max_age`` ago and not accessed in the last ``grace`` seconds."""
+        now = time.time()
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                "SELECT report_id FROM reports WHERE created < ? AND accessed < ?", (now - max_age, now - grace)
+            )]
+
+    def over_budget(self, max_bytes, grace=REPORT_SWEEP_GRACE_SECONDS):
+        """Least recently accessed report ids to drop to fit in ``max_bytes``.
+
+        Reports accessed in the last ``grace`` seconds are kept even if
+        that leaves the folder over budget until the next sweep.
+        """
+        with self._lock:
+            total = self._db.execute(
+                "SELECT COALESCE(SUM(analysis_size + pdf_size), 0) FROM reports"
+            ).fetchone()[0]
+            excess = total - max_bytes
+            doomed = []
+            if excess > 0:
+                for report_id, size in self._db.execute(
+                    "SELECT report_id, analysis_size + pdf_size FROM reports WHERE accessed < ? ORDER BY accessed",
+                    (time.time() - grace,)
+                ):
+                    if excess <= 0:
+                        break
+                    doomed.append(report_id)
+                    excess -= size
+            return doomed
+
+    def remove(self, report_ids):
+        with self._lock:
+            self._db.executemany("DELETE FROM reports WHERE report_id = ?", [(r,) for r in report_ids])
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            count, analysis_bytes, pdf_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(analysis_size), 0), COALESCE(SUM(pdf_size), 0) FROM reports"
+            ).fetchone()
+        return {"reports": count, "analysis_bytes": analysis_bytes, "pdf_bytes": pdf_bytes}
+
+
+_LEGACY_FILE = re.compile(r"^([0-9a-f-]{36})\.(pdf|json\.z)$")
+
+
+def migrate_flat_reports(index):
+    """Move reports from the flat layout (REPORT_FOLDER/<id>.pdf) into their shards and index them.
+
+    Their file times stand in for the creation time, so the sweeper ages
+    them like any other report. Safe to run from several workers at once.
+    """
+    found = {}
+    with os.scandir(REPORT_FOLDER) as entries:
+        for entry in entries:
+            match = _LEGACY_FILE.match(entry.name)
+            if not match or not _REPORT_ID.match(match.group(1)) or not entry.is_file():
+                continue
+            report_id, kind = match.groups()
+            target = _pdf_path(report_id) if kind == "pdf" else _analysis_path(report_id)
+            try:
+                stat = entry.stat()
+                os.makedirs(_report_dir(report_id), exist_ok=True)
+                os.replace(entry.path, target)
+            except FileNotFoundError:
+                # Another worker moved it first
+                continue
+            sizes = found.setdefault(report_id, [0, 0, stat.st_mtime])
+            sizes[0 if kind == "json.z" else 1] = stat.st_size
+            sizes[2] = min(sizes[2], stat.st_mtime)
+    if found:
+        index.adopt([(report_id, *sizes) for report_id, sizes in found.items()])
+        print(f"📦 Moved {len(found)} reports from the flat layout into {REPORT_FOLDER}")
+    return len(found)
+
+
+_index = None
+_index_guard = threading.Lock()
+
+
+def get_report_index():
+    """Process-wide index, opened on first use; also starts the sweeper."""
+    global _index
+    with _index_guard:
+        if _index is None:
+            _index = ReportIndex(os.path.join(REPORT_FOLDER, "reports.sqlite3"))
+            migrate_flat_reports(_index)
+            start_report_sweeper()
+        return _index
+
+
+# ---------------- Memory Store ----------------
+class MemoryReportStore:
+    """Reports held in this process only: compressed analyses plus recently rendered PDFs.
+
+    Entries expire ``ttl`` seconds after creation and the least recently
+    accessed go first once ``max_bytes`` is exceeded. A rendered PDF is
+    kept for ``pdf_seconds`` after rendering, then dropped (its analysis
+    stays, so the next download renders it again).
+    """
+
+    def __init__(self, max_bytes, ttl, pdf_seconds, compress=True):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.pdf_seconds = pdf_seconds
+        self.compress = compress
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # report_id -> [analysis payload, pdf payload or None, created, pdf rendered at]
+        self._items = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def _size(entry):
+        return len(entry[0]) + len(entry[1] or b"")
+
+    def _get(self, report_id, now):
+        # Caller holds the lock
+        entry = self._items.get(report_id)
+        if entry is None:
+            return None
+        if now - entry[2] > self.ttl:
+            self._bytes -= self._size(self._items.pop(report_id))
+            return None
+        if entry[1] is not None and now - entry[3] > self.pdf_seconds:
+            self._bytes -= len(entry[1])
+            entry[1] = None
+        self._items.move_to_end(report_id)
+        return entry
+
+    def _evict(self):
+        # Caller holds the lock
+        while self._bytes > self.max_bytes and self._items:
+            _, entry = self._items.popitem(last=False)
+            self._bytes -= self._size(entry)
+            self.evictions += 1
+
+    def add(self, report_id, analysis_payload):
+        entry = [analysis_payload, None, time.time(), 0.0]
+        with self._lock:
+            old = self._items.pop(report_id, None)
+            if old is not None:
+                self._bytes -= self._size(old)
+            self._items[report_id] = entry
+            self._bytes += self._size(entry)
+            self._evict()
+
+    def analysis(self, report_id):
+        with self._lock:
+            entry = self._get(report_id, time.time())
+            return entry[0] if entry else None
+
+    def pdf(self, report_id):
+        with self._lock:
+            entry = self._get(report_id, time.time())
+            pdf = entry[1] if entry else None
+        if pdf is not None and self.compress:
+            pdf = zlib.decompress(pdf)
+        return pdf
+
+    def set_pdf(self, report_id, pdf):
+        if self.pdf_seconds <= 0:
+            return
+        payload = zlib.compress(pdf, 1) if self.compress else pdf
+        with self._lock:
+            entry = self._get(report_id, time.time())
+            if entry is None:
+                return
+            self._bytes += len(payload) - len(entry[1] or b"")
+            entry[1], entry[3] = payload, time.time()
+            self._evict()
+
+    def contains(self, report_id):
+        with self._lock:
+            return self._get(report_id, time.time()) is not None
+
+    def remove(self, report_ids):
+        with self._lock:
+            for report_id in report_ids:
+                entry = self._items.pop(report_id, None)
+                if entry is not None:
+                    self._bytes -= self._size(entry)
+
+    def expired(self, max_age=None):
+        max_age = self.ttl if max_age is None else max_age
+        cutoff = time.time() - max_age
+        with self._lock:
+            return [report_id for report_id, entry in self._items.items() if entry[2] < cutoff]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "storage": "memory",
+                "reports": len(self._items),
+                "pdfs": sum(1 for entry in self._items.values() if entry[1] is not None),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+_memory_store = None
+
+
+def get_memory_store():
+    """Process-wide memory store, created on first use; also starts the sweeper."""
+    global _memory_store
+    with _index_guard:
+        if _memory_store is None:
+            _memory_store = MemoryReportStore(
+                REPORT_MEMORY_MAX_BYTES, REPORT_MEMORY_TTL_SECONDS, REPORT_MEMORY_PDF_SECONDS, REPORT_MEMORY_COMPRESS
+            )
+            start_report_sweeper()
+        return _memory_store
+
+
+# ---------------- Analysis Records ----------------
+def save_report_analysis(report_id, analysis_result):
+    """Persist the analysis (compressed JSON) so its PDF can be rendered later."""
+    payload = zlib.compress(json.dumps(analysis_result, separators=(",", ":")).encode("utf-8"))
+    if REPORT_STORAGE == "memory":
+        get_memory_store().add(report_id, payload)
+    else:
+        os.makedirs(_report_dir(report_id), exist_ok=True)
+        _write_atomic(_analysis_path(report_id), payload)
+        get_report_index().add(report_id, len(payload))
+    if REPORT_PRERENDER:
+        prerender_report(report_id)
+
+
+def load_report_analysis(report_id):
+    if not _REPORT_ID.match(report_id):
+        return None
+    if REPORT_STORAGE == "memory":
+        payload = get_memory_store().analysis(report_id)
+        return json.loads(zlib.decompress(payload)) if payload is not None else None
+    try:
+        with open(_analysis_path(report_id), "rb") as f:
+            return json.loads(zlib.decompress(f.read()))
+    except FileNotFoundError:
+        return None
+
+
+def report_exists(report_id):
+    if not _REPORT_ID.match(report_id):
+        return False
+    if REPORT_STORAGE == "memory":
+        return get_memory_store().contains(report_id)
+    return get_report_index().contains(report_id)
+
+
+# ---------------- PDF Rendering ----------------
+def get_report_pdf(report_id):
+    """Return the rendered PDF, rendering it on first request.
+
+    That is the file path with disk storage and the PDF bytes with memory
+    storage. Returns None when the report id is unknown or has been evicted.
+    """
+    if REPORT_STORAGE == "memory":
+        return _get_report_pdf_bytes(report_id)
+    if not _REPORT_ID.match(report_id) or not get_report_index().touch(report_id):
+        return None
+    pdf_path = _pdf_path(report_id)
+    if os.path.exists(pdf_path):
+        return pdf_path
+
+    with _render_locks_guard:
+        lock = _render_locks.setdefault(report_id, threading.Lock())
+    try:
+        with lock:
+            # Another thread may have rendered it while we waited
+            if os.path.exists(pdf_path):
+                return pdf_path
+            analysis_result = load_report_analysis(report_id)
+            if analysis_result is None:
+                return None
+            tmp_name = f"{report_id}.pdf.{uuid.uuid4().hex}.tmp"
+            with timed("report_render"):
+                generate_report_pdf(
+                    analysis_result=analysis_result,
+                    output_dir=_report_dir(report_id),
+                    filename=tmp_name
+                )
+            os.replace(os.path.join(_report_dir(report_id), tmp_name), pdf_path)
+            get_report_index().set_pdf_size(report_id, os.path.getsize(pdf_path))
+            return pdf_path
+    finally:
+        with _render_locks_guard:
+            _render_locks.pop(report_id, None)
+
+
+def _get_report_pdf_bytes(report_id):
+    if not _REPORT_ID.match(report_id):
+        return None
+    store = get_memory_store()
+    pdf = store.pdf(report_id)
+    if pdf is not None:
+        return pdf
+    analysis_result = load_report_analysis(report_id)
+    if analysis_result is None:
+        return None
+    # Rendering takes milliseconds, so concurrent first downloads just both render
+    with timed("report_render"):
+        pdf = render_report_pdf(analysis_result)
+    store.set_pdf(report_id, pdf)
+    return pdf
+
+
+def prerender_report(report_id):
+    global _prerender_pool
+    with _render_locks_guard:
+        if _prerender_pool is None:
+            _prerender_pool = ThreadPoolExecutor(max_workers=1)
+    return _prerender_pool.submit(get_report_pdf, report_id)
+
+
+# ---------------- Eviction ----------------
+def delete_reports(report_ids):
+    if REPORT_STORAGE == "memory":
+        get_memory_store().remove(report_ids)
+        return
+    index = get_report_index()
+    for report_id in report_ids:
+        _remove(_pdf_path(report_id))
+        _remove(_analysis_path(report_id))
+    index.remove(report_ids)
+
+
+def sweep_reports(max_age=REPORT_MAX_AGE_SECONDS, max_bytes=REPORT_MAX_BYTES):
+    """Drop reports older than ``max_age``, then least recently accessed ones over ``max_bytes``.
+
+    With memory storage the store bounds itself; this only drops the
+    entries older than REPORT_MEMORY_TTL_SECONDS.
+    """
+    if REPORT_STORAGE == "memory":
+        store = get_memory_store()
+        expired = store.expired()
+        store.remove(expired)
+        return len(expired)
+    index = get_report_index()
+    expired = index.expired(max_age)
+    delete_reports(expired)
+    over_budget = index.over_budget(max_bytes)
+    delete_reports(over_budget)
+    return len(expired) + len(over_budget)
+
+
+_sweeper = None
+_sweeper_lock_file = None
+
+
+def owns_report_sweep():
+    """Whether this process sweeps REPORT_FOLDER.
+
+    Every process starts a sweeper thread, but with disk storage only the
+    holder of an exclusive lock on a file in REPORT_FOLDER sweeps; the
+    lock is released when it exits, and another process takes over on its
+    next round. Memory stores belong to their process and always sweep.
+    """
+    global _sweeper_lock_file
+    if REPORT_STORAGE == "memory" or _sweeper_lock_file is not None:
+        return True
+    os.makedirs(REPORT_FOLDER, exist_ok=True)
+    lock_file = open(os.path.join(REPORT_FOLDER, "sweeper.lock"), "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _sweeper_lock_file = lock_file
+    return True
+
+
+def start_report_sweeper(interval=REPORT_SWEEP_INTERVAL_SECONDS):
+    """Run sweep_reports every ``interval`` seconds in a daemon thread (once per process)."""
+    global _sweeper
+    if _sweeper is not None or interval <= 0:
+        return
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                if not owns_report_sweep():
+                    continue
+                removed = sweep_reports()
+                if removed:
+                    print(f"🧹 Removed {removed} old reports")
+            except Exception as e:
+                print("❌ Report sweep failed:", str(e))
+
+    _sweeper = threading.Thread(target=run, name="report-sweeper", daemon=True)
+    _sweeper.start()
+
+
+def report_store_stats():
+    if REPORT_STORAGE == "memory":
+        return get_memory_store().stats()
+    return {"storage": "disk", **get_report_index().stats()}
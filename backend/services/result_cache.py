@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from services.report_store import REPORT_STORAGE
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---------------- Config ----------------
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE_ENABLED", "1") == "1"
+# REPORT_STORAGE=memory keeps this cache off disk too (one per process)
+RESULT_CACHE_PATH = os.environ.get(
+    "RESULT_CACHE_PATH",
+    ":memory:" if REPORT_STORAGE == "memory" else os.path.join(BASE_DIR, "cache", "results.sqlite3")
+)
+RESULT_CACHE_TTL_SECONDS = int(os.environ.get("RESULT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "20000"))
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_MB", "256")) * 1024 * 1024
+# Eviction runs after this many writes rather than on every write
+RESULT_CACHE_EVICT_EVERY = int(os.environ.get("RESULT_CACHE_EVICT_EVERY", "100"))
+
+
+def pdf_digest(pdf_bytes):
+    return hashlib.blake2b(pdf_bytes, digest_size=20).digest()
+
+
+def result_key(pdf_bytes, profile_key, variant="", digest_of_pdf=None):
+    """Key for one submission: uploaded bytes + JobProfile key + analysis settings.
+
+    ``digest_of_pdf`` (``pdf_digest`` of the bytes, e.g. computed while
+    the upload streamed in) saves hashing the bytes again.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(digest_of_pdf or pdf_digest(pdf_bytes))
+    digest.update(profile_key)
+    digest.update(variant.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """On-disk (SQLite) cache of analysis results with TTL and size-based LRU eviction.
+
+    Safe to share between threads; several gunicorn workers can point at
+    the same file thanks to WAL mode.
+    """
+
+    def __init__(self, path, ttl=RESULT_CACHE_TTL_SECONDS, max_entries=RESULT_CACHE_MAX_ENTRIES,
+                 max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                report_id TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        self._db.commit()
+
+    def get(self, key):
+        """Return ``(analysis, report_id)`` for a fresh entry, else None."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT report_id, payload, created FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(zlib.decompress(row[1])), row[0]
+
+    def put(self, key, analysis, report_id):
+        payload = zlib.compress(json.dumps(analysis, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, report_id, payload, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, report_id, payload, len(payload), now, now)
+            )
+            self._db.commit()
+            self._writes += 1
+            if self._writes % RESULT_CACHE_EVICT_EVERY == 0:
+                self._evict_locked(now)
+
+    def evict(self):
+        with self._lock:
+            return self._evict_locked(time.time())
+
+    def _evict_locked(self, now):
+        db = self._db
+        removed = db.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,)).rowcount
+
+        count, total = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if count > self.max_entries or total > self.max_bytes:
+            # Walk least recently used entries until both limits hold
+            excess_count = max(0, count - self.max_entries)
+            excess_bytes = max(0, total - self.max_bytes)
+            doomed = []
+            for key, size in db.execute("SELECT key, size FROM results ORDER BY accessed"):
+                if excess_count <= 0 and excess_bytes <= 0:
+                    break
+                doomed.append((key,))
+                excess_count -= 1
+                excess_bytes -= size
+            db.executemany("DELETE FROM results WHERE key = ?", doomed)
+            removed += len(doomed)
+
+        db.commit()
+        self.evictions += removed
+        return removed
+
+    def stats(self):
+        with self._lock:
+            count, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Process-wide cache, opened on first use (after gunicorn forks)."""
+    global _result_cache
+    if not RESULT_CACHE_ENABLED:
+        return None
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache(RESULT_CACHE_PATH)
+        return _result_cache
@@ -0,0 +1,357 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from services.vector_index import CANDIDATE_INDEX_DIR, CANDIDATE_INDEX_ENABLED
+from utils.skills import canonical_role
+from utils.taxonomy import get_taxonomy
+
+SKILL_INDEX_INITIAL_DOCS = int(os.environ.get("SKILL_INDEX_INITIAL_DOCS", "4096"))
+
+
+class SkillQueryError(ValueError):
+    """Raised for a malformed boolean skill query."""
+
+
+# ---------------- Query Parsing ----------------
+_QUERY_TOKEN = re.compile(r"\(|\)|[^\s()]+")
+_OPERATORS = {"and", "or", "not"}
+
+
+def parse_skill_query(query):
+    """Parse ``"python AND (docker OR kubernetes) AND NOT php"`` into a tree.
+
+    Operators are case-insensitive; NOT binds tightest, then AND, then OR.
+    Consecutive words form one multi-word skill ("machine learning"), so
+    AND must be written out. Skill aliases ("nodejs") resolve to their
+    canonical skill. A skill outside the vocabulary is kept as written
+    and matches no candidate, so ``AND php`` matches nothing and
+    ``NOT php`` everything; only malformed queries raise. Nodes are
+    ``("skill", name)``, ``("not", a)``, ``("and", a, b)`` and
+    ``("or", a, b)``.
+    """
+    tokens = _QUERY_TOKEN.findall(query.lower())
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take():
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() == "or":
+            take()
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while peek() == "and":
+            take()
+            node = ("and", node, parse_not())
+        return node
+
+    def parse_not():
+        if peek() == "not":
+            take()
+            return ("not", parse_not())
+        return parse_atom()
+
+    def parse_atom():
+        token = peek()
+        if token is None:
+            raise SkillQueryError("Unexpected end of query")
+        if token == "(":
+            take()
+            node = parse_or()
+            if peek() != ")":
+                raise SkillQueryError("Missing closing parenthesis")
+            take()
+            return node
+        if token == ")" or token in _OPERATORS:
+            raise SkillQueryError(f"Unexpected {token.upper()!r}")
+        words = []
+        while peek() is not None and peek() not in _OPERATORS and peek() not in ("(", ")"):
+            words.append(take())
+        skill = " ".join(words)
+        return ("skill", get_taxonomy().skill_matcher.canonical_form(skill) or skill)
+
+    node = parse_or()
+    if peek() is not None:
+        raise SkillQueryError(f"Unexpected {peek()!r}")
+    return node
+
+
+# ---------------- Skill Index ----------------
+class SkillIndex:
+    """Persistent inverted index from skills to candidates.
+
+    Every candidate gets a small integer doc id and each skill a packed
+    bitmap over doc ids (one bit per candidate, rows of one 2-D uint8
+    array), so boolean queries are a handful of vectorized AND/OR/NOT
+    passes over a few dozen kilobytes per skill. SQLite holds the
+    candidates and their skills; the bitmaps are rebuilt from it on start
+    and updated incrementally, including from commits made by other
+    processes (every write bumps a sequence number).
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._bitmaps = np.zeros((0, SKILL_INDEX_INITIAL_DOCS // 8), dtype=np.uint8)
+        self._live = np.zeros(SKILL_INDEX_INITIAL_DOCS // 8, dtype=np.uint8)
+        self._seq = 0
+        self._version = None
+
+        self._db = sqlite3.connect(
+            os.path.join(directory, "skills.sqlite3"), check_same_thread=False, timeout=10,
+            isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        # Deleted candidates keep their row (skills NULL) so the change is replayed elsewhere
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS candidates (
+                doc INTEGER PRIMARY KEY,
+                candidate_id TEXT NOT NULL UNIQUE,
+                name TEXT,
+                report_id TEXT,
+                skills TEXT,
+                seq INTEGER NOT NULL,
+                added REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS candidates_seq ON candidates (seq)")
+
+    # ---------------- Bitmaps ----------------
+    def _row(self, skill):
+        row = self._rows.get(skill)
+        if row is None:
+            row = self._rows[skill] = len(self._rows)
+            if row >= self._bitmaps.shape[0]:
+                grown = np.zeros((max(64, 2 * self._bitmaps.shape[0]), self._bitmaps.shape[1]), dtype=np.uint8)
+                grown[:self._bitmaps.shape[0]] = self._bitmaps
+                self._bitmaps = grown
+        return row
+
+    def _reserve(self, max_doc):
+        needed = max_doc // 8 + 1
+        width = self._live.shape[0]
+        if needed <= width:
+            return
+        while width < needed:
+            width *= 2
+        bitmaps = np.zeros((self._bitmaps.shape[0], width), dtype=np.uint8)
+        bitmaps[:, :self._bitmaps.shape[1]] = self._bitmaps
+        live = np.zeros(width, dtype=np.uint8)
+        live[:self._live.shape[0]] = self._live
+        self._bitmaps, self._live = bitmaps, live
+
+    def _apply(self, changes):
+        """Replay ``(doc, skills_text_or_None)`` rows onto the bitmaps."""
+        if not changes:
+            return
+        # Only the latest change of each doc counts
+        changes = list(dict(changes).items())
+        docs = np.fromiter((doc for doc, _ in changes), dtype=np.int64, count=len(changes))
+        self._reserve(int(docs.max()))
+
+        live_docs, skill_docs, names = [], [], []
+        for doc, skills in changes:
+            if skills is None:
+                continue
+            live_docs.append(doc)
+            if skills:
+                parts = skills.split("\n")
+                names.extend(parts)
+                skill_docs.extend([doc] * len(parts))
+        rows = {name: self._row(name) for name in set(names)}
+
+        # Work on the byte range spanned by the changed docs as unpacked
+        # booleans, then pack it back: clear every touched doc, set its bits
+        lo, hi = int(docs.min()) >> 3, (int(docs.max()) >> 3) + 1
+        touched = np.zeros((hi - lo) * 8, dtype=bool)
+        touched[docs - lo * 8] = True
+        keep = ~np.packbits(touched, bitorder="little")
+        self._bitmaps[:, lo:hi] &= keep
+        self._live[lo:hi] &= keep
+
+        live = np.zeros_like(touched)
+        live[np.array(live_docs, dtype=np.int64) - lo * 8] = True
+        self._live[lo:hi] |= np.packbits(live, bitorder="little")
+        if names:
+            held = np.zeros((len(self._rows), touched.shape[0]), dtype=bool)
+            held[[rows[n] for n in names], np.array(skill_docs, dtype=np.int64) - lo * 8] = True
+            self._bitmaps[:len(self._rows), lo:hi] |= np.packbits(held, axis=1, bitorder="little")
+
+    def _replay(self):
+        changes = self._db.execute(
+            "SELECT doc, skills, seq FROM candidates WHERE seq > ? ORDER BY seq", (self._seq,)
+        ).fetchall()
+        if changes:
+            self._apply([(doc, skills) for doc, skills, _ in changes])
+            self._seq = changes[-1][2]
+
+    def _refresh(self):
+        # data_version only changes for commits made by *other* connections
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            self._replay()
+            self._version = version
+
+    def _docs(self, bitmap):
+        return np.flatnonzero(np.unpackbits(bitmap, bitorder="little"))
+
+    # ---------------- Writes ----------------
+    def _write(self, candidate_id, skills, name=None, report_id=None):
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # Catch up with other writers first so our seq never skips their changes
+                self._replay()
+                seq = db.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM candidates").fetchone()[0]
+                existing = db.execute(
+                    "SELECT doc, skills FROM candidates WHERE candidate_id = ?", (candidate_id,)
+                ).fetchone()
+                if skills is None and (existing is None or existing[1] is None):
+                    db.execute("COMMIT")
+                    return False
+                if existing:
+                    doc = existing[0]
+                    db.execute(
+                        "UPDATE candidates SET name = COALESCE(?, name), report_id = COALESCE(?, report_id), "
+                        "skills = ?, seq = ?, added = ? WHERE doc = ?",
+                        (name, report_id, skills, seq, time.time(), doc)
+                    )
+                else:
+                    doc = db.execute(
+                        "INSERT INTO candidates (candidate_id, name, report_id, skills, seq, added) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (candidate_id, name, report_id, skills, seq, time.time())
+                    ).lastrowid
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            # Our own commit does not change data_version, so apply it directly
+            self._apply([(doc, skills)])
+            self._seq = seq
+        return True
+
+    def add(self, candidate_id, skills, name=None, report_id=None):
+        """Insert or replace one candidate's skills."""
+        self._write(candidate_id, "\n".join(sorted(skills)), name, report_id)
+
+    def delete(self, candidate_id):
+        """Remove a candidate; returns False if unknown."""
+        return self._write(candidate_id, None)
+
+    # ---------------- Queries ----------------
+    def _evaluate(self, node):
+        kind = node[0]
+        if kind == "skill":
+            row = self._rows.get(node[1])
+            return self._bitmaps[row] if row is not None else np.zeros_like(self._live)
+        if kind == "not":
+            return self._live & ~self._evaluate(node[1])
+        left, right = self._evaluate(node[1]), self._evaluate(node[2])
+        return left & right if kind == "and" else left | right
+
+    def _describe(self, docs, extra=None):
+        if len(docs) == 0:
+            return []
+        meta = {
+            doc: (candidate_id, name, report_id)
+            for doc, candidate_id, name, report_id in self._db.execute(
+                f"SELECT doc, candidate_id, name, report_id FROM candidates "
+                f"WHERE doc IN ({','.join('?' * len(docs))})", [int(d) for d in docs]
+            )
+        }
+        results = []
+        for i, doc in enumerate(docs):
+            candidate_id, name, report_id = meta[int(doc)]
+            result = {"candidate_id": candidate_id, "name": name, "report_id": report_id}
+            if extra:
+                result.update(extra(i, doc))
+            results.append(result)
+        return results
+
+    def query(self, query, limit=100):
+        """Candidates matching a boolean skill query, newest first.
+
+        Returns ``(total_matches, candidates)`` with at most ``limit`` candidates.
+        """
+        tree = parse_skill_query(query) if isinstance(query, str) else query
+        with self._lock:
+            self._refresh()
+            docs = self._docs(self._live & self._evaluate(tree))
+            return len(docs), self._describe(docs[::-1][:limit])
+
+    def coverage(self, role, top_k=10, query=None):
+        """Rank candidates by how many of the role's ROLE_SKILLS they have.
+
+        ``query`` optionally restricts the ranking to a boolean filter.
+        """
+        role = canonical_role(role)
+        role_skills = get_taxonomy().role_skills.get(role)
+        if not role_skills:
+            raise SkillQueryError(f"Unknown role {role!r}")
+        tree = parse_skill_query(query) if isinstance(query, str) else query
+
+        with self._lock:
+            self._refresh()
+            mask = self._live if tree is None else self._live & self._evaluate(tree)
+            indexed = [skill for skill in role_skills if skill in self._rows]
+            if not indexed or not mask.any():
+                return []
+            held = np.unpackbits(self._bitmaps[[self._rows[s] for s in indexed]], axis=1, bitorder="little")
+            counts = held.sum(axis=0, dtype=np.int32)
+            counts[np.unpackbits(mask, bitorder="little") == 0] = -1
+
+            top_k = min(top_k, int((counts >= 0).sum()))
+            if top_k <= 0:
+                return []
+            top = np.argpartition(-counts, top_k - 1)[:top_k]
+            # Best coverage first; among equals, the most recent candidate
+            top = top[np.lexsort((-top, -counts[top]))]
+
+            def extra(i, doc):
+                matched = [skill for skill, has in zip(indexed, held[:, doc]) if has]
+                return {
+                    "coverage": round(len(matched) / len(role_skills) * 100, 2),
+                    "matched_skills": matched,
+                    "missing_skills": [s for s in role_skills if s not in matched]
+                }
+
+            return self._describe(top, extra)
+
+    def stats(self):
+        with self._lock:
+            self._refresh()
+            count = int(np.unpackbits(self._live).sum())
+        return {"candidates": count, "skills": len(self._rows), "bitmap_bytes": int(self._bitmaps.nbytes)}
+
+
+_skill_index = None
+_skill_index_lock = threading.Lock()
+
+
+def get_skill_index():
+    """Process-wide index, opened on first use (after gunicorn forks)."""
+    global _skill_index
+    if not CANDIDATE_INDEX_ENABLED:
+        return None
+    with _skill_index_lock:
+        if _skill_index is None:
+            _skill_index = SkillIndex(CANDIDATE_INDEX_DIR)
+        return _skill_index
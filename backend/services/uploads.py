@@ -0,0 +1,87 @@
+"""Checks on uploaded resumes before any PDF parsing starts.
+
+The web frameworks spool multipart file parts to a temporary file above
+UPLOAD_SPOOL_BYTES, so concurrent large uploads wait on disk rather than
+in memory while they arrive. ``read_upload`` then streams the spooled
+part once, and only a file that passes is held in memory:
+
+- the PDF header is checked against the first chunk, whatever the
+  file is called;
+- reading stops as soon as the size limit is passed;
+- the content hashes used by the result cache and the candidate index
+  are computed on the same pass.
+
+Nothing here parses the PDF. The page limit (PDF_MAX_PAGES) is enforced by
+pdf_extractor on its first task, inside the worker pool and under the
+extraction deadline.
+"""
+import hashlib
+import io
+import os
+
+from services.pdf_extractor import PDF_MAX_BYTES
+
+# ---------------- Config ----------------
+UPLOAD_MAX_BYTES = PDF_MAX_BYTES
+# Whole request bodies; larger requests are refused before the form is parsed
+UPLOAD_MAX_REQUEST_BYTES = int(os.environ.get("UPLOAD_MAX_REQUEST_MB", "16")) * 1024 * 1024
+# File parts above this size are spooled to a temporary file
+UPLOAD_SPOOL_BYTES = int(os.environ.get("UPLOAD_SPOOL_KB", "512")) * 1024
+UPLOAD_CHUNK_BYTES = 64 * 1024
+
+# Readers accept the header anywhere in the first kilobyte
+_PDF_MAGIC = b"%PDF-"
+_PDF_HEADER_WINDOW = 1024
+
+
+class UploadError(Exception):
+    """An upload rejected before analysis, with the HTTP status it should map to."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class Upload:
+    """A checked upload: its bytes, size and content hashes."""
+
+    __slots__ = ("filename", "data", "size", "digest", "key")
+
+    def __init__(self, filename, data, digest, key):
+        self.filename = filename
+        self.data = data
+        self.size = len(data)
+        # result_cache.pdf_digest and vector_index.candidate_key of the bytes
+        self.digest = digest
+        self.key = key
+
+
+def is_pdf(head):
+    return _PDF_MAGIC in head[:_PDF_HEADER_WINDOW]
+
+
+def too_large(max_bytes):
+    return UploadError(f"PDF is larger than {max_bytes / (1024 * 1024):g} MB", 413)
+
+
+def read_upload(stream, filename=None, max_bytes=UPLOAD_MAX_BYTES):
+    """Read an uploaded file part in chunks and check it; returns an Upload or raises UploadError."""
+    digest = hashlib.blake2b(digest_size=20)
+    key = hashlib.blake2b(digest_size=16)
+    buffer = io.BytesIO()
+    size = 0
+    while True:
+        chunk = stream.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        if size == 0 and not is_pdf(chunk):
+            raise UploadError("Only PDF files are supported")
+        size += len(chunk)
+        if size > max_bytes:
+            raise too_large(max_bytes)
+        digest.update(chunk)
+        key.update(chunk)
+        buffer.write(chunk)
+    if size == 0:
+        raise UploadError("Uploaded file is empty")
+    return Upload(filename, buffer.getvalue(), digest.digest(), key.hexdigest())
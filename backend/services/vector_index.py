@@ -0,0 +1,316 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from models.embeddings import EMBEDDING_BACKEND, EMBEDDING_MODEL_NAME
+from services.report_store import REPORT_STORAGE
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---------------- Config ----------------
+# The indexes are files by design, so REPORT_STORAGE=memory turns them off unless asked for
+CANDIDATE_INDEX_ENABLED = os.environ.get(
+    "CANDIDATE_INDEX_ENABLED", "0" if REPORT_STORAGE == "memory" else "1"
+) == "1"
+CANDIDATE_INDEX_DIR = os.environ.get("CANDIDATE_INDEX_DIR", os.path.join(BASE_DIR, "index"))
+VECTOR_INDEX_INITIAL_ROWS = int(os.environ.get("VECTOR_INDEX_INITIAL_ROWS", "1024"))
+# Vectors from different backends or models are not comparable
+EMBEDDING_ID = f"{EMBEDDING_BACKEND}/{EMBEDDING_MODEL_NAME}"
+
+
+def candidate_key(resume_bytes):
+    """Candidates are identified by their uploaded file, so re-uploads update one entry."""
+    return hashlib.blake2b(resume_bytes, digest_size=16).hexdigest()
+
+
+class EmbeddingMismatch(Exception):
+    """The index holds vectors from another embedding backend or model."""
+
+    def __init__(self, stored, configured, status_code=409):
+        super().__init__(
+            f"Candidate index was built with {stored}, not {configured}; switch back, or run "
+            f"`python -m services.vector_index reset` and re-analyze the resumes"
+        )
+        self.stored = stored
+        self.configured = configured
+        self.status_code = status_code
+
+
+class VectorIndex:
+    """Persistent flat index of unit-length resume embeddings.
+
+    Vectors live in a memory-mapped ``.npy`` matrix (one row per
+    candidate) and row metadata in SQLite. Search is a single matrix-vector
+    product over the mapped rows, so the OS page cache does the caching and
+    several gunicorn workers can share one index: writers serialize on the
+    SQLite write lock, readers reload the live-row mask only when another
+    connection has committed.
+
+    The index records the embedding (backend/model) its vectors came from.
+    With any other ``embedding`` it refuses to add or search rather than
+    mix vectors that are not comparable.
+    """
+
+    def __init__(self, directory, embedding=EMBEDDING_ID):
+        os.makedirs(directory, exist_ok=True)
+        self.matrix_path = os.path.join(directory, "vectors.npy")
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._matrix_stat = None
+        self._live = np.zeros(0, dtype=bool)
+        self._live_version = None
+
+        self._db = sqlite3.connect(
+            os.path.join(directory, "vectors.sqlite3"), check_same_thread=False, timeout=10,
+            isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS vectors (
+                row INTEGER PRIMARY KEY,
+                candidate_id TEXT NOT NULL UNIQUE,
+                name TEXT,
+                report_id TEXT,
+                added REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE TABLE IF NOT EXISTS free_rows (row INTEGER PRIMARY KEY)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.embedding = embedding
+        self.stored_embedding = self._stamp_embedding()
+
+    def _read_embedding(self):
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'embedding'").fetchone()
+        return row[0] if row else None
+
+    def _stamp_embedding(self):
+        stored = self._read_embedding()
+        if stored:
+            return stored
+        if self._db.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]:
+            # Indexes from before the stamp existed: assume the current embedding built them
+            print(f"⚠️ Candidate index has no embedding recorded; assuming {self.embedding}")
+        self._db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('embedding', ?)", (self.embedding,))
+        return self._read_embedding()
+
+    def _check_embedding(self):
+        # Read every time: another process may have reset the index since
+        with self._lock:
+            self.stored_embedding = self._read_embedding()
+        if self.stored_embedding != self.embedding:
+            raise EmbeddingMismatch(self.stored_embedding, self.embedding)
+
+    # ---------------- Matrix File ----------------
+    def _open_matrix(self):
+        """(Re)map the matrix file if it was created or grown since we last looked."""
+        try:
+            stat = os.stat(self.matrix_path)
+        except FileNotFoundError:
+            self._matrix, self._matrix_stat = None, None
+            return None
+        key = (stat.st_ino, stat.st_size)
+        if key != self._matrix_stat:
+            self._matrix = np.load(self.matrix_path, mmap_mode="r+")
+            self._matrix_stat = key
+        return self._matrix
+
+    def _reserve(self, rows, dim):
+        """Make sure the matrix has at least ``rows`` rows; grows by doubling."""
+        matrix = self._open_matrix()
+        if matrix is not None and matrix.shape[1] != dim:
+            raise ValueError(f"Vector index holds {matrix.shape[1]}-d vectors, got {dim}-d")
+        if matrix is not None and matrix.shape[0] >= rows:
+            return matrix
+
+        capacity = max(VECTOR_INDEX_INITIAL_ROWS, rows, 2 * (matrix.shape[0] if matrix is not None else 0))
+        tmp_path = f"{self.matrix_path}.{uuid.uuid4().hex}.tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, dim))
+        if matrix is not None:
+            grown[:matrix.shape[0]] = matrix
+        grown.flush()
+        del grown
+        os.replace(tmp_path, self.matrix_path)
+        return self._open_matrix()
+
+    def _refresh_live(self):
+        # data_version only changes for commits made by *other* connections;
+        # our own writes reset _live_version instead
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._live_version:
+            return
+        rows = np.fromiter((r for (r,) in self._db.execute("SELECT row FROM vectors")), dtype=np.int64)
+        live = np.zeros(int(rows.max()) + 1 if rows.size else 0, dtype=bool)
+        live[rows] = True
+        self._live, self._live_version = live, version
+
+    # ---------------- Writes ----------------
+    def add(self, candidate_id, vector, name=None, report_id=None):
+        """Insert or replace one candidate's vector; returns its row."""
+        self._check_embedding()
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                existing = db.execute(
+                    "SELECT row FROM vectors WHERE candidate_id = ?", (candidate_id,)
+                ).fetchone()
+                if existing:
+                    row = existing[0]
+                else:
+                    free = db.execute("SELECT row FROM free_rows ORDER BY row LIMIT 1").fetchone()
+                    if free:
+                        row = free[0]
+                        db.execute("DELETE FROM free_rows WHERE row = ?", (row,))
+                    else:
+                        row = db.execute("SELECT COALESCE(MAX(row), -1) + 1 FROM vectors").fetchone()[0]
+
+                matrix = self._reserve(row + 1, vector.shape[0])
+                matrix[row] = vector
+                matrix.flush()
+                # Re-adding keeps the name and report of the earlier entry unless new ones are given
+                db.execute(
+                    "INSERT INTO vectors (row, candidate_id, name, report_id, added) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (candidate_id) DO UPDATE SET name = COALESCE(excluded.name, name), "
+                    "report_id = COALESCE(excluded.report_id, report_id), added = excluded.added",
+                    (row, candidate_id, name, report_id, time.time())
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            finally:
+                self._live_version = None
+        return row
+
+    def delete(self, candidate_id):
+        """Remove a candidate; its row is reused by a later add. Returns False if unknown."""
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                existing = db.execute(
+                    "SELECT row FROM vectors WHERE candidate_id = ?", (candidate_id,)
+                ).fetchone()
+                if existing:
+                    db.execute("DELETE FROM vectors WHERE row = ?", existing)
+                    db.execute("INSERT OR IGNORE INTO free_rows (row) VALUES (?)", existing)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            finally:
+                self._live_version = None
+        return existing is not None
+
+    # ---------------- Queries ----------------
+    def search(self, vector, top_k=10):
+        """Return up to ``top_k`` candidates by cosine similarity, best first."""
+        self._check_embedding()
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        with self._lock:
+            self._refresh_live()
+            matrix = self._open_matrix()
+            live = self._live
+            if matrix is None or not live.any() or top_k <= 0:
+                return []
+            scores = matrix[:live.shape[0]] @ vector
+            scores[~live] = -np.inf
+
+            top_k = min(top_k, int(live.sum()))
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-scores[top])]
+            meta = {
+                row: (candidate_id, name, report_id, added)
+                for row, candidate_id, name, report_id, added in self._db.execute(
+                    f"SELECT row, candidate_id, name, report_id, added FROM vectors "
+                    f"WHERE row IN ({','.join('?' * len(top))})", [int(r) for r in top]
+                )
+            }
+
+        results = []
+        for row in top:
+            if int(row) not in meta:
+                continue
+            candidate_id, name, report_id, added = meta[int(row)]
+            results.append({
+                "candidate_id": candidate_id,
+                "name": name,
+                "report_id": report_id,
+                "added": added,
+                "score": round(float(scores[row]) * 100, 2)
+            })
+        return results
+
+    def reset(self):
+        """Drop every vector and record the configured embedding as the index's own.
+
+        The matrix file goes too, since another model may have another dimension.
+        """
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute("DELETE FROM vectors")
+                db.execute("DELETE FROM free_rows")
+                db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('embedding', ?)", (self.embedding,))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            finally:
+                self._live_version = None
+            try:
+                os.remove(self.matrix_path)
+            except FileNotFoundError:
+                pass
+            self._matrix, self._matrix_stat = None, None
+            self.stored_embedding = self.embedding
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            matrix = self._open_matrix()
+            count = self._db.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+        return {
+            "candidates": count,
+            "capacity": matrix.shape[0] if matrix is not None else 0,
+            "dim": matrix.shape[1] if matrix is not None else 0,
+            "embedding": self.stored_embedding,
+            "embedding_matches": self.stored_embedding == self.embedding
+        }
+
+
+_vector_index = None
+_vector_index_lock = threading.Lock()
+
+
+def get_vector_index():
+    """Process-wide index, opened on first use (after gunicorn forks)."""
+    global _vector_index
+    if not CANDIDATE_INDEX_ENABLED:
+        return None
+    with _vector_index_lock:
+        if _vector_index is None:
+            _vector_index = VectorIndex(CANDIDATE_INDEX_DIR)
+        return _vector_index
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] != ["reset"]:
+        sys.exit("usage: python -m services.vector_index reset")
+    index = VectorIndex(CANDIDATE_INDEX_DIR)
+    print(f"Removing {len(index)} vectors built with {index.stored_embedding}")
+    index.reset()
+    print(f"✅ Candidate index now expects {index.embedding}")
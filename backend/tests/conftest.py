@@ -0,0 +1,38 @@
+"""Shared setup: runs offline, with every persistent store in a scratch directory.
+
+The environment is set before any test module imports the services, since
+their settings are read at import time.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRATCH_DIR = tempfile.mkdtemp(prefix="hirelens-tests-")
+
+sys.path.insert(0, BACKEND_DIR)
+for name, value in {
+    "EMBEDDING_BACKEND": "stub",
+    "PDF_WORKERS": "0",
+    "CANDIDATE_INDEX_ENABLED": "0",
+    "RESULT_CACHE_PATH": os.path.join(SCRATCH_DIR, "results.sqlite3"),
+    "REPORT_FOLDER": os.path.join(SCRATCH_DIR, "output"),
+    "CANDIDATE_INDEX_DIR": os.path.join(SCRATCH_DIR, "index"),
+    "JOB_DB": os.path.join(SCRATCH_DIR, "jobs", "jobs.sqlite3"),
+}.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def make_pdf():
+    """Render page texts into a PDF (needs reportlab, like the benchmarks)."""
+    pytest.importorskip("reportlab")
+    from benchmarks.corpus import render_resume_pdf
+    return render_resume_pdf
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
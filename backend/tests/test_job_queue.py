@@ -0,0 +1,199 @@
+"""Job queue: claiming across lanes and connections, backpressure and events."""
+import io
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+
+import app as app_module
+from services import job_queue
+from services.job_queue import JobQueue, QueueFull, job_events
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Like app.py: a __main__ that imports the pipeline, which spawn re-imports in
+# every job worker before the worker's own setup runs
+WORKER_MAIN = textwrap.dedent("""
+    import json
+    import sys
+    import time
+
+    import services.pipeline  # noqa: F401
+    from services.job_queue import job_status, submit_analysis_job
+
+    if __name__ == "__main__":
+        with open(sys.argv[1], "rb") as f:
+            job_id = submit_analysis_job(f.read(), "python developer with docker")
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            status = job_status(job_id)
+            if status["state"] in ("done", "failed"):
+                break
+            time.sleep(0.2)
+        print(json.dumps({"state": status["state"], "error": status.get("error")}))
+""")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"), max_queued=10)
+
+
+def enqueue(queue, kind, name):
+    return queue.enqueue(kind, {"name": name}, [(name, b"%PDF-" + name.encode())])
+
+
+def claim_name(queue):
+    job = queue.claim()
+    return job and job[2]["name"]
+
+
+def test_claim_returns_the_job_and_its_inputs(queue):
+    job_id = enqueue(queue, "single", "a")
+    assert queue.claim() == (job_id, "single", {"name": "a"}, [("a", b"%PDF-a")])
+    assert queue.get(job_id)["state"] == "running"
+    assert queue.claim() is None
+
+
+def test_lanes_take_turns(queue):
+    for name in ("batch-1", "batch-2"):
+        enqueue(queue, "batch", name)
+    for name in ("single-1", "single-2"):
+        enqueue(queue, "single", name)
+    # Oldest first while neither lane runs anything, then whichever lane runs fewer
+    assert [claim_name(queue) for _ in range(4)] == ["batch-1", "single-1", "batch-2", "single-2"]
+
+
+def test_a_running_batch_does_not_hold_up_single_jobs(queue):
+    enqueue(queue, "batch", "batch-1")
+    enqueue(queue, "batch", "batch-2")
+    assert claim_name(queue) == "batch-1"
+    enqueue(queue, "single", "single-1")
+    assert claim_name(queue) == "single-1"
+
+
+def test_concurrent_connections_claim_each_job_once(queue):
+    job_ids = {enqueue(queue, "single", str(i)) for i in range(10)}
+    claimed, errors = [], []
+
+    def work():
+        worker_queue = JobQueue(queue.path)
+        try:
+            while (job := worker_queue.claim()) is not None:
+                claimed.append(job[0])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert sorted(claimed) == sorted(job_ids)
+
+
+def test_enqueue_refuses_when_full(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), max_queued=2)
+    enqueue(queue, "single", "a")
+    enqueue(queue, "batch", "b")
+    with pytest.raises(QueueFull):
+        enqueue(queue, "single", "c")
+    # Running jobs do not count against the limit
+    queue.claim()
+    enqueue(queue, "single", "c")
+    assert queue.stats()["queued"] == 2
+
+
+def test_stale_jobs_are_retried_then_failed(queue, monkeypatch):
+    job_id = enqueue(queue, "single", "a")
+    assert queue.claim()[0] == job_id
+    monkeypatch.setattr(job_queue, "JOB_STALE_SECONDS", -1)
+    assert queue.claim()[0] == job_id
+    assert queue.claim() is None
+    job = queue.get(job_id)
+    assert job["state"] == "failed" and job["status_code"] == 500
+
+
+def test_finish_and_sweep(queue):
+    job_id = enqueue(queue, "single", "a")
+    queue.claim()
+    queue.finish(job_id, {"score": 1})
+    assert queue.get(job_id)["result"] == {"score": 1}
+    assert queue.sweep(retention=-1) == 1
+    assert queue.get(job_id) is None
+
+
+# ---------------- Apps and events ----------------
+@pytest.fixture
+def enabled(monkeypatch, tmp_path):
+    def use(max_queued):
+        queue = JobQueue(str(tmp_path / "app-jobs.sqlite3"), max_queued=max_queued)
+        monkeypatch.setattr(app_module, "JOB_QUEUE_ENABLED", True)
+        monkeypatch.setattr(job_queue, "get_job_queue", lambda: queue)
+        monkeypatch.setattr(job_queue, "start_job_workers", lambda: None)
+        return queue
+    return use
+
+
+def post_resume(client):
+    return client.post("/analyze", data={
+        "resume": (io.BytesIO(b"%PDF-1.4 resume"), "resume.pdf"), "job_description": "python developer"
+    }, content_type="multipart/form-data")
+
+
+def test_full_queue_answers_429(enabled):
+    enabled(max_queued=0)
+    response = post_resume(app_module.app.test_client())
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(job_queue.JOB_RETRY_AFTER_SECONDS)
+
+
+def test_queued_job_is_polled(enabled):
+    enabled(max_queued=1)
+    client = app_module.app.test_client()
+    response = post_resume(client)
+    assert response.status_code == 202
+    status = client.get(f"/jobs/{response.get_json()['job_id']}").get_json()
+    assert status["state"] == "queued" and status["queue_position"] == 0
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_event_stream_is_capped(enabled):
+    queue = enabled(max_queued=1)
+    job_id = enqueue(queue, "single", "a")
+    events = list(job_events(job_id, max_seconds=0))
+    assert events[0].startswith("event: progress")
+    assert events[-1].startswith(f"retry: {job_queue.JOB_EVENTS_RETRY_MS}\nevent: reconnect")
+
+
+def test_event_stream_ends_with_the_result(enabled):
+    queue = enabled(max_queued=1)
+    job_id = enqueue(queue, "single", "a")
+    queue.claim()
+    queue.fail(job_id, "PDF has 60 pages; the limit is 50", 413)
+    events = list(job_events(job_id, max_seconds=30))
+    assert len(events) == 1 and events[0].startswith("event: failed")
+
+
+def test_spawned_workers_extract_in_process(tmp_path, make_pdf):
+    (tmp_path / "main.py").write_text(WORKER_MAIN)
+    (tmp_path / "resume.pdf").write_bytes(make_pdf(["experience\npython developer, docker"]))
+    env = {
+        **os.environ,
+        "PYTHONPATH": BACKEND_DIR,
+        "JOB_QUEUE_ENABLED": "1",
+        "JOB_WORKERS": "1",
+        "JOB_DB": str(tmp_path / "jobs" / "jobs.sqlite3"),
+        # The web process's setting; the workers must not start a pool of their own
+        "PDF_WORKERS": "2",
+    }
+    output = subprocess.run(
+        [sys.executable, "main.py", "resume.pdf"], cwd=tmp_path, env=env,
+        capture_output=True, text=True, timeout=120, check=True
+    )
+    assert json.loads(output.stdout.strip().splitlines()[-1]) == {"state": "done", "error": None}
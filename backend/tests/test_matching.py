@@ -0,0 +1,94 @@
+"""The single-pass matchers against the per-term scans they replaced."""
+import random
+import re
+
+import pytest
+
+from utils.matching import SkillMatcher, TermBits
+from utils.taxonomy import get_taxonomy
+
+SEPARATORS = [" ", " ", ", ", ". ", "/", "-", "_", "+", "(", ")", "\n", ""]
+FILLER = ["and", "with", "experience", "in", "the", "js", "net", "ops", "x", "2", "c"]
+
+
+def baseline_words(vocabulary, text):
+    # What utils.skills.extract_skills / extract_soft_skills did per term
+    text = text.lower()
+    return {term for term in vocabulary if re.search(r"\b" + re.escape(term) + r"\b", text)}
+
+
+def baseline_substrings(vocabulary, text):
+    # What utils.skills.extract_certifications did per term
+    text = text.lower()
+    return {term for term in vocabulary if term in text}
+
+
+def random_text(rng, vocabulary):
+    # Terms glued to each other, to filler and to punctuation, so the
+    # boundary cases (c++, ci/cd, node.js, prefixes of longer terms) come up
+    parts = []
+    for _ in range(rng.randint(1, 25)):
+        word = rng.choice(vocabulary) if rng.random() < 0.6 else rng.choice(FILLER)
+        if rng.random() < 0.2:
+            word = word.upper()
+        parts.append(word + rng.choice(SEPARATORS))
+    return "".join(parts)
+
+
+@pytest.fixture(scope="module")
+def taxonomy():
+    return get_taxonomy()
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_word_matchers_match_baseline(taxonomy, seed):
+    rng = random.Random(seed)
+    for matcher in (taxonomy.soft_skill_matcher, SkillMatcher(taxonomy.skill_matcher.terms)):
+        text = random_text(rng, matcher.terms)
+        assert matcher.extract(text) == baseline_words(matcher.terms, text), text
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_certification_matcher_matches_baseline(taxonomy, seed):
+    rng = random.Random(seed)
+    matcher = taxonomy.certification_matcher
+    text = random_text(rng, matcher.terms)
+    assert matcher.extract(text) == baseline_substrings(matcher.terms, text), text
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_aliases_report_the_canonical_skill(taxonomy, seed):
+    rng = random.Random(seed)
+    matcher = taxonomy.skill_matcher
+    text = random_text(rng, matcher.terms)
+    surface = baseline_words(matcher.terms, text)
+    assert matcher.extract(text) == {matcher.canonical.get(term, term) for term in surface}, text
+
+
+def test_alias_spelling(taxonomy):
+    assert taxonomy.skill_matcher.extract("Built services in NodeJS and ReactJS") == {"node.js", "react"}
+
+
+def test_prefix_terms_follow_word_boundaries():
+    matcher = SkillMatcher(["c", "c++", "java", "javascript"])
+    # As with the old r"\bc\+\+\b", a term ending in punctuation needs a
+    # word character right after it
+    assert matcher.extract("c++ and javascript") == {"c", "javascript"}
+    assert matcher.extract("c++11") == {"c", "c++"}
+    assert matcher.extract("c, java") == {"c", "java"}
+    assert matcher.extract("javascripts") == set()
+
+
+def test_extract_bits_decodes_to_extract(taxonomy):
+    matcher = taxonomy.skill_matcher
+    bits = TermBits(matcher.terms)
+    text = "python, k8s, nodejs and scikit-learn on aws"
+    assert set(bits.decode(matcher.extract_bits(text))) == matcher.extract(text)
+
+
+def test_compiled_parts_rebuild_the_same_matcher(taxonomy):
+    matcher = taxonomy.skill_matcher
+    pattern, implied = matcher.compiled_parts()
+    rebuilt = SkillMatcher(matcher.terms, matcher.word_boundary, pattern, implied)
+    text = "c++ / ci/cd with node.js, next.js and objective-c"
+    assert rebuilt.extract(text) == SkillMatcher(matcher.terms).extract(text)
@@ -0,0 +1,62 @@
+"""Report rendering: the cached text path against plain ReportLab calls."""
+import io
+
+import pytest
+
+pytest.importorskip("reportlab")
+from reportlab import rl_config, rl_settings
+
+from services import report_generator
+from services.nlp_analyzer import analyze_resume
+
+
+@pytest.fixture(scope="module")
+def analysis():
+    return analyze_resume(
+        "experience: python developer, docker, sql, teamwork. education: b.tech. aws certified",
+        "Backend engineer: python, docker, kubernetes, communication"
+    )
+
+
+def page_texts(pdf):
+    from PyPDF2 import PdfReader
+
+    return [page.extract_text() for page in PdfReader(io.BytesIO(pdf)).pages]
+
+
+def test_cached_text_matches_plain_reportlab(analysis, monkeypatch):
+    cached = report_generator.render_report_pdf(analysis)
+    monkeypatch.setattr(report_generator, "REPORT_RENDER_CACHE", False)
+    report_generator.wrap_text.cache_clear()
+    try:
+        plain = report_generator.render_report_pdf(analysis)
+    finally:
+        report_generator.wrap_text.cache_clear()
+    assert page_texts(cached) == page_texts(plain)
+
+
+def test_ascii85_is_set_per_document(analysis, monkeypatch):
+    assert b"/ASCII85Decode" not in report_generator.render_report_pdf(analysis)
+    monkeypatch.setattr(report_generator, "REPORT_ASCII85", True)
+    assert b"/ASCII85Decode" in report_generator.render_report_pdf(analysis)
+    # Other ReportLab users in the process keep ReportLab's own setting
+    assert rl_config.useA85 == rl_settings.useA85
+
+
+def test_canvas_without_text_state_takes_the_plain_path():
+    class Canvas:
+        def __init__(self):
+            self.calls = []
+
+        def stringWidth(self, text):
+            return 10.0
+
+        def drawString(self, x, y, text):
+            self.calls.append(("drawString", x, y, text))
+
+        def addLiteral(self, code):
+            self.calls.append(("addLiteral", code))
+
+    c = Canvas()
+    report_generator.draw_centred_string(c, 100, 50, "HireLens")
+    assert c.calls == [("drawString", 95.0, 50, "HireLens")]
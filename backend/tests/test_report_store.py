@@ -0,0 +1,57 @@
+"""Report eviction: what the sweeper spares, and which process runs it."""
+import os
+import subprocess
+import sys
+import textwrap
+
+from services import report_store
+from services.report_store import ReportIndex
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def old_index(tmp_path):
+    index = ReportIndex(str(tmp_path / "index.sqlite3"))
+    for report_id in ("a", "b"):
+        index.add(report_id, 100)
+    # Both created long ago; "b" has just been downloaded
+    index._db.execute("UPDATE reports SET created = 0, accessed = 0")
+    index._db.commit()
+    index.touch("b")
+    return index
+
+
+def test_recently_accessed_reports_are_not_expired(tmp_path):
+    index = old_index(tmp_path)
+    assert index.expired(max_age=60, grace=60) == ["a"]
+    assert sorted(index.expired(max_age=60, grace=-1)) == ["a", "b"]
+
+
+def test_recently_accessed_reports_are_kept_over_budget(tmp_path):
+    index = old_index(tmp_path)
+    assert index.over_budget(max_bytes=0, grace=60) == ["a"]
+    assert index.over_budget(max_bytes=0, grace=-1) == ["a", "b"]
+
+
+def test_one_process_sweeps_the_report_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(report_store, "REPORT_FOLDER", str(tmp_path))
+    monkeypatch.setattr(report_store, "_sweeper_lock_file", None)
+    other = textwrap.dedent("""
+        from services import report_store
+        print(report_store.owns_report_sweep())
+    """)
+    env = {**os.environ, "REPORT_FOLDER": str(tmp_path), "REPORT_STORAGE": "disk"}
+
+    def other_owns():
+        output = subprocess.run(
+            [sys.executable, "-c", other], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        return output.stdout.strip().splitlines()[-1]
+
+    try:
+        assert report_store.owns_report_sweep()
+        assert report_store.owns_report_sweep()
+        assert other_owns() == "False"
+    finally:
+        report_store._sweeper_lock_file.close()
+    assert other_owns() == "True"
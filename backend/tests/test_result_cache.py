@@ -0,0 +1,87 @@
+"""Result cache keys change whenever the inputs or the analysis settings do."""
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+from services import nlp_analyzer
+from services.nlp_analyzer import job_profile_key
+from services.pipeline import ANALYSIS_VARIANT, run_analysis
+from services.result_cache import ResultCache, pdf_digest, result_key
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE = job_profile_key("python developer")
+
+
+def analysis_variant(**env):
+    # Settings are read at import time, so each variant needs a fresh interpreter
+    output = subprocess.run(
+        [sys.executable, "-c", "from services.pipeline import ANALYSIS_VARIANT; print(ANALYSIS_VARIANT)"],
+        cwd=BACKEND_DIR, env={**os.environ, **env}, capture_output=True, text=True, check=True
+    )
+    return output.stdout.strip()
+
+
+def test_result_key_depends_on_every_part():
+    base = result_key(b"%PDF-a", PROFILE, "v1")
+    assert result_key(b"%PDF-a", PROFILE, "v1") == base
+    assert result_key(b"%PDF-b", PROFILE, "v1") != base
+    assert result_key(b"%PDF-a", job_profile_key("java developer"), "v1") != base
+    assert result_key(b"%PDF-a", PROFILE, "v2") != base
+
+
+def test_precomputed_digest_gives_the_same_key():
+    data = b"%PDF-1.4 resume"
+    assert result_key(data, PROFILE, "v", pdf_digest(data)) == result_key(data, PROFILE, "v")
+
+
+def test_job_profile_key():
+    assert job_profile_key("  Python\n Developer ") == PROFILE
+    assert job_profile_key("python developer", "backend") != PROFILE
+
+
+def test_job_profile_key_follows_the_taxonomy(monkeypatch):
+    monkeypatch.setattr(nlp_analyzer, "get_taxonomy", lambda: types.SimpleNamespace(build_id="another-build"))
+    assert job_profile_key("python developer") != PROFILE
+
+
+@pytest.mark.parametrize("env", [
+    {"EMBEDDING_MODEL_NAME": "all-mpnet-base-v2"},
+    {"EMBEDDING_BACKEND": "onnx"},
+    {"ANALYZE_STREAMING": "0"},
+    {"RESUME_MAX_PAGES": "3"},
+    {"SEMANTIC_CHUNKING": "1"},
+    {"PDF_BACKENDS": "pdfminer"},
+])
+def test_analysis_variant_follows_settings(env):
+    assert analysis_variant() == ANALYSIS_VARIANT
+    assert analysis_variant(**env) != ANALYSIS_VARIANT
+
+
+def test_entries_expire(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite3"), ttl=-1)
+    cache.put("key", {"score": 1}, "report")
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path / "results.sqlite3"), max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"key": key}, f"report-{key}")
+    assert cache.get("a") == ({"key": "a"}, "report-a")
+    assert cache.evict() == 1
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+
+
+def test_run_analysis_reuses_identical_submissions(make_pdf):
+    pdf = make_pdf(["experience\npython developer with docker, sql and aws"])
+    jd = "Looking for a python developer who knows docker and kubernetes"
+    first = run_analysis(pdf, jd)
+    again = run_analysis(pdf, jd)
+    assert not first["cached"] and again["cached"]
+    assert again["report_id"] == first["report_id"]
+    assert again["analysis"] == first["analysis"]
+    assert not run_analysis(pdf, jd + " and terraform")["cached"]
@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from services.nlp_analyzer import ResumeScan, scan_resume
+from utils.taxonomy import get_taxonomy
+
+WORDS = [
+    "machine", "learning", "deep", "unit", "testing", "big", "data", "python", "c#", "ci/cd", "node.js",
+    "amazon", "web", "services", "team", "built", "the", "and", "communication", "aws", "certified",
+]
+
+
+def whole_text_bits(text):
+    taxonomy = get_taxonomy()
+    return (
+        taxonomy.skill_matcher.extract_bits(text),
+        taxonomy.soft_skill_matcher.extract_bits(text),
+        taxonomy.certification_matcher.extract_bits(text),
+    )
+
+
+def scan_bits(scan):
+    return scan.skill_bits, scan.soft_skill_bits, scan.cert_bits
+
+
+def test_term_split_across_first_page_boundary():
+    # The first page is shorter than the overlap, so the tail is the whole document
+    scan = scan_resume(iter(["machine", "learning engineer"]))
+    assert "machine learning" in scan.skills
+
+
+def test_term_split_after_long_first_page():
+    scan = scan_resume(iter(["built the platform " * 20 + "machine", "learning engineer"]))
+    assert "machine learning" in scan.skills
+
+
+def test_cut_tail_does_not_start_a_term():
+    # The tail is cut right before "sql", which is part of the word "ysql"
+    overlap = get_taxonomy().scan_overlap
+    first = "y" * 50 + "sql " + "z" * (overlap - 3)
+    scan = scan_resume(iter([first, "developer"]))
+    assert "sql" not in scan.skills
+    assert scan_bits(scan) == whole_text_bits(scan.text)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_pages_match_like_whole_text(seed):
+    rng = random.Random(seed)
+    words = [rng.choice(WORDS) for _ in range(rng.randint(1, 40))]
+    # Split at random word positions, including several tiny pages in a row
+    cuts = sorted(rng.sample(range(1, len(words)), min(len(words) - 1, rng.randint(0, 6)))) if len(words) > 1 else []
+    pages = [" ".join(words[a:b]) for a, b in zip([0] + cuts, cuts + [len(words)])]
+
+    scan = scan_resume(iter(pages))
+    assert scan.text == " ".join(words)
+    assert scan_bits(scan) == whole_text_bits(scan.text)
+
+
+def test_budget_stops_at_a_word_boundary():
+    scan = ResumeScan(max_chars=20)
+    assert scan.feed("python developer with docker") is False
+    assert scan.truncated
+    assert scan.text == "python developer"
+    assert "docker" not in scan.skills
@@ -0,0 +1,58 @@
+"""Chunked semantic scoring: windows that fit the model, and pooling settings."""
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from models.backends import EmbeddingBackend
+from utils import scoring
+from utils.scoring import fit_chunks, pooled_similarity, split_into_chunks
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def pieces(texts):
+    # A tokenizer that splits "kubernetes-operator" style words into many pieces
+    return [sum(1 + word.count("-") for word in text.split()) for text in texts]
+
+
+def test_chunks_over_the_token_limit_are_split():
+    text = " ".join(["python"] * 6 + ["a-b-c-d-e-f-g-h"] * 4)
+    chunks = split_into_chunks(text, chunk_words=10, overlap=2)
+    assert pieces(chunks) == [38]
+    fitted = fit_chunks(chunks, pieces, max_tokens=16)
+    assert " ".join(fitted) == text
+    assert max(pieces(fitted)) <= 16
+
+
+def test_embed_chunks_fits_windows_to_the_model(monkeypatch):
+    class Model(EmbeddingBackend):
+        max_tokens = 16
+
+        def token_counts(self, texts):
+            return pieces(texts)
+
+    encoded = []
+
+    def encode(texts):
+        encoded.extend(texts)
+        return np.ones((len(texts), 4))
+
+    monkeypatch.setattr(scoring, "get_embedding_model", lambda: Model())
+    monkeypatch.setattr(scoring.embedding_service, "encode", encode)
+    scoring.embed_chunks(" ".join(["a-b-c-d-e-f-g-h"] * 4))
+    assert pieces(encoded) == [16, 16]
+
+
+def test_unknown_pooling_is_refused():
+    chunks = np.eye(2, dtype=np.float32)
+    assert pooled_similarity(chunks, chunks, "max") == 1.0
+    with pytest.raises(ValueError, match="Unknown chunk pooling"):
+        pooled_similarity(chunks, chunks, "median")
+    output = subprocess.run(
+        [sys.executable, "-c", "import utils.scoring"], cwd=BACKEND_DIR,
+        env={**os.environ, "SEMANTIC_CHUNK_POOLING": "median"}, capture_output=True, text=True
+    )
+    assert output.returncode != 0 and "SEMANTIC_CHUNK_POOLING must be one of" in output.stderr
@@ -0,0 +1,89 @@
+"""Boolean skill queries: parsing, evaluation and the filter endpoint."""
+import pytest
+
+from services.skill_index import SkillIndex, SkillQueryError, parse_skill_query
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SkillIndex(str(tmp_path))
+    index.add("alice", ["python", "docker", "sql"], name="Alice")
+    index.add("bob", ["java", "docker"], name="Bob")
+    index.add("carol", ["python", "kubernetes", "php"], name="Carol")
+    return index
+
+
+def names(index, query):
+    total, candidates = index.query(query)
+    assert total == len(candidates)
+    return sorted(candidate["name"] for candidate in candidates)
+
+
+def test_precedence():
+    assert parse_skill_query("python OR java AND NOT php") == (
+        "or", ("skill", "python"), ("and", ("skill", "java"), ("not", ("skill", "php")))
+    )
+    assert parse_skill_query("(python or java) and docker") == (
+        "and", ("or", ("skill", "python"), ("skill", "java")), ("skill", "docker")
+    )
+
+
+def test_multi_word_skills_and_aliases():
+    assert parse_skill_query("Machine Learning AND nodejs") == (
+        "and", ("skill", "machine learning"), ("skill", "node.js")
+    )
+
+
+def test_unknown_skill_is_kept():
+    assert parse_skill_query("python AND cobol") == ("and", ("skill", "python"), ("skill", "cobol"))
+
+
+@pytest.mark.parametrize("query", [
+    "", "AND python", "python AND", "python OR OR java", "(python AND docker", "python)", "NOT", "()",
+])
+def test_malformed_queries_raise(query):
+    with pytest.raises(SkillQueryError):
+        parse_skill_query(query)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("python", ["Alice", "Carol"]),
+    ("python AND docker", ["Alice"]),
+    ("python OR java", ["Alice", "Bob", "Carol"]),
+    ("docker AND NOT python", ["Bob"]),
+    ("NOT (docker OR php)", []),
+    ("cobol", []),
+    ("python AND cobol", []),
+    ("NOT cobol", ["Alice", "Bob", "Carol"]),
+])
+def test_query(index, query, expected):
+    assert names(index, query) == expected
+
+
+def test_updates_and_deletes(index):
+    index.add("bob", ["java", "python"], name="Bob")
+    assert names(index, "python") == ["Alice", "Bob", "Carol"]
+    assert names(index, "docker") == ["Alice"]
+    assert index.delete("carol")
+    assert not index.delete("carol")
+    assert names(index, "python") == ["Alice", "Bob"]
+
+
+def test_other_connections_see_writes(index, tmp_path):
+    other = SkillIndex(str(tmp_path))
+    assert names(other, "docker") == ["Alice", "Bob"]
+    index.add("dave", ["docker"], name="Dave")
+    index.delete("alice")
+    assert names(other, "docker") == ["Bob", "Dave"]
+
+
+def test_filter_endpoint(index, monkeypatch):
+    import app as app_module
+
+    monkeypatch.setattr(app_module, "get_skill_index", lambda: index)
+    client = app_module.app.test_client()
+    response = client.post("/api/candidates/filter", json={"query": "python AND cobol"})
+    assert response.status_code == 200
+    assert response.get_json()["total"] == 0
+    response = client.post("/api/candidates/filter", json={"query": "python AND"})
+    assert response.status_code == 400
@@ -0,0 +1,37 @@
+"""Taxonomy artifact: rebuilt when it no longer matches its source."""
+import json
+import shutil
+
+import pytest
+
+from utils.taxonomy import TAXONOMY_SOURCE, build_artifact, load_taxonomy
+
+
+@pytest.fixture
+def paths(tmp_path):
+    source, artifact = tmp_path / "taxonomy.json", tmp_path / "taxonomy.bin"
+    shutil.copy(TAXONOMY_SOURCE, source)
+    build_artifact(str(source), str(artifact))
+    return source, artifact
+
+
+def add_skill(source, skill):
+    data = json.loads(source.read_text())
+    data["skills"].append(skill)
+    source.write_text(json.dumps(data))
+
+
+def test_edited_source_is_rebuilt(paths):
+    source, artifact = paths
+    assert "cobol" not in load_taxonomy(str(artifact), str(source)).general_skills
+    add_skill(source, "cobol")
+    assert "cobol" in load_taxonomy(str(artifact), str(source)).general_skills
+    assert "cobol" in load_taxonomy(str(artifact), str(source)).general_skills
+
+
+def test_stale_artifact_is_kept_if_the_source_is_invalid(paths, capsys):
+    source, artifact = paths
+    build_id = load_taxonomy(str(artifact), str(source)).build_id
+    source.write_text("{")
+    assert load_taxonomy(str(artifact), str(source)).build_id == build_id
+    assert "stale skill taxonomy" in capsys.readouterr().out
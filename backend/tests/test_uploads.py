@@ -0,0 +1,201 @@
+"""Uploads refused before analysis, and the status codes they map to."""
+import io
+import json
+import zipfile
+
+import pytest
+
+import app as app_module
+from services.pdf_extractor import PDF_MAX_PAGES, PdfExtractionError, extract_text_from_bytes, iter_pdf_pages
+from services.result_cache import pdf_digest
+from services.uploads import UploadError, read_upload
+from services.vector_index import candidate_key
+
+JD = "Python developer with docker and sql"
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def resume_pdf(make_pdf):
+    return make_pdf(["experience\npython developer, docker and sql"])
+
+
+def post_resume(client, data, filename="resume.pdf", **form):
+    return client.post("/analyze", data={
+        "resume": (io.BytesIO(data), filename), "job_description": JD, **form
+    }, content_type="multipart/form-data")
+
+
+def zip_of(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def patch_member(archive, name, flag_bits=0, compress_type=None):
+    # zipfile cannot write encrypted members or unknown compression methods,
+    # so edit the member's central directory record, which is what it reads
+    data = bytearray(archive)
+    record = data.index(b"PK\x01\x02")
+    while True:
+        name_length = int.from_bytes(data[record + 28:record + 30], "little")
+        if data[record + 46:record + 46 + name_length] == name.encode():
+            break
+        record = data.index(b"PK\x01\x02", record + 4)
+    flags = int.from_bytes(data[record + 8:record + 10], "little") | flag_bits
+    data[record + 8:record + 10] = flags.to_bytes(2, "little")
+    if compress_type is not None:
+        data[record + 10:record + 12] = compress_type.to_bytes(2, "little")
+    return bytes(data)
+
+
+def batch_errors(response):
+    errors = {}
+    for line in response.get_data(as_text=True).splitlines():
+        result = json.loads(line)
+        if result.get("status") == "error":
+            errors[result["candidate_id"]] = result["error"]
+    return errors
+
+
+def post_batch(client, archive):
+    return client.post("/analyze/batch", data={
+        "archive": (io.BytesIO(archive), "resumes.zip"), "job_description": JD
+    }, content_type="multipart/form-data")
+
+
+# ---------------- read_upload ----------------
+def test_read_upload_hashes_the_bytes(resume_pdf):
+    upload = read_upload(io.BytesIO(resume_pdf), "resume.pdf")
+    assert upload.data == resume_pdf
+    assert upload.digest == pdf_digest(resume_pdf)
+    assert upload.key == candidate_key(resume_pdf)
+
+
+def test_header_may_follow_leading_junk():
+    assert read_upload(io.BytesIO(b"\0" * 100 + b"%PDF-1.7")).size == 108
+
+
+@pytest.mark.parametrize("data, status", [
+    (b"", 400),
+    (b"PK\x03\x04 not a pdf", 400),
+    (b"%PDF-1.4" + b"0" * 2048, 413),
+])
+def test_read_upload_rejects(data, status):
+    with pytest.raises(UploadError) as e:
+        read_upload(io.BytesIO(data), max_bytes=1024)
+    assert e.value.status_code == status
+
+
+def test_too_large_names_the_limit():
+    with pytest.raises(UploadError, match="larger than 0.5 MB"):
+        read_upload(io.BytesIO(b"%PDF-" + b"0" * 600 * 1024), max_bytes=512 * 1024)
+
+
+def test_page_limit_is_checked_by_extraction(make_pdf):
+    with pytest.raises(PdfExtractionError, match="3 pages; the limit is 2") as e:
+        extract_text_from_bytes(make_pdf(["page"] * 3), max_pages=2)
+    assert e.value.status_code == 413
+
+
+def test_streaming_extraction_truncates_long_documents(make_pdf):
+    pdf = make_pdf([f"page {i}" for i in range(PDF_MAX_PAGES + 5)])
+    assert list(iter_pdf_pages(pdf, max_pages=3)) == ["page 0", "page 1", "page 2"]
+    assert len(list(iter_pdf_pages(pdf))) == PDF_MAX_PAGES
+
+
+# ---------------- /analyze ----------------
+def test_analyze_requires_resume_and_jd(client, resume_pdf):
+    response = client.post("/analyze", data={"resume": (io.BytesIO(resume_pdf), "resume.pdf")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 400
+
+
+def test_analyze_checks_content_not_filename(client, resume_pdf):
+    assert post_resume(client, b"<html>resume</html>").status_code == 400
+    assert post_resume(client, resume_pdf, "resume.txt").status_code == 200
+
+
+def test_analyze_refuses_large_requests(client, monkeypatch, resume_pdf):
+    monkeypatch.setitem(app_module.app.config, "MAX_CONTENT_LENGTH", 1024 * 1024)
+    response = post_resume(client, b"%PDF-" + b"0" * 2 * 1024 * 1024)
+    assert response.status_code == 413
+    assert "larger than 1 MB" in response.get_json()["error"]
+
+
+def test_analyze_reads_long_portfolios_up_to_the_budget(client, make_pdf):
+    pages = ["experience\npython developer"] + ["portfolio page"] * PDF_MAX_PAGES + ["kubernetes"]
+    response = post_resume(client, make_pdf(pages))
+    assert response.status_code == 200
+    skills = response.get_json()["analysis"]["skills"]["matched_skills"]
+    assert "python" in skills and "kubernetes" not in skills
+
+
+# ---------------- /analyze/batch ----------------
+def test_batch_rejects_bad_archives(client):
+    assert post_batch(client, b"PK\x03\x04 truncated").status_code == 400
+
+
+def test_batch_reports_bad_members_and_analyzes_the_rest(client, monkeypatch, resume_pdf):
+    monkeypatch.setattr(app_module, "BATCH_MAX_FILE_BYTES", len(resume_pdf))
+    response = post_batch(client, zip_of({
+        "good.pdf": resume_pdf, "notes.txt": b"hello", "big.pdf": resume_pdf + b"0",
+    }))
+    assert response.status_code == 200
+    assert set(batch_errors(response)) == {"notes.txt", "big.pdf"}
+    assert "good.pdf" in response.get_data(as_text=True).splitlines()[-1]
+
+
+@pytest.mark.parametrize("patch, error", [
+    ({"flag_bits": 0x1}, "Encrypted"),
+    ({"compress_type": 99}, "Unsupported"),
+])
+def test_batch_rejects_unreadable_members(client, resume_pdf, patch, error):
+    archive = patch_member(zip_of({"good.pdf": resume_pdf, "odd.pdf": resume_pdf}), "odd.pdf", **patch)
+    response = post_batch(client, archive)
+    assert response.status_code == 200
+    errors = batch_errors(response)
+    assert list(errors) == ["odd.pdf"] and error in errors["odd.pdf"]
+    assert "good.pdf" in response.get_data(as_text=True).splitlines()[-1]
+
+
+def test_batch_refuses_too_many_files(client, monkeypatch, resume_pdf):
+    monkeypatch.setattr(app_module, "BATCH_MAX_RESUMES", 2)
+    response = post_batch(client, zip_of({f"{i}.pdf": resume_pdf for i in range(3)}))
+    assert response.status_code == 413
+    assert "limit is 2" in response.get_json()["error"]
+
+
+def test_batch_caps_decompressed_bytes(client, monkeypatch, resume_pdf):
+    monkeypatch.setattr(app_module, "BATCH_MAX_TOTAL_BYTES", 2 * len(resume_pdf) + 1)
+    response = post_batch(client, zip_of({f"{i}.pdf": resume_pdf for i in range(3)}))
+    assert response.status_code == 413
+
+
+# ---------------- ASGI ----------------
+def test_asgi_counts_chunked_request_bodies(monkeypatch):
+    pytest.importorskip("httpx")
+    import asgi
+    from starlette.testclient import TestClient
+
+    monkeypatch.setattr(asgi, "UPLOAD_MAX_REQUEST_BYTES", 1024 * 1024)
+
+    def body():
+        # A generator body is sent chunked, without Content-Length
+        yield (b'--xyz\r\nContent-Disposition: form-data; name="resume"; filename="resume.pdf"\r\n'
+               b"Content-Type: application/pdf\r\n\r\n%PDF-")
+        for _ in range(32):
+            yield b"0" * 64 * 1024
+        yield b"\r\n--xyz--\r\n"
+
+    response = TestClient(asgi.app).post(
+        "/analyze", content=body(), headers={"content-type": "multipart/form-data; boundary=xyz"}
+    )
+    assert response.status_code == 413
+    assert "larger than 1 MB" in response.json()["error"]
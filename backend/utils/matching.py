@@ -0,0 +1,257 @@
+# backend/utils/matching.py
+
+import re
+
+import numpy as np
+
+# Naming a role (or an alias of it) counts as much as matching its whole tech stack
+ROLE_TITLE_WEIGHT = 1.0
+
+
+# ---------------- Compiled Matchers ----------------
+def _trie_pattern(node):
+    # Turn a character trie into a regex; at every node the longer
+    # continuation is tried before stopping, so the first match is the
+    # longest term that satisfies the trailing boundary.
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        return "(?:" + body + ")?"
+    return body
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
+
+
+class SkillMatcher:
+    """Finds every term of a fixed vocabulary in a single scan of the text.
+
+    The vocabulary is compiled once into a trie-shaped regex wrapped in a
+    lookahead, so ``finditer`` visits each start position once and still
+    reports overlapping terms. Terms that are a prefix of a longer match
+    at the same position are recovered from a precomputed table.
+
+    ``canonical`` maps surface forms (aliases such as "nodejs") to the
+    term reported for them ("node.js"); the mapping is folded into the
+    per-match lookup table, so aliases cost nothing extra while scanning.
+
+    ``pattern`` and ``implied`` may be passed in from a compiled taxonomy
+    (see ``compiled_parts``) to skip building the trie.
+    """
+
+    __slots__ = ("terms", "ids", "word_boundary", "canonical", "_pattern", "_implied", "_emit", "_emit_bits")
+
+    def __init__(self, terms, word_boundary=True, pattern=None, implied=None, canonical=None):
+        canonical = {alias.lower(): term.lower() for alias, term in (canonical or {}).items()}
+        self.terms = list(dict.fromkeys([term.lower() for term in terms] + list(canonical)))
+        self.ids = {term: i for i, term in enumerate(self.terms)}
+        self.word_boundary = word_boundary
+        self.canonical = canonical
+        if pattern is None:
+            pattern, implied = self._compile(self.terms, word_boundary)
+        self._pattern = re.compile(pattern)
+        self._implied = implied
+
+        # surface term -> ((reported term, surface length), ...) for itself
+        # and the shorter terms it implies
+        self._emit = {}
+        for term in self.terms:
+            emit = {}
+            for surface in [term] + implied.get(term, []):
+                emit.setdefault(canonical.get(surface, surface), len(surface))
+            self._emit[term] = tuple(emit.items())
+        # the same, as bits over self.ids for extract_bits
+        self._emit_bits = {
+            term: sum(1 << self.ids[reported] for reported, _ in emit) for term, emit in self._emit.items()
+        }
+
+    @staticmethod
+    def _compile(terms, word_boundary):
+        trie = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        body = _trie_pattern(trie)
+        if word_boundary:
+            pattern = r"(?=\b(" + body + r")\b)"
+        else:
+            pattern = "(?=(" + body + "))"
+
+        # term -> shorter terms that also match whenever it matches: the
+        # terms ending along its own path through the trie
+        implied = {}
+        for term in terms:
+            node = trie
+            found = []
+            for length, char in enumerate(term[:-1], start=1):
+                node = node[char]
+                if "" in node and (not word_boundary or
+                                   _is_word_char(term[length - 1]) != _is_word_char(term[length])):
+                    found.append(term[:length])
+            if found:
+                implied[term] = found
+        return pattern, implied
+
+    def compiled_parts(self):
+        """``(pattern, implied)``, enough to rebuild this matcher without a trie."""
+        return self._pattern.pattern, self._implied
+
+    def finditer(self, text, pos=0):
+        """Yield ``(term, start, end)`` for every occurrence in lowercase ``text``.
+
+        Scanning starts at ``pos``; the character before it still counts
+        for the word-boundary check, as with ``re.Pattern.finditer``.
+        """
+        emit = self._emit
+        for match in self._pattern.finditer(text, pos):
+            start = match.start()
+            for term, length in emit[match.group(1)]:
+                yield term, start, start + length
+
+    def find_offsets(self, text):
+        """Return ``{term: [(start, end), ...]}`` for all terms found in ``text``."""
+        offsets = {}
+        for term, start, end in self.finditer(text.lower()):
+            offsets.setdefault(term, []).append((start, end))
+        return offsets
+
+    def extract(self, text, pos=0):
+        return {term for term, _, _ in self.finditer(text.lower(), pos)}
+
+    def extract_bits(self, text, pos=0):
+        """``extract`` as a bitset: bit ``ids[term]`` is set for every term found."""
+        emit = self._emit_bits
+        bits = 0
+        for match in self._pattern.finditer(text.lower(), pos):
+            bits |= emit[match.group(1)]
+        return bits
+
+    def canonical_form(self, term):
+        """The term reported for ``term`` (itself unless it is an alias), or None if unknown."""
+        term = term.lower()
+        if term not in self.ids:
+            return None
+        return self.canonical.get(term, term)
+
+    @property
+    def canonical_terms(self):
+        """Distinct reported terms, in vocabulary order."""
+        return [term for term in self.terms if term not in self.canonical]
+
+    @property
+    def longest_term(self):
+        return max((len(term) for term in self.terms), default=0)
+
+
+class TermBits:
+    """Maps a vocabulary to bit positions, so term sets become Python ints.
+
+    Set algebra on documents is then plain integer arithmetic (``a & b``,
+    ``a & ~b``) and a bitset is a single comparable, storable value. A
+    vocabulary that starts with a matcher's ``terms`` reads the bitsets
+    returned by its ``extract_bits`` directly.
+    """
+
+    __slots__ = ("terms", "ids")
+
+    def __init__(self, terms):
+        self.terms = list(dict.fromkeys(terms))
+        self.ids = {term: i for i, term in enumerate(self.terms)}
+
+    def encode(self, terms):
+        """Bitset of ``terms``; terms outside the vocabulary are ignored."""
+        ids = self.ids
+        bits = 0
+        for term in terms:
+            if term in ids:
+                bits |= 1 << ids[term]
+        return bits
+
+    def decode(self, bits):
+        """Terms whose bits are set, in vocabulary order."""
+        terms = []
+        while bits:
+            low = bits & -bits
+            terms.append(self.terms[low.bit_length() - 1])
+            bits ^= low
+        return terms
+
+
+# ---------------- Role Inference ----------------
+class RoleModel:
+    """Scores every role against a text with one term-vector x role-matrix product.
+
+    Skills and role titles (names and aliases) share one matcher, so a
+    text is scanned once. ``weights`` is a (terms, roles) matrix: a role's
+    skills are weighted by how specific they are to few roles and
+    normalized to sum to 1, so a role scores 1 when its whole tech stack
+    appears; each of its titles adds ROLE_TITLE_WEIGHT on top.
+    """
+
+    __slots__ = ("roles", "matcher", "weights", "aliases")
+
+    def __init__(self, roles, matcher, weights, aliases):
+        self.roles = roles
+        self.matcher = matcher
+        self.weights = weights
+        self.aliases = aliases
+
+    @staticmethod
+    def role_terms(role_skills, role_aliases):
+        """Matcher vocabulary, in order: every role skill, then role names and aliases."""
+        titles = list(role_skills) + [alias for alias, role in role_aliases.items() if role in role_skills]
+        return [skill for skills in role_skills.values() for skill in skills] + titles
+
+    @staticmethod
+    def build_weights(role_skills, role_aliases, term_ids):
+        roles = list(role_skills)
+        columns = {role: i for i, role in enumerate(roles)}
+        skills = np.zeros((len(term_ids), len(roles)), dtype=np.float32)
+        for role, column in columns.items():
+            skills[[term_ids[skill.lower()] for skill in role_skills[role]], column] = 1.0
+
+        # Skills shared by many roles (python, aws) say little about which one is meant
+        role_counts = skills.sum(axis=1)
+        idf = np.log1p(len(roles) / np.maximum(role_counts, 1.0)) * (role_counts > 0)
+        weights = skills * idf[:, None]
+        weights /= np.maximum(weights.sum(axis=0), 1e-9)
+        titles = dict(zip(roles, roles))
+        titles.update((alias, role) for alias, role in role_aliases.items() if role in columns)
+        for title, role in titles.items():
+            weights[term_ids[title.lower()], columns[role]] += ROLE_TITLE_WEIGHT
+        return weights
+
+    @classmethod
+    def build(cls, role_skills, role_aliases, skill_aliases=None):
+        terms = cls.role_terms(role_skills, role_aliases)
+        vocabulary = set(terms)
+        canonical = {alias: skill for alias, skill in (skill_aliases or {}).items() if skill in vocabulary}
+        matcher = SkillMatcher(terms, canonical=canonical)
+        weights = cls.build_weights(role_skills, role_aliases, matcher.ids)
+        aliases = {role: [alias for alias, r in role_aliases.items() if r == role] for role in role_skills}
+        return cls(list(role_skills), matcher, weights, aliases)
+
+    def scores(self, text):
+        """Raw per-role scores for lowercase ``text``."""
+        found = [self.matcher.ids[term] for term in self.matcher.extract(text)]
+        return self.weights[found].sum(axis=0)
+
+    def rank(self, text, top_n=None):
+        """Roles with a non-zero score, best first, as a confidence distribution."""
+        scores = self.scores(text)
+        total = float(scores.sum())
+        if total <= 0:
+            return []
+        order = [i for i in np.argsort(-scores, kind="stable") if scores[i] > 0][:top_n]
+        return [
+            {"role": self.roles[i], "score": round(float(scores[i]) / total, 4), "aliases": self.aliases[self.roles[i]]}
+            for i in order
+        ]
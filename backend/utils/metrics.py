@@ -0,0 +1,251 @@
+"""Latency histograms and counters, exported in the Prometheus text format.
+
+Recording is a bisect and two increments under a lock, cheap enough to
+leave on in production. ``timed(stage)`` records one pipeline stage into
+``hirelens_stage_seconds``; inside a request begun with ``start_request``
+the stage is also added to that request's timings, which the apps can
+return in a ``Server-Timing`` header (METRICS_TIMING_HEADER=1).
+
+Series live in each process. With several gunicorn/uvicorn workers, set
+METRICS_DIR: every worker then writes a snapshot there each
+METRICS_FLUSH_SECONDS and ``/metrics`` adds up the snapshots of all
+workers, so whichever worker answers reports the whole server. Snapshots
+of workers that have exited are dropped (the gunicorn master also clears
+the directory when it starts), so restarted workers are not counted twice.
+"""
+import bisect
+import contextvars
+import glob
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# ---------------- Config ----------------
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+METRICS_TIMING_HEADER = os.environ.get("METRICS_TIMING_HEADER", "0") == "1"
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# name -> (type, help)
+_METRICS = {
+    "hirelens_stage_seconds": ("histogram", "Time spent in each analysis pipeline stage."),
+    "hirelens_request_seconds": ("histogram", "HTTP request latency until the response starts, by endpoint."),
+    "hirelens_requests_total": ("counter", "HTTP requests by endpoint and status."),
+}
+
+
+class Registry:
+    """Histograms (fixed LATENCY_BUCKETS) and counters keyed by name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, labels, value):
+        index = bisect.bisect_left(LATENCY_BUCKETS, value)
+        key = (name, labels)
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "histograms": [[name, labels, list(counts), total]
+                               for (name, labels), (counts, total) in self._histograms.items()],
+                "counters": [[name, labels, value] for (name, labels), value in self._counters.items()],
+            }
+
+
+registry = Registry()
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+# ---------------- Recording ----------------
+def observe_stage(stage, seconds):
+    if not METRICS_ENABLED:
+        return
+    registry.observe("hirelens_stage_seconds", (("stage", stage),), seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def timed(stage):
+    """Time the body as one ``stage`` of the pipeline."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def start_request(timings=None):
+    """Collect the stages timed from now on in this context; returns the list they go to.
+
+    ``timings`` may be any list (one that overrides ``append`` sees each
+    stage as it is timed). Worker threads only see it when run in a copy
+    of the context (``contextvars.copy_context().run``).
+    """
+    timings = [] if timings is None else timings
+    _request_timings.set(timings)
+    if METRICS_DIR:
+        _start_flusher()
+    return timings
+
+
+def record_request(endpoint, status, seconds):
+    if not METRICS_ENABLED:
+        return
+    registry.observe("hirelens_request_seconds", (("endpoint", endpoint),), seconds)
+    registry.inc("hirelens_requests_total", (("endpoint", endpoint), ("status", str(status))))
+
+
+def server_timing(timings, total):
+    """``Server-Timing`` header value: milliseconds per stage (repeats summed), then the total."""
+    durations = {}
+    for stage, seconds in timings:
+        durations[stage] = durations.get(stage, 0.0) + seconds
+    durations["total"] = total
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in durations.items())
+
+
+# ---------------- Worker Snapshots ----------------
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+_SNAPSHOT_FILE = re.compile(r"metrics-(\d+)\.json$")
+
+
+def _snapshot_path(pid):
+    return os.path.join(METRICS_DIR, f"metrics-{pid}.json")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def clear_snapshots():
+    """Delete every snapshot in METRICS_DIR (run before any worker starts)."""
+    for path in glob.glob(os.path.join(METRICS_DIR, "metrics-*")):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def flush():
+    """Write this process's series to METRICS_DIR (atomically)."""
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = _snapshot_path(os.getpid())
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(tmp_path, path)
+
+
+def _start_flusher():
+    global _flusher_pid
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+
+    def run():
+        while True:
+            try:
+                flush()
+            except OSError as e:
+                print("❌ Metrics flush failed:", str(e))
+            time.sleep(METRICS_FLUSH_SECONDS)
+
+    threading.Thread(target=run, name="metrics-flusher", daemon=True).start()
+
+
+def _collect():
+    """All series of this process plus, with METRICS_DIR, the other workers' snapshots."""
+    snapshots = [registry.snapshot()]
+    if METRICS_DIR:
+        own = _snapshot_path(os.getpid())
+        for path in glob.glob(os.path.join(METRICS_DIR, "metrics-*.json")):
+            match = _SNAPSHOT_FILE.search(path)
+            if path == own or not match:
+                continue
+            if not _pid_alive(int(match.group(1))):
+                # Left by a worker that has exited; a restarted one reports afresh
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+
+    histograms, counters = {}, {}
+    for snapshot in snapshots:
+        for name, labels, counts, total in snapshot["histograms"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            merged = histograms.setdefault(key, [[0] * len(counts), 0.0])
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0) + value
+    return histograms, counters
+
+
+# ---------------- Exposition ----------------
+def _labels(pairs):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in pairs) + "}" if pairs else ""
+
+
+def render_metrics():
+    """Every series in the Prometheus text exposition format (version 0.0.4)."""
+    histograms, counters = _collect()
+    lines = []
+    for name, (kind, help_text) in _METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (series, labels), (counts, total) in sorted(histograms.items()):
+                if series != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {total}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        else:
+            for (series, labels), value in sorted(counters.items()):
+                if series == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
@@ -1,13 +1,125 @@
-from sklearn.metrics.pairwise import cosine_similarity
-from models.embeddings import embedding_model
+import os
 
+import numpy as np
+
+from models.embeddings import embedding_service, get_embedding_model
+
+# ---------------- Config ----------------
+# Embed long texts as overlapping word windows instead of one truncated string
+SEMANTIC_CHUNKING = os.environ.get("SEMANTIC_CHUNKING", "0") == "1"
+# MiniLM truncates at 256 word pieces; ~1.4 pieces per word leaves headroom.
+# Windows that still tokenize past the model's limit (code, URLs, long
+# identifiers) are split further in embed_chunks, so nothing is truncated.
+CHUNK_WORDS = int(os.environ.get("SEMANTIC_CHUNK_WORDS", "180"))
+CHUNK_OVERLAP_WORDS = int(os.environ.get("SEMANTIC_CHUNK_OVERLAP_WORDS", "30"))
+# max-mean: best resume chunk for every JD chunk, averaged over the JD
+CHUNK_POOLING = os.environ.get("SEMANTIC_CHUNK_POOLING", "max-mean")
+CHUNK_POOLINGS = ("max-mean", "max", "mean")
+
+if CHUNK_POOLING not in CHUNK_POOLINGS:
+    raise ValueError(f"SEMANTIC_CHUNK_POOLING must be one of {', '.join(CHUNK_POOLINGS)}, not {CHUNK_POOLING!r}")
+
+
+def cosine_similarity(a, b):
+    # Plain NumPy: importing sklearn.metrics added about a second to startup
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    denom = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(np.dot(a, b) / denom) if denom else 0.0
+
+
+# ---------------- Chunked Embeddings ----------------
+def split_into_chunks(text, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP_WORDS):
+    words = text.split()
+    if len(words) <= chunk_words:
+        return [" ".join(words)]
+    stride = max(1, chunk_words - overlap)
+    starts = range(0, len(words) - overlap, stride)
+    return [" ".join(words[start:start + chunk_words]) for start in starts]
+
+
+def fit_chunks(chunks, token_counts, max_tokens):
+    """Halve every chunk that ``token_counts`` says is longer than ``max_tokens``, until all fit.
+
+    A single word over the limit is kept as it is; the model truncates it.
+    """
+    fitted = []
+    while chunks:
+        too_long = []
+        for chunk, tokens in zip(chunks, token_counts(chunks)):
+            words = chunk.split()
+            if tokens <= max_tokens or len(words) < 2:
+                fitted.append(chunk)
+            else:
+                half = len(words) // 2
+                too_long += [" ".join(words[:half]), " ".join(words[half:])]
+        chunks = too_long
+    return fitted
+
+
+def _normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def embed_chunks(text):
+    """(chunks, dim) matrix of unit-length chunk embeddings, encoded in one batch."""
+    chunks = split_into_chunks(text)
+    model = get_embedding_model()
+    if model.max_tokens:
+        chunks = fit_chunks(chunks, model.token_counts, model.max_tokens)
+    return _normalize_rows(embedding_service.encode(chunks))
+
+
+def pooled_similarity(chunks_a, chunks_b, pooling=CHUNK_POOLING):
+    """Pool the chunk-to-chunk cosine matrix of two embed_chunks results into one score."""
+    sims = chunks_a @ chunks_b.T
+    if pooling == "mean":
+        return float(sims.mean())
+    if pooling == "max":
+        return float(sims.max())
+    if pooling == "max-mean":
+        return float(sims.max(axis=0).mean())
+    raise ValueError(f"Unknown chunk pooling {pooling!r}; choose from {', '.join(CHUNK_POOLINGS)}")
+
+
+def reference_embedding(text):
+    """Embedding to compare resumes against: a vector, or a chunk matrix in chunked mode."""
+    if SEMANTIC_CHUNKING:
+        return embed_chunks(text)
+    return embedding_service.encode([text])[0]
+
+
+def document_embedding(text):
+    """One unit-length vector per document, for indexing and nearest-neighbour search."""
+    if SEMANTIC_CHUNKING:
+        vector = embed_chunks(text).mean(axis=0)
+    else:
+        vector = np.asarray(embedding_service.encode([text])[0], dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+# ---------------- Scores ----------------
 def semantic_similarity(text1, text2):
-    embeddings = embedding_model.encode([text1, text2])
-    score = cosine_similarity(
-        [embeddings[0]],
-        [embeddings[1]]
-    )[0][0]
+    if SEMANTIC_CHUNKING:
+        return round(pooled_similarity(embed_chunks(text1), embed_chunks(text2)) * 100, 2)
+
+    embeddings = embedding_service.encode([text1, text2])
+    score = cosine_similarity(embeddings[0], embeddings[1])
+
+    return round(float(score) * 100, 2)
+
+
+def embedding_similarity(text, reference):
+    """Like semantic_similarity, against a precomputed reference_embedding."""
+    if np.ndim(reference) == 2:
+        return round(pooled_similarity(embed_chunks(text), reference) * 100, 2)
 
+    embedding = embedding_service.encode([text])[0]
+    score = cosine_similarity(embedding, reference)
     return round(float(score) * 100, 2)
 
 
@@ -0,0 +1,456 @@
+"""Skill taxonomy: editable JSON source, compiled binary artifact, hot reload.
+
+The source (``taxonomy/taxonomy.json``) lists skills, soft skills,
+certifications, roles (skills, responsibilities, keywords), role aliases
+and skill aliases (other spellings of a skill, reported under its
+canonical name). ``python -m utils.taxonomy build`` compiles it into
+``taxonomy/taxonomy.bin``: all terms interned into one string table, the
+matcher regexes and prefix tables precomputed, and the role weight matrix
+stored as a raw float32 array. Loading memory-maps the artifact and only
+decodes the string table; matchers compile their regex on first use.
+
+A running worker picks up a rebuilt artifact within
+``TAXONOMY_RELOAD_INTERVAL_SECONDS``: the new taxonomy is loaded and
+warmed in the background, then swapped in atomically.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from utils.matching import RoleModel, SkillMatcher, TermBits
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---------------- Config ----------------
+TAXONOMY_SOURCE = os.environ.get("TAXONOMY_SOURCE", os.path.join(BASE_DIR, "taxonomy", "taxonomy.json"))
+TAXONOMY_PATH = os.environ.get("TAXONOMY_PATH", os.path.join(BASE_DIR, "taxonomy", "taxonomy.bin"))
+TAXONOMY_RELOAD_INTERVAL_SECONDS = float(os.environ.get("TAXONOMY_RELOAD_INTERVAL_SECONDS", "10"))
+
+_MAGIC = b"HLTAX\x00\x00\x02"
+_ALIGN = 64
+# Matchers stored in the artifact: name -> (source list, word boundaries)
+_MATCHERS = {
+    "skill": ("skills", True),
+    "soft_skill": ("soft_skills", True),
+    # Certifications have always been matched as plain substrings
+    "certification": ("certifications", False),
+}
+
+
+class TaxonomyError(Exception):
+    """Raised for an invalid taxonomy source or artifact."""
+
+
+# ---------------- Source ----------------
+def load_source(path=TAXONOMY_SOURCE):
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        source = json.loads(raw)
+    except ValueError as e:
+        raise TaxonomyError(f"{path}: {e}")
+
+    for key in ("version", "skills", "soft_skills", "certifications", "roles", "role_aliases"):
+        if key not in source:
+            raise TaxonomyError(f"{path}: missing {key!r}")
+    for role, entry in source["roles"].items():
+        unknown = set(entry) - {"skills", "responsibilities", "keywords"}
+        if unknown:
+            raise TaxonomyError(f"{path}: role {role!r} has unknown fields {sorted(unknown)}")
+    for alias, role in source["role_aliases"].items():
+        if role not in source["roles"]:
+            raise TaxonomyError(f"{path}: alias {alias!r} points to unknown role {role!r}")
+
+    known = set(source["skills"]).union(*(entry.get("skills") or () for entry in source["roles"].values()))
+    for alias, skill in source.get("skill_aliases", {}).items():
+        if alias in source["skills"] or alias in source.get("skill_aliases", {}).values():
+            raise TaxonomyError(f"{path}: skill alias {alias!r} is itself a canonical skill")
+        if skill not in known:
+            raise TaxonomyError(f"{path}: skill alias {alias!r} points to unknown skill {skill!r}")
+    return source, hashlib.sha256(raw).hexdigest()
+
+
+# ---------------- Build ----------------
+def build_artifact(source_path=TAXONOMY_SOURCE, output_path=TAXONOMY_PATH):
+    """Compile the JSON source into a binary artifact; returns its header."""
+    source, source_sha = load_source(source_path)
+    skill_aliases = {alias.lower(): skill.lower() for alias, skill in source.get("skill_aliases", {}).items()}
+    # Roles list canonical skills only, so coverage counts each skill once
+    role_skills = {
+        role: list(dict.fromkeys(skill_aliases.get(s.lower(), s.lower()) for s in entry["skills"]))
+        for role, entry in source["roles"].items() if "skills" in entry
+    }
+
+    strings = {}
+
+    def intern(terms):
+        if any("\n" in term for term in terms):
+            raise TaxonomyError("Terms cannot contain line breaks")
+        return np.array([strings.setdefault(term.lower(), len(strings)) for term in terms], dtype=np.int32)
+
+    arrays = {}
+    matchers = {}
+    role_terms = RoleModel.role_terms(role_skills, source["role_aliases"])
+    for name, (key, word_boundary) in list(_MATCHERS.items()) + [("role", (None, True))]:
+        terms = role_terms if name == "role" else source[key]
+        canonical = {}
+        if name in ("skill", "role"):
+            vocabulary = {term.lower() for term in terms}
+            canonical = {alias: skill for alias, skill in skill_aliases.items() if skill in vocabulary}
+        matcher = SkillMatcher(terms, word_boundary, canonical=canonical)
+        pattern, implied = matcher.compiled_parts()
+        # Prefix table as CSR over the matcher's own term positions
+        indptr, indices = [0], []
+        for term in matcher.terms:
+            indices.extend(matcher.ids[other] for other in implied.get(term, ()))
+            indptr.append(len(indices))
+        arrays[f"{name}_terms"] = intern(matcher.terms)
+        arrays[f"{name}_canonical"] = np.array(
+            [matcher.ids[matcher.canonical_form(term)] for term in matcher.terms], dtype=np.int32
+        )
+        arrays[f"{name}_implied_indptr"] = np.array(indptr, dtype=np.int32)
+        arrays[f"{name}_implied"] = np.array(indices, dtype=np.int32)
+        matchers[name] = {"pattern": pattern, "word_boundary": word_boundary}
+        if name == "role":
+            arrays["role_weights"] = RoleModel.build_weights(role_skills, source["role_aliases"], matcher.ids)
+
+    arrays["role_skills_indptr"] = np.cumsum([0] + [len(s) for s in role_skills.values()], dtype=np.int32)
+    arrays["role_skills"] = intern([skill for skills in role_skills.values() for skill in skills])
+    blob = "\n".join(strings).encode("utf-8")
+    arrays["strings"] = np.frombuffer(blob, dtype=np.uint8)
+
+    header = {
+        "format": 2,
+        "version": source["version"],
+        "source_sha256": source_sha,
+        "built_at": time.time(),
+        "term_count": len(strings),
+        "skills_roles": list(role_skills),
+        "roles": {
+            role: {k: v for k, v in entry.items() if k != "skills"}
+            for role, entry in source["roles"].items()
+        },
+        "role_order": list(source["roles"]),
+        "role_aliases": source["role_aliases"],
+        "matchers": matchers,
+        "arrays": {}
+    }
+
+    # Arrays follow the header, each aligned for zero-copy views; offsets
+    # are relative to the start of that data section
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _align(len(_MAGIC) + 8 + len(header_bytes))
+
+    tmp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(tmp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header["arrays"][name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, output_path)
+    return header
+
+
+def _align(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+# ---------------- Loaded Taxonomy ----------------
+class Taxonomy:
+    """One immutable, loaded taxonomy version.
+
+    List and dict attributes mirror the old ``utils.skills`` constants;
+    matchers and the role model are built from the precomputed parts on
+    first use (``warm`` builds them all up front).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._data = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(self._data[:len(_MAGIC)]) != _MAGIC:
+            raise TaxonomyError(f"{path} is not a taxonomy artifact of this format")
+        header_len = int.from_bytes(bytes(self._data[len(_MAGIC):len(_MAGIC) + 8]), "little")
+        start = len(_MAGIC) + 8
+        self.header = header = json.loads(bytes(self._data[start:start + header_len]))
+        self._data_start = _align(start + header_len)
+
+        self.version = header["version"]
+        # Identifies the exact content, for cache keys
+        self.build_id = f"{header['version']}:{header['source_sha256'][:16]}"
+        self.strings = bytes(self.array("strings")).decode("utf-8").split("\n")
+
+        def lookup(ids):
+            return [self.strings[i] for i in ids]
+
+        skill_terms, skill_canonical = self.array("skill_terms"), self.array("skill_canonical")
+        self.general_skills = [self.strings[t] for i, t in enumerate(skill_terms) if skill_canonical[i] == i]
+        self.skill_aliases = {
+            self.strings[t]: self.strings[skill_terms[skill_canonical[i]]]
+            for i, t in enumerate(skill_terms) if skill_canonical[i] != i
+        }
+        self.soft_skills = lookup(self.array("soft_skill_terms"))
+        self.certifications = lookup(self.array("certification_terms"))
+        indptr, role_skill_ids = self.array("role_skills_indptr"), self.array("role_skills")
+        self.role_skills = {
+            role: lookup(role_skill_ids[indptr[i]:indptr[i + 1]])
+            for i, role in enumerate(header["skills_roles"])
+        }
+        roles = header["roles"]
+        self.role_responsibilities = {
+            role: roles[role]["responsibilities"] for role in header["role_order"] if "responsibilities" in roles[role]
+        }
+        self.role_keywords = {
+            role: roles[role]["keywords"] for role in header["role_order"] if "keywords" in roles[role]
+        }
+        self.role_aliases = header["role_aliases"]
+
+        self._lock = threading.Lock()
+        self._matchers = {}
+        self._term_bits = {}
+        self._role_skill_bits = None
+        self._role_model = None
+        self._scan_overlap = None
+
+    def array(self, name):
+        spec = self.header["arrays"][name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = self._data_start + spec["offset"]
+        return self._data[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    def _matcher(self, name):
+        matcher = self._matchers.get(name)
+        if matcher is None:
+            with self._lock:
+                matcher = self._matchers.get(name)
+                if matcher is None:
+                    spec = self.header["matchers"][name]
+                    terms = [self.strings[i] for i in self.array(f"{name}_terms")]
+                    indptr, indices = self.array(f"{name}_implied_indptr"), self.array(f"{name}_implied")
+                    implied = {
+                        term: [terms[j] for j in indices[indptr[i]:indptr[i + 1]]]
+                        for i, term in enumerate(terms) if indptr[i + 1] > indptr[i]
+                    }
+                    canonical = {
+                        terms[i]: terms[j] for i, j in enumerate(self.array(f"{name}_canonical")) if i != j
+                    }
+                    matcher = SkillMatcher(terms, spec["word_boundary"], spec["pattern"], implied, canonical)
+                    self._matchers[name] = matcher
+        return matcher
+
+    @property
+    def skill_matcher(self):
+        return self._matcher("skill")
+
+    @property
+    def soft_skill_matcher(self):
+        return self._matcher("soft_skill")
+
+    @property
+    def certification_matcher(self):
+        return self._matcher("certification")
+
+    def term_bits(self, name):
+        """Bitset vocabulary for the ``name`` matcher's ``extract_bits`` results.
+
+        The skill vocabulary also covers role skills the skill matcher
+        does not detect, so role requirements fit in the same bitsets.
+        """
+        bits = self._term_bits.get(name)
+        if bits is None:
+            terms = self._matcher(name).terms
+            if name == "skill":
+                terms = terms + [s for skills in self.role_skills.values() for s in skills]
+            bits = self._term_bits.setdefault(name, TermBits(terms))
+        return bits
+
+    @property
+    def role_skill_bits(self):
+        """Role -> bitset of its skills, over ``term_bits("skill")``."""
+        if self._role_skill_bits is None:
+            skill_bits = self.term_bits("skill")
+            self._role_skill_bits = {role: skill_bits.encode(skills) for role, skills in self.role_skills.items()}
+        return self._role_skill_bits
+
+    @property
+    def role_model(self):
+        if self._role_model is None:
+            matcher = self._matcher("role")
+            with self._lock:
+                if self._role_model is None:
+                    aliases = {
+                        role: [alias for alias, r in self.role_aliases.items() if r == role]
+                        for role in self.role_skills
+                    }
+                    self._role_model = RoleModel(list(self.role_skills), matcher, self.array("role_weights"), aliases)
+        return self._role_model
+
+    @property
+    def scan_overlap(self):
+        """Longest term any resume matcher can report (for page-by-page scanning)."""
+        if self._scan_overlap is None:
+            self._scan_overlap = max(
+                m.longest_term for m in (self.skill_matcher, self.soft_skill_matcher, self.certification_matcher)
+            )
+        return self._scan_overlap
+
+    def warm(self):
+        for name in _MATCHERS:
+            self.term_bits(name)
+        self.role_skill_bits  # builds them
+        self.role_model
+        return self
+
+
+# ---------------- Current Taxonomy ----------------
+_current = None
+_current_lock = threading.Lock()
+_watched = None
+_watcher_pid = None
+
+
+def _artifact_stat(path):
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _source_sha(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def load_taxonomy(path=TAXONOMY_PATH, source_path=TAXONOMY_SOURCE):
+    """Load the artifact, compiling it from the source first if it is missing, in an older format or stale.
+
+    The artifact is stale when its header names a different source sha
+    than the source file's. If it cannot be rebuilt (an invalid source, a
+    read-only disk), the stale artifact is used with a warning.
+    """
+    if os.path.exists(path):
+        try:
+            taxonomy = Taxonomy(path)
+        except TaxonomyError:
+            if not os.path.exists(source_path):
+                raise
+        else:
+            source_sha = _source_sha(source_path)
+            if source_sha is None or source_sha == taxonomy.header["source_sha256"]:
+                return taxonomy
+            print(f"⚙️ Rebuilding skill taxonomy {path}: {source_path} has changed")
+            try:
+                build_artifact(source_path, path)
+            except (TaxonomyError, OSError) as e:
+                print(f"⚠️ Using the stale skill taxonomy {path}; rebuilding it failed: {e}")
+                return taxonomy
+            return Taxonomy(path)
+    print(f"⚙️ Building skill taxonomy {path} from {source_path}")
+    build_artifact(source_path, path)
+    return Taxonomy(path)
+
+
+def get_taxonomy():
+    """The taxonomy currently in effect; loaded on first use."""
+    taxonomy = _current
+    if taxonomy is None:
+        with _current_lock:
+            if _current is None:
+                _install(load_taxonomy())
+            taxonomy = _current
+    if _watcher_pid != os.getpid():
+        start_taxonomy_watcher()
+    return taxonomy
+
+
+def _install(taxonomy):
+    global _current, _watched
+    _watched = _artifact_stat(taxonomy.path)
+    _current = taxonomy
+
+
+def reload_taxonomy(path=TAXONOMY_PATH):
+    """Load and warm ``path``, then make it current. In-flight requests keep the old one."""
+    taxonomy = Taxonomy(path).warm()
+    with _current_lock:
+        _install(taxonomy)
+    print(f"🔄 Loaded skill taxonomy {taxonomy.version} ({taxonomy.header['term_count']} terms)")
+    return taxonomy
+
+
+def start_taxonomy_watcher(interval=TAXONOMY_RELOAD_INTERVAL_SECONDS):
+    """Reload the taxonomy whenever its artifact is replaced (once per process)."""
+    global _watcher_pid
+    with _current_lock:
+        if _watcher_pid == os.getpid() or interval <= 0:
+            return
+        _watcher_pid = os.getpid()
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                if _current is not None and _artifact_stat(_current.path) != _watched:
+                    reload_taxonomy(_current.path)
+            except Exception as e:
+                print("❌ Taxonomy reload failed:", str(e))
+
+    threading.Thread(target=run, name="taxonomy-watcher", daemon=True).start()
+
+
+# ---------------- CLI ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the compiled skill taxonomy.")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--source", default=TAXONOMY_SOURCE)
+    parser.add_argument("--output", default=TAXONOMY_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        try:
+            header = build_artifact(args.source, args.output)
+        except (TaxonomyError, OSError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        print(f"✅ Built {args.output}: version {header['version']}, {header['term_count']} terms, "
+              f"{os.path.getsize(args.output)} bytes in {time.perf_counter() - started:.2f}s")
+        return 0
+
+    started = time.perf_counter()
+    taxonomy = Taxonomy(args.output)
+    loaded = time.perf_counter() - started
+    taxonomy.warm()
+    warmed = time.perf_counter() - started - loaded
+    print(json.dumps({
+        "path": args.output,
+        "version": taxonomy.version,
+        "build_id": taxonomy.build_id,
+        "terms": taxonomy.header["term_count"],
+        "skills": len(taxonomy.general_skills),
+        "skill_aliases": len(taxonomy.skill_aliases),
+        "roles": len(taxonomy.role_skills),
+        "load_ms": round(loaded * 1000, 2),
+        "warm_ms": round(warmed * 1000, 2)
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())